@@ -5,10 +5,128 @@ Module for adapting code to different environments (e.g., Colab vs local).
 Модуль для адаптирования разных платформ запуска (т.к. Гугл-Колаб или локальной среды)
 """
 
-import torch
-from typing import Union
+import os
+import math
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
 from config import get_environment, EnvironmentType
 
+# Переменные окружения, переопределяющие план запуска
+ENV_OVERRIDES: Dict[str, str] = {
+    "cores": "PIML_CORES",
+    "workers": "PIML_WORKERS",
+    "threads": "PIML_THREADS",
+    "memory_mb": "PIML_MEMORY_MB",
+    "batch_rows": "PIML_BATCH_ROWS"
+}
+# Переопределения, которые задаются целыми числами (остальные - дробными)
+INTEGER_OVERRIDES = ("cores", "workers", "threads", "batch_rows")
+# Оценка памяти процесса пула: интерпретатор с numpy/scipy/pandas и буферы файла
+WORKER_MEMORY_MB: float = 256.0
+# Доля доступной памяти, которую пайплайн считает своим бюджетом
+MEMORY_FRACTION: float = 0.7
+# Оценка числа колонок строки датасета без импорта движков признаков:
+# метка времени, id и разметка; признаков на канал (9 статистик + 2 спектральных)
+# и колонок на каждый дополнительный признак реестра (полосы, частоты дефектов)
+ID_COLUMNS: int = 5
+BASE_FEATURES: int = 11
+EXTRA_FEATURE_COLUMNS: int = 4
+# Доля бюджета этапа, отводимая под один пакет строк
+BATCH_FRACTION: float = 0.25
+# Файловые системы, на которых чтение упирается в задержку сети
+NETWORK_FILESYSTEMS = ("nfs", "nfs4", "cifs", "smb3", "smbfs", "sshfs", "fuse.sshfs",
+                       "fuse.rclone", "fuse.gcsfuse", "9p")
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    Execution plan: detected resources and chosen parallelism and memory budgets.
+    План запуска: обнаруженные ресурсы, выбранный параллелизм и бюджеты памяти.
+    """
+    # Ресурсы: логические CPU процесса, квота CPU cgroup, используемые ядра
+    cpu_count: int
+    cpu_quota: Optional[float]
+    cores: int
+    # Память (МБ): всего, доступно, лимит и потребление cgroup (None - неизвестно)
+    ram_total_mb: Optional[float]
+    ram_available_mb: Optional[float]
+    cgroup_memory_limit_mb: Optional[float]
+    # Выбор: процессы пула, потоки BLAS/FFT/torch на процесс, общий бюджет памяти
+    workers: int
+    threads: int
+    memory_budget_mb: float
+    # Бюджеты этапов (МБ) и строк в их пакетах: сборка (буферы записи частей
+    # при пуле процессов), улучшение (пакет потокового улучшения и порог
+    # out-of-core) и выгрузка последовательностей (читаемый пакет)
+    ingest_budget_mb: float
+    ingest_batch_rows: int
+    enhance_budget_mb: float
+    enhance_batch_rows: int
+    export_budget_mb: float
+    export_batch_rows: int
+    # Потоки опережающего чтения
+    prefetch_threads: int
+    # Устройство torch-движка признаков (None - движок numpy)
+    torch_device: Optional[str]
+    # Переопределения из окружения: имя параметра -> значение
+    overrides: Dict[str, float]
+
+    def apply(self, config: Any) -> None:
+        """
+        Applies the plan to GlobalConfig.
+        Переносит план в GlobalConfig, который читают этапы пайплайна.
+
+        Args:
+            config (GlobalConfig): Конфиг пайплайна.
+        """
+        config.workers = self.workers
+        config.fft_workers = self.threads
+        config.torch_threads = self.threads
+        config.blas_threads = self.threads
+        config.write_batch_rows = self.ingest_batch_rows
+        config.enhance_batch_rows = self.enhance_batch_rows
+        config.export_batch_rows = self.export_batch_rows
+        config.prefetch_threads = self.prefetch_threads
+        config.memory_budget_mb = self.memory_budget_mb
+        config.enhance_budget_mb = self.enhance_budget_mb
+        if self.torch_device is not None:
+            config.torch_device = self.torch_device
+
+    def describe(self) -> str:
+        """
+        Returns a human-readable summary of the plan.
+        Возвращает описание плана для вывода в консоль.
+
+        Returns:
+            str: Несколько строк: ресурсы, параллелизм, память.
+        """
+        def mb(value: Optional[float]) -> str:
+            return "?" if value is None else f"{value / 1024:.1f} GB"
+
+        quota = "" if self.cpu_quota is None else f", cgroup quota {self.cpu_quota:g}"
+        limit = "" if self.cgroup_memory_limit_mb is None else f", cgroup limit {mb(self.cgroup_memory_limit_mb)}"
+        lines = [
+            f"CPU: {self.cpu_count} visible{quota} -> {self.cores} cores",
+            f"RAM: {mb(self.ram_available_mb)} available of {mb(self.ram_total_mb)}{limit}"
+            f" -> budget {mb(self.memory_budget_mb)}",
+            f"Plan: {self.workers} workers x {self.threads} threads (BLAS/FFT/torch), "
+            f"prefetch threads {self.prefetch_threads}"
+            + ("" if self.torch_device is None else f", torch device {self.torch_device}"),
+            f"Stages: ingest {mb(self.ingest_budget_mb)} / {self.ingest_batch_rows} rows, "
+            f"enhance {mb(self.enhance_budget_mb)} / {self.enhance_batch_rows} rows, "
+            f"export {mb(self.export_budget_mb)} / {self.export_batch_rows} rows"
+        ]
+        if self.overrides:
+            lines.append("Overrides: " + ", ".join(f"{k}={v}" for k, v in self.overrides.items()))
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the plan as a JSON-serializable dict.
+        Возвращает план словарем (для отчетов).
+        """
+        return asdict(self)
+
 class EnvironmentAdapter:
     """
     A class to adapt runtime parameters based on the environment.
@@ -17,13 +135,27 @@ class EnvironmentAdapter:
 
     def __init__(self) -> None:
         """
-        Initializes the adapter by detecting the environment and setting device.
-        Инициализирует адаптер, определяя платформу и устанавливая вид устройства для оубчения модели (CPU/GPU)
+        Initializes the adapter by detecting the environment.
+        Инициализирует адаптер, определяя платформу. Устройство torch
+        определяется при первом обращении к device, поэтому планирование
+        ресурсов не импортирует torch.
         """
         self.environment: EnvironmentType = get_environment()
-        self.device: torch.device = torch.device(
-            "cuda" if torch.cuda.is_available() else "cpu"
-        )
+        self._device: Any = None
+
+    @property
+    def device(self) -> Any:
+        """
+        Torch device for model training (CPU/GPU).
+        Вид устройства torch для обучения модели (CPU/GPU).
+
+        Returns:
+            torch.device: "cuda", если доступна, иначе "cpu".
+        """
+        if self._device is None:
+            import torch
+            self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        return self._device
 
     def describe_environment(self) -> str:
         """
@@ -35,3 +167,204 @@ class EnvironmentAdapter:
         """
         device_type = "GPU" if self.device.type == "cuda" else "CPU"
         return f"Environment: {self.environment}, Device: {device_type}"
+
+    def plan(self, config: Any) -> ExecutionPlan:
+        """
+        Builds an execution plan from detected resources and env overrides.
+        Строит план запуска по ресурсам машины (с учетом cgroup) и переменным окружения.
+
+        Ядра - минимум из доступных процессу CPU и квоты cgroup. Бюджет памяти -
+        MEMORY_FRACTION от меньшего из доступной RAM и остатка лимита cgroup.
+        Процессов пула столько, сколько ядер помещается в бюджет по
+        WORKER_MEMORY_MB; ядра делятся между процессами поровну, так что
+        потоки BLAS/FFT/torch не превышают число ядер (OMP_NUM_THREADS из
+        окружения только уменьшает их). Torch на GPU обрабатывает файлы в
+        одном процессе.
+
+        Бюджет сборки - остаток после процессов пула; улучшение и выгрузка
+        идут после завершения пула и получают весь бюджет. Пакет этапа -
+        BATCH_FRACTION его бюджета, деленная на байты строки, которые этап
+        держит в памяти (по числу колонок из конфига).
+
+        Args:
+            config (GlobalConfig): Конфиг пайплайна (движок, путь к данным).
+
+        Returns:
+            ExecutionPlan: План запуска.
+        """
+        overrides = _env_overrides()
+        cpu_count = _visible_cpus()
+        cpu_quota = _cgroup_cpu_quota()
+        # Дробная квота округляется вниз: лишний процесс упирался бы в троттлинг cgroup
+        cores = cpu_count if cpu_quota is None else max(1, min(cpu_count, int(cpu_quota)))
+        cores = overrides.get("cores", cores)
+
+        ram_total, ram_available = _meminfo_mb()
+        cgroup_limit, cgroup_usage = _cgroup_memory_mb()
+        limits = [m for m in (ram_available, None if cgroup_limit is None else cgroup_limit - cgroup_usage)
+                  if m is not None]
+        memory_budget = MEMORY_FRACTION * min(limits) if limits else 4096.0
+        memory_budget = overrides.get("memory_mb", memory_budget)
+
+        gpu = False
+        if config.feature_backend == "torch" and config.torch_device != "cpu":
+            gpu = config.torch_device is not None or self._cuda_available()
+        torch_device = None
+        if config.feature_backend == "torch":
+            torch_device = config.torch_device or ("cuda" if gpu else "cpu")
+        workers = 1 if gpu else max(1, min(cores, int(memory_budget // WORKER_MEMORY_MB)))
+        workers = overrides.get("workers", workers)
+        threads = max(1, cores // workers)
+        # OMP_NUM_THREADS из окружения не должен превышать долю ядер процесса
+        if os.environ.get("OMP_NUM_THREADS", "").isdigit():
+            threads = max(1, min(threads, int(os.environ["OMP_NUM_THREADS"])))
+        threads = overrides.get("threads", threads)
+
+        base, enhanced = _row_columns(config)
+        partitions = max(len(config.experiments[t].bearing_names) for t in config.target_tests)
+        # Сборка: буферы ColumnarAggregator каждой партиции и их копия в Arrow при сбросе
+        ingest_budget = max(memory_budget - workers * WORKER_MEMORY_MB, WORKER_MEMORY_MB)
+        ingest_rows = _batch_rows(ingest_budget, 2 * 8 * base * partitions, overrides)
+        # Улучшение: входной пакет, производные колонки и выходная таблица
+        enhance_rows = _batch_rows(memory_budget, 8 * (base + 2 * enhanced), overrides)
+        # Выгрузка: пакет Arrow float64, матрица признаков и маска NaN
+        export_rows = _batch_rows(memory_budget, (8 + 4 + 1) * enhanced, overrides)
+        prefetch_threads = 4 if _is_network_path(config.raw_data_path) else 1
+
+        return ExecutionPlan(
+            cpu_count=cpu_count, cpu_quota=cpu_quota, cores=cores,
+            ram_total_mb=ram_total, ram_available_mb=ram_available, cgroup_memory_limit_mb=cgroup_limit,
+            workers=workers, threads=threads, memory_budget_mb=memory_budget,
+            ingest_budget_mb=ingest_budget, ingest_batch_rows=ingest_rows,
+            enhance_budget_mb=memory_budget, enhance_batch_rows=enhance_rows,
+            export_budget_mb=memory_budget, export_batch_rows=export_rows,
+            prefetch_threads=prefetch_threads, torch_device=torch_device, overrides=overrides
+        )
+
+    def _cuda_available(self) -> bool:
+        """
+        Checks CUDA without failing when torch is not installed.
+        Проверяет CUDA; без torch - False.
+        """
+        try:
+            return self.device.type == "cuda"
+        except ImportError:
+            return False
+
+def _env_overrides() -> Dict[str, float]:
+    """Переопределения плана из переменных ENV_OVERRIDES, не меньше 1.
+
+    Некорректное значение не прерывает запуск: печатается предупреждение
+    с именем переменной, и параметр вычисляется как без переопределения.
+    Значения меньше 1 поднимаются до 1.
+
+    Returns:
+        Dict[str, float]: Имя параметра -> значение (int для INTEGER_OVERRIDES).
+    """
+    overrides: Dict[str, float] = {}
+    for name, var in ENV_OVERRIDES.items():
+        raw = os.environ.get(var, "").strip()
+        if not raw:
+            continue
+        kind = "an integer" if name in INTEGER_OVERRIDES else "a number"
+        try:
+            value = int(raw) if name in INTEGER_OVERRIDES else float(raw)
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value):
+            print(f"[!] {var}={raw!r} is not {kind}: ignored, using the detected value")
+            continue
+        if value < 1:
+            print(f"[!] {var}={raw!r} is below 1: using 1")
+            value = 1
+        overrides[name] = value
+    return overrides
+
+def _row_columns(config: Any) -> Tuple[int, int]:
+    """Оценка числа колонок базового и улучшенного датасетов по конфигу.
+
+    Returns:
+        Tuple[int, int]: (колонок в базовой строке, колонок в улучшенной строке).
+    """
+    channels = max(len(chs) for t in config.target_tests
+                   for chs in config.experiments[t].bearing_to_channels.values())
+    features = channels * (BASE_FEATURES + EXTRA_FEATURE_COLUMNS * len(config.extra_features))
+    # Энхансер добавляет на признак скользящие средние, diff и EWM
+    derived = features * (2 + len(config.extra_rolling_windows) + len(config.ewm_spans))
+    return ID_COLUMNS + features, ID_COLUMNS + features + derived
+
+def _batch_rows(budget_mb: float, row_bytes: int, overrides: Dict[str, str]) -> int:
+    """Строк в пакете этапа: степень двойки в пределах BATCH_FRACTION бюджета (или PIML_BATCH_ROWS)."""
+    if "batch_rows" in overrides:
+        return int(overrides["batch_rows"])
+    rows = int(budget_mb * 2**20 * BATCH_FRACTION / row_bytes)
+    return 2 ** int(math.log2(min(max(rows, 4096), 2**20)))
+
+def _visible_cpus() -> int:
+    """Логические CPU, на которых процессу разрешено выполняться."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _read(path: str) -> Optional[str]:
+    """Содержимое файла или None (нет файла / нет доступа)."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """Квота CPU cgroup в ядрах (v2 cpu.max или v1 cfs_quota/cfs_period); None - без квоты."""
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")
+    if cpu_max is not None:
+        quota, period = cpu_max.split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    quota_v1 = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period_v1 = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota_v1 is None or period_v1 is None or int(quota_v1) <= 0:
+        return None
+    return int(quota_v1) / int(period_v1)
+
+def _cgroup_memory_mb() -> Tuple[Optional[float], float]:
+    """(лимит, потребление) памяти cgroup в МБ; (None, 0) - без лимита."""
+    for limit_path, usage_path in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                                    "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        limit = _read(limit_path)
+        if limit is None:
+            continue
+        # v1 без лимита сообщает почти 2^63
+        if limit == "max" or int(limit) >= 2**60:
+            return None, 0.0
+        usage = _read(usage_path)
+        return int(limit) / 2**20, (int(usage) if usage else 0) / 2**20
+    return None, 0.0
+
+def _meminfo_mb() -> Tuple[Optional[float], Optional[float]]:
+    """(всего, доступно) RAM в МБ по /proc/meminfo или sysconf; None - неизвестно."""
+    meminfo = _read("/proc/meminfo")
+    if meminfo is not None:
+        values = {line.split(":")[0]: int(line.split()[1]) / 1024 for line in meminfo.splitlines() if ":" in line}
+        return values.get("MemTotal"), values.get("MemAvailable")
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**20
+    except (ValueError, OSError, AttributeError):
+        return None, None
+    return total, None
+
+def _is_network_path(path: str) -> bool:
+    """Лежит ли путь на сетевой файловой системе (по /proc/mounts)."""
+    mounts = _read("/proc/mounts")
+    if mounts is None:
+        return False
+    target = os.path.realpath(path)
+    best, best_type = "", ""
+    for line in mounts.splitlines():
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        mount_point, fs_type = parts[1], parts[2]
+        if (target == mount_point or target.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > len(best):
+            best, best_type = mount_point, fs_type
+    return best_type in NETWORK_FILESYSTEMS
@@ -0,0 +1,348 @@
+# benchmark.py
+
+"""
+End-to-end benchmark of the pipeline stages on synthetic IMS data.
+Замер скорости этапов пайплайна на синтетических данных (без архива NASA).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from src.settings import GlobalConfig, StorageProfile
+from src.data_loader import IMSRawLoader
+from src.raw_store import RawSignalStore
+from src.feature_engine import FeatureCalculator
+from src.spectral_engine import SpectralCalculator
+from src.feature_registry import FeatureContext, compute_features
+from src.file_processor import FileProcessor
+from src.storage_manager import DataAggregator, ColumnarAggregator, storage_report, write_frame
+from src.enhancer import DatasetEnhancer
+from src.data_explorer import DataExplorer
+from src.synthetic_data import DegradationTrend, generate_test
+from src.windowing import segment_signal
+
+@dataclass
+class StageResult:
+    """Результат замера одного этапа."""
+    name: str
+    seconds: float
+    windows: int
+    megabytes: float
+    windows_per_s: Optional[float]
+    mb_per_s: Optional[float]
+    # Максимум RSS процесса после этапа (МБ); None, если платформа не сообщает
+    peak_rss_mb: Optional[float]
+
+def peak_rss_mb() -> Optional[float]:
+    """Возвращает пиковый RSS процесса в МБ (None, если недоступно)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает КБ, macOS - байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class PipelineBenchmark:
+    """Прогоняет этапы пайплайна на синтетическом тесте и замеряет их."""
+
+    def __init__(self, config: GlobalConfig, test_name: str, n_files: int):
+        """Инициализация бенчмарка.
+
+        Args:
+            config (GlobalConfig): Конфиг с путями во временную папку.
+            test_name (str): Тест, чья раскладка каналов используется.
+            n_files (int): Число синтетических снимков.
+        """
+        self.config = config
+        self.test_name = test_name
+        self.n_files = n_files
+        self.results: List[StageResult] = []
+        # Профиль хранения -> размер и время чтения улучшенного датасета
+        self.storage: Dict[str, Dict[str, float]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str, windows: int = 0, n_bytes: int = 0) -> Iterator[None]:
+        """Замеряет время блока и сохраняет результат этапа.
+
+        Args:
+            name (str): Имя этапа.
+            windows (int): Число окон (строк), обработанных этапом.
+            n_bytes (int): Объем прочитанных/записанных данных.
+        """
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        mb = n_bytes / 2**20
+        result = StageResult(
+            name=name,
+            seconds=seconds,
+            windows=windows,
+            megabytes=mb,
+            windows_per_s=windows / seconds if windows and seconds > 0 else None,
+            mb_per_s=mb / seconds if n_bytes and seconds > 0 else None,
+            peak_rss_mb=peak_rss_mb()
+        )
+        self.results.append(result)
+        print(f"  {name:<22} {seconds:9.3f} s"
+              + (f"  {result.windows_per_s:12.0f} win/s" if result.windows_per_s else "")
+              + (f"  {result.mb_per_s:9.1f} MB/s" if result.mb_per_s else ""))
+
+    def run(self) -> List[StageResult]:
+        """Генерирует данные и последовательно замеряет все этапы.
+
+        Returns:
+            List[StageResult]: Результаты этапов в порядке выполнения.
+        """
+        config = self.config
+        spec = config.experiments[self.test_name]
+        win = config.window
+
+        print(f"[*] Generating {self.n_files} synthetic files for {self.test_name}...")
+        failing = {b: DegradationTrend() for b, t in spec.failure_times.items() if t is not None}
+        files = generate_test(config.raw_data_path, self.test_name, spec, self.n_files,
+                              datetime(2003, 11, 1), failing=failing)
+        text_bytes = sum(os.path.getsize(f) for f in files)
+        loader = IMSRawLoader(config)
+
+        print("[*] Running stages...")
+        config.use_raw_cache = False
+        with self.stage("load_text", n_bytes=text_bytes):
+            for f in files:
+                loader.load_file_content(f, self.test_name)
+
+        config.use_raw_cache = True
+        with self.stage("build_cache", n_bytes=text_bytes):
+            loader.build_binary_cache(self.test_name, files)
+
+        signals: List[np.ndarray] = []
+        cache_dir = loader.cache_dir(self.test_name)
+        cached_bytes = sum(os.path.getsize(os.path.join(cache_dir, name))
+                           for name in os.listdir(cache_dir) if name.endswith(".npy"))
+        with self.stage("load_cached", n_bytes=cached_bytes):
+            for f in files:
+                signals.append(np.ascontiguousarray(loader.load_file_array(f, self.test_name).T,
+                                                    dtype=np.float64))
+
+        raw_store = RawSignalStore(config, self.test_name)
+        with self.stage("raw_store_build", n_bytes=cached_bytes):
+            raw_store.build(files)
+        with self.stage("load_store", n_bytes=cached_bytes):
+            for f in files:
+                np.ascontiguousarray(raw_store.file_array(f).T, dtype=np.float64)  # type: ignore[union-attr]
+
+        # Случайные окна из произвольных файлов и каналов (обучение на сырых сигналах)
+        rng = np.random.default_rng(0)
+        n_random = 4096
+        with self.stage("store_windows", windows=n_random, n_bytes=n_random * win.length * raw_store.signals.itemsize):  # type: ignore[union-attr]
+            raw_store.windows(rng.integers(0, len(files), n_random),
+                              rng.integers(0, len(raw_store.channels), n_random),
+                              rng.integers(0, int(raw_store.lengths.min()) - win.length + 1, n_random), win.length)
+
+        windows = [segment_signal(s, win.length, win.step) for s in signals]
+        n_windows = sum(w.shape[0] * w.shape[1] for w in windows)
+        signal_bytes = sum(s.nbytes for s in signals)
+
+        with self.stage("features_per_window", windows=n_windows, n_bytes=signal_bytes):
+            for w in windows:
+                for ch in w:
+                    for x in ch:
+                        FeatureCalculator.calculate_all(x)
+
+        # Пакетные признаки - через реестр, как в FileProcessor
+        with self.stage("features_batch", windows=n_windows, n_bytes=signal_bytes):
+            for w in windows:
+                compute_features(FeatureContext(w, win.sampling_rate), FeatureCalculator.FEATURE_NAMES)
+
+        with self.stage("spectral_per_window", windows=n_windows, n_bytes=signal_bytes):
+            for w in windows:
+                for ch in w:
+                    for x in ch:
+                        SpectralCalculator.calculate_spectral(x, win.sampling_rate)
+
+        with self.stage("spectral_batch", windows=n_windows, n_bytes=signal_bytes):
+            for w in windows:
+                compute_features(FeatureContext(w, win.sampling_rate, fft_workers=config.fft_workers),
+                                 list(SpectralCalculator.FEATURE_VERSIONS))
+
+        # Torch-движок замеряется, только если torch установлен
+        try:
+            from src.torch_engine import TorchFeatureEngine
+        except ImportError:
+            print("  (torch not installed: torch stages skipped)")
+        else:
+            engine = TorchFeatureEngine(config.torch_device, config.torch_threads, config.torch_dtype)
+            with self.stage("features_torch", windows=n_windows, n_bytes=signal_bytes):
+                for s in signals:
+                    engine.calculate_batch(engine.segment(s, win.length, win.step))
+            with self.stage("spectral_torch", windows=n_windows, n_bytes=signal_bytes):
+                for s in signals:
+                    engine.calculate_spectral_batch(engine.segment(s, win.length, win.step), win.sampling_rate)
+
+        processor = FileProcessor(config)
+        with self.stage("file_processor", windows=n_windows, n_bytes=cached_bytes):
+            processed = list(processor.iter_files(files, self.test_name,
+                                                  workers=config.workers, chunk_size=config.chunk_size))
+        n_rows = sum(len(r.columns["bearing_id"]) for r in processed)
+
+        base_path = config.output_path
+        aggregator = DataAggregator()
+        with self.stage("aggregator_save", windows=n_rows):
+            for r in processed:
+                aggregator.add_batch(r.timestamp, self.test_name, r.columns)
+            aggregator.save(base_path)
+
+        columnar_path = base_path.replace(".parquet", "_columnar.parquet")
+        with self.stage("columnar_save", windows=n_rows):
+            writer = ColumnarAggregator(columnar_path, config.write_batch_rows)
+            for r in processed:
+                writer.add_batch(r.timestamp, self.test_name, r.columns)
+            writer.close()
+
+        base_df = pd.read_parquet(base_path)
+        enhanced_path = base_path.replace(".parquet", "_enhanced.parquet")
+        with self.stage("enhancer_process", windows=n_rows):
+            enhanced = DatasetEnhancer(base_df).process(rolling_window=config.rolling_window)
+        enhanced.to_parquet(enhanced_path, index=False)
+
+        with self.stage("explorer_checks", windows=n_rows, n_bytes=os.path.getsize(enhanced_path)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                DataExplorer(enhanced_path).run_basic_checks()
+
+        profiles = {"default": StorageProfile(), "compact": StorageProfile.compact()}
+        storage_paths = {name: base_path.replace(".parquet", f"_{name}.parquet") for name in profiles}
+        for name, profile in profiles.items():
+            with self.stage(f"storage_write_{name}", windows=n_rows):
+                write_frame(enhanced, storage_paths[name], profile)
+        self.storage = storage_report(storage_paths)
+        for name, row in self.storage.items():
+            print(f"  storage[{name}]: {row['size_mb']:.2f} MB, read {row['read_s']:.3f} s, "
+                  f"one bearing {row['bearing_read_s']:.3f} s ({row['bearing_row_groups']:.0f} row groups)")
+
+        return self.results
+
+def environment_info() -> Dict[str, Optional[str]]:
+    """Собирает сведения о версии кода и окружении для файла результатов."""
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count())
+    }
+
+# Модули, время импорта которых попадает в отчет: точки входа CLI и тяжелые этапы
+IMPORT_MODULES: List[str] = ["main", "run_pipeline", "src.data_explorer", "src.enhancer", "src.file_processor"]
+
+def import_times(modules: List[str], repeats: int = 3) -> Dict[str, float]:
+    """Замеряет время импорта модулей в новом интерпретаторе (лучшее из repeats).
+
+    Каждый замер - отдельный процесс python, поэтому уже загруженные бенчмарком
+    модули не искажают результат; запуск самого интерпретатора не учитывается.
+
+    Args:
+        modules (List[str]): Имена модулей.
+        repeats (int): Число запусков на модуль.
+
+    Returns:
+        Dict[str, float]: Модуль -> время импорта (сек); модули с ошибкой импорта пропускаются.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    times: Dict[str, float] = {}
+    for module in modules:
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        runs = [subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root)
+                for _ in range(repeats)]
+        if all(r.returncode == 0 for r in runs):
+            times[module] = min(float(r.stdout.strip().splitlines()[-1]) for r in runs)
+    return times
+
+def compare_with_baseline(results: List[StageResult], baseline_path: str,
+                          imports: Optional[Dict[str, float]] = None) -> None:
+    """Печатает ускорение этапов относительно сохраненного результата.
+
+    Args:
+        results (List[StageResult]): Текущие результаты.
+        baseline_path (str): Путь к JSON предыдущего прогона.
+        imports (Optional[Dict[str, float]]): Текущее время импорта модулей.
+    """
+    with open(baseline_path, encoding="utf-8") as fh:
+        report = json.load(fh)
+    baseline = {s["name"]: s for s in report["stages"]}
+    print(f"\n[Comparison with {baseline_path}] (>1.00x = faster now)")
+    for r in results:
+        old = baseline.get(r.name)
+        if old and r.seconds > 0:
+            print(f"  {r.name:<22} {old['seconds'] / r.seconds:6.2f}x")
+    for module, seconds in (imports or {}).items():
+        old_s = report.get("imports", {}).get(module)
+        if old_s and seconds > 0:
+            print(f"  {'import ' + module:<22} {old_s / seconds:6.2f}x")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка.
+
+    Args:
+        argv (Optional[List[str]]): Аргументы командной строки (по умолчанию sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic IMS data")
+    parser.add_argument("--files", type=int, default=20, help="число синтетических снимков")
+    parser.add_argument("--test", default="1st_test", help="тест, чья раскладка каналов используется")
+    parser.add_argument("--out", default="./bench_results", help="папка для JSON с результатами")
+    parser.add_argument("--baseline", default=None, help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="piml_bench_") as work_dir:
+        config = GlobalConfig(
+            raw_data_path=os.path.join(work_dir, "raw"),
+            output_path=os.path.join(work_dir, "processed_data.parquet"),
+            cache_path=os.path.join(work_dir, "cache")
+        )
+        bench = PipelineBenchmark(config, args.test, args.files)
+        results = bench.run()
+
+    # Время импорта: стартовые издержки частых запусков (main.py env/validate)
+    imports = import_times(IMPORT_MODULES)
+    for module, seconds in imports.items():
+        print(f"  import[{module}]: {seconds:.3f} s")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "parameters": {"files": args.files, "test": args.test, "window": asdict(config.window),
+                       "workers": config.workers},
+        "stages": [asdict(r) for r in results],
+        "storage": bench.storage,
+        "imports": imports
+    }
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"[+] Results saved to {out_path}")
+
+    if args.baseline:
+        compare_with_baseline(results, args.baseline, imports)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,18 +1,179 @@
 # main.py
 
 """
-Main orchestration script for testing environment detection and device usage.
+Command-line entry point of the pipeline: env, ingest, enhance, validate, bench.
+Единая точка входа пайплайна. Тяжелые модули (pandas, scipy, torch, движки
+признаков) импортируются только подкомандами, которым они нужны, поэтому
+частые проверки (env, validate) запускаются без секунд на импорт.
+
+    python main.py env [--device] [--json]
+    python main.py ingest [--watch] [--raw-store] [--profile]
+    python main.py enhance [--out-of-core] [--sequences] [--profile]
+    python main.py validate [--path PATH]
+    python main.py bench [--files N] [--baseline JSON]
+
+Без подкоманды печатает платформу и устройство (как раньше).
 """
 
+import os
+import sys
+import json
+import argparse
+from typing import List, Optional
+
 from adapter import EnvironmentAdapter
+from src.settings import GlobalConfig
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Parses the command line and runs the selected subcommand.
+    Разбирает командную строку и запускает подкоманду.
+
+    Args:
+        argv (Optional[List[str]]): Аргументы командной строки (по умолчанию sys.argv).
+
+    Returns:
+        int: Код возврата процесса.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    # Аргументы бенчмарка передаются его собственному парсеру без изменений
+    if argv[:1] == ["bench"]:
+        return cmd_bench(argv[1:])
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args = build_parser().parse_args(["env", "--device"])
+    return args.handler(args)
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser with all subcommands.
+    Строит парсер аргументов с подкомандами.
+
+    Returns:
+        argparse.ArgumentParser: Парсер.
+    """
+    parser = argparse.ArgumentParser(description="NASA IMS feature pipeline")
+    commands = parser.add_subparsers(dest="command")
+
+    # Общие флаги профилирования этапов сборки и улучшения
+    profiling = argparse.ArgumentParser(add_help=False)
+    profiling.add_argument("--profile", action="store_true",
+                           help="замерить этапы и сохранить отчет *_profile.json рядом с датасетом")
+    profiling.add_argument("--cprofile", action="store_true",
+                           help="с --profile: добавить в отчет самые затратные функции (cProfile)")
+    profiling.add_argument("--tracemalloc", action="store_true",
+                           help="с --profile: отслеживать аллокации памяти (tracemalloc)")
+
+    env = commands.add_parser("env", help="платформа, ресурсы и план запуска")
+    env.add_argument("--device", action="store_true",
+                     help="определить устройство обучения (импортирует torch)")
+    env.add_argument("--json", action="store_true", help="вывести план запуска в JSON")
+    env.set_defaults(handler=cmd_env)
+
+    ingest = commands.add_parser("ingest", parents=[profiling], help="собрать базовый датасет")
+    ingest.add_argument("--watch", action="store_true",
+                        help="следить за папками тестов и обрабатывать новые файлы")
+    ingest.add_argument("--poll-interval", type=float, default=1.0,
+                        help="пауза между опросами папок в режиме --watch (сек)")
+    ingest.add_argument("--max-files", type=int, default=None,
+                        help="остановить --watch после стольких файлов")
+    ingest.add_argument("--timeout", type=float, default=None,
+                        help="остановить --watch через столько секунд")
+    ingest.add_argument("--raw-store", action="store_true",
+                        help="читать сырые сигналы из консолидированного memory-mapped хранилища теста")
+    ingest.set_defaults(handler=cmd_ingest)
 
-def main() -> None:
+    enhance = commands.add_parser("enhance", parents=[profiling], help="улучшить базовый датасет")
+    enhance.add_argument("--out-of-core", action="store_true",
+                         help="улучшать датасет потоково по подшипникам (ограниченная память)")
+    enhance.add_argument("--sequences", action="store_true",
+                         help="выгрузить улучшенный датасет в memory-mapped хранилище последовательностей")
+    enhance.set_defaults(handler=cmd_enhance)
+
+    validate = commands.add_parser("validate", help="проверить улучшенный датасет")
+    validate.add_argument("--path", default=None,
+                          help="датасет для проверки (по умолчанию улучшенный датасет конфига)")
+    validate.set_defaults(handler=cmd_validate)
+
+    # Только для справки: разбор аргументов делает benchmark.main
+    commands.add_parser("bench", help="бенчмарк этапов на синтетических данных (аргументы benchmark.py)")
+    return parser
+
+def cmd_env(args: argparse.Namespace) -> int:
     """
-    Main function to initialize the adapter and print environment info.
+    Prints the environment and the execution plan; torch only with --device.
+    Печатает платформу и план запуска; torch импортируется только с --device.
     """
+    config = GlobalConfig()
     adapter = EnvironmentAdapter()
-    description = adapter.describe_environment()
-    print(description)
+    plan = adapter.plan(config)
+    if args.json:
+        print(json.dumps({"environment": adapter.environment, "plan": plan.to_dict()}, indent=2))
+        return 0
+    print(adapter.describe_environment() if args.device else f"Environment: {adapter.environment}")
+    print(plan.describe())
+    return 0
+
+def cmd_ingest(args: argparse.Namespace) -> int:
+    """
+    Builds the base dataset (or watches the test folders).
+    Собирает базовый датасет или следит за папками тестов.
+    """
+    import run_pipeline
+    config = GlobalConfig()
+    run_pipeline.apply_plan(config)
+    base_path, _ = run_pipeline.dataset_paths(config)
+    if args.watch:
+        run_pipeline.watch(config, base_path, args.poll_interval, args.max_files, args.timeout)
+        return 0
+    config.profile = args.profile
+    config.use_raw_store = config.use_raw_store or args.raw_store
+    with run_pipeline.profiled(config, base_path, args.cprofile, args.tracemalloc) as profiler:
+        built = run_pipeline.ingest_stage(config, base_path, profiler)
+    return 0 if built else 1
+
+def cmd_enhance(args: argparse.Namespace) -> int:
+    """
+    Enhances the base dataset and optionally exports training sequences.
+    Улучшает базовый датасет и, по флагу, выгружает последовательности.
+    """
+    import run_pipeline
+    config = GlobalConfig()
+    run_pipeline.apply_plan(config)
+    base_path, enhanced_path = run_pipeline.dataset_paths(config)
+    if not os.path.exists(base_path):
+        print(f"[!] Base dataset not found at {base_path}: run `main.py ingest` first")
+        return 1
+    config.profile = args.profile
+    config.enhance_out_of_core = config.enhance_out_of_core or args.out_of_core
+    config.export_sequences = config.export_sequences or args.sequences
+    with run_pipeline.profiled(config, base_path, args.cprofile, args.tracemalloc) as profiler:
+        run_pipeline.enhance_stage(config, base_path, enhanced_path, profiler)
+        if config.export_sequences:
+            run_pipeline.export_stage(config, enhanced_path, profiler)
+    return 0
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    """
+    Runs the dataset checks (pandas/pyarrow only, no feature engines).
+    Проверяет датасет (импортирует только pandas/pyarrow, без движков признаков).
+    """
+    import run_pipeline
+    path = args.path or run_pipeline.dataset_paths(GlobalConfig())[1]
+    if not os.path.exists(path):
+        print(f"[!] Dataset not found at {path}")
+        return 1
+    run_pipeline.validate_stage(path)
+    return 0
+
+def cmd_bench(argv: List[str]) -> int:
+    """
+    Runs the synthetic benchmark with its own arguments.
+    Запускает бенчмарк с его собственными аргументами.
+    """
+    import benchmark
+    benchmark.main(argv)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
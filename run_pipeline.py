@@ -1,158 +1,445 @@
 # run_pipeline.py
 
 import os
-import numpy as np
-import pandas as pd
-from tqdm import tqdm
-from datetime import datetime
-from typing import Dict
-
-from src.settings import GlobalConfig, ExperimentSpec
-from src.data_loader import IMSRawLoader
-from src.feature_engine import FeatureCalculator
-from src.spectral_engine import SpectralCalculator
-from src.enhancer import DatasetEnhancer
-from src.storage_manager import DataAggregator
-from src.data_explorer import DataExplorer
-
-def main() -> None:
-    """Основной цикл обработки данных NASA IMS."""
+import glob
+import argparse
+import contextlib
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from src.settings import GlobalConfig
+from src.manifest import ProcessingManifest
+from src.profiler import StageProfiler
+from src.native_threads import limit_native_threads
+from adapter import EnvironmentAdapter
+
+# pandas, scipy, pyarrow и движки признаков импортируются внутри этапов, которым
+# они нужны: проверка датасета и статус не платят за импорт сборки
+if TYPE_CHECKING:
+    from src.storage_manager import PartitionedAggregator
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Основной цикл обработки данных NASA IMS.
+
+    Args:
+        argv (Optional[List[str]]): Аргументы командной строки (по умолчанию sys.argv).
+    """
+    args = parse_args(argv)
     config = GlobalConfig()
-    # Определение путей к файлам результатов
+    apply_plan(config)
+    base_path, enhanced_path = dataset_paths(config)
+
+    # Режим наблюдения: новые снимки обрабатываются по мере появления
+    if args.watch:
+        watch(config, base_path, args.poll_interval, args.max_files, args.timeout)
+        return
+
+    # Профилирование этапов: при выключенном флаге таймеры ничего не делают
+    config.profile = args.profile
+    config.enhance_out_of_core = config.enhance_out_of_core or args.out_of_core
+    config.export_sequences = config.export_sequences or args.sequences
+    config.use_raw_store = config.use_raw_store or args.raw_store
+    with profiled(config, base_path, args.cprofile, args.tracemalloc) as profiler:
+        run_stages(config, base_path, enhanced_path, profiler)
+
+def apply_plan(config: GlobalConfig) -> None:
+    """Применяет план ресурсов к конфигу (при config.auto_plan) и печатает его.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+    """
+    # План ресурсов: процессы, потоки библиотек и пакеты под ядра и память машины
+    if config.auto_plan:
+        plan = EnvironmentAdapter().plan(config)
+        plan.apply(config)
+        limit_native_threads(config.blas_threads)
+        print("[*] " + plan.describe().replace("\n", "\n[*] "))
+
+def dataset_paths(config: GlobalConfig) -> Tuple[str, str]:
+    """Пути базового и улучшенного датасетов.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+
+    Returns:
+        Tuple[str, str]: (базовый датасет, улучшенный датасет).
+    """
     base_path: str = config.output_path
-    enhanced_path: str = base_path.replace(".parquet", "_enhanced.parquet")
+    return base_path, base_path.replace(".parquet", "_enhanced.parquet")
+
+@contextlib.contextmanager
+def profiled(config: GlobalConfig, base_path: str, cprofile: bool = False,
+             tracemalloc: bool = False) -> Iterator[StageProfiler]:
+    """Профайлер этапов на время запуска; отчет пишется рядом с датасетом.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг (config.profile включает замеры).
+        base_path (str): Путь к базовому датасету.
+        cprofile (bool): Добавить в отчет самые затратные функции.
+        tracemalloc (bool): Отслеживать аллокации памяти.
+
+    Yields:
+        StageProfiler: Запущенный профайлер.
+    """
+    profiler = StageProfiler(enabled=config.profile, use_cprofile=cprofile, use_tracemalloc=tracemalloc)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        if profiler.enabled:
+            profiler.dump(base_path.replace(".parquet", "_profile.json"))
+
+def run_stages(config: GlobalConfig, base_path: str, enhanced_path: str, profiler: StageProfiler) -> None:
+    """Пакетный режим: сборка базового датасета, улучшение и проверка.
 
-    # Проверка существования созданного датафрейма
-    if os.path.exists(base_path):
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        base_path (str): Путь к базовому датасету.
+        enhanced_path (str): Путь к улучшенному датасету.
+        profiler (StageProfiler): Профайлер этапов.
+    """
+    if not ingest_stage(config, base_path, profiler):
+        return
+    enhance_stage(config, base_path, enhanced_path, profiler)
+    if config.export_sequences:
+        export_stage(config, enhanced_path, profiler)
+    validate_stage(enhanced_path, profiler)
+    print("[+] Done.")
+
+def watch(config: GlobalConfig, base_path: str, poll_interval: float = 1.0,
+          max_files: Optional[int] = None, timeout: Optional[float] = None) -> None:
+    """Режим наблюдения: новые снимки обрабатываются по мере появления.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        base_path (str): Корневая папка базового датасета.
+        poll_interval (float): Пауза между опросами папок (сек).
+        max_files (Optional[int]): Остановиться после стольких файлов.
+        timeout (Optional[float]): Остановиться через столько секунд.
+    """
+    from src.watcher import DirectoryWatcher
+    watcher = DirectoryWatcher(config, base_path, poll_interval=poll_interval)
+    watcher.run(max_files=max_files, timeout=timeout)
+
+################################################################################
+# СОЗДАНИЕ ДАТАФРЕЙМА (инкрементально, частями, с hive-партициями)
+################################################################################
+def ingest_stage(config: GlobalConfig, base_path: str, profiler: StageProfiler) -> bool:
+    """Сборка базового датасета (новые и изменившиеся файлы).
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        base_path (str): Путь к базовому датасету.
+        profiler (StageProfiler): Профайлер этапов.
+
+    Returns:
+        bool: True, если базовый датасет есть на диске.
+    """
+    # Монолитный файл от старых версий пайплайна используется как есть
+    if os.path.isfile(base_path):
         print(f"[*] Dataset found at {base_path}. Skipping generation...")
+        return True
+    with profiler.stage("build"):
+        build_base_dataset(config, base_path, profiler)
+    return os.path.exists(base_path)
 
-    ################################################################################
-    # СОЗДАНИЕ ДАТАФРЕЙМА
-    ################################################################################
+################################################################################
+# ЭТАП УЛУЧШЕНИЯ (Enhancement) - при отсутствии или устаревании результата
+################################################################################
+def enhance_stage(config: GlobalConfig, base_path: str, enhanced_path: str, profiler: StageProfiler) -> None:
+    """Улучшение базового датасета (скользящие статистики и производные).
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        base_path (str): Путь к базовому датасету.
+        enhanced_path (str): Путь к улучшенному датасету.
+        profiler (StageProfiler): Профайлер этапов.
+    """
+    if is_up_to_date(enhanced_path, base_path):
+        print(f"[*] Enhanced dataset already exists at {enhanced_path}")
+        return
+    print("[*] Enhancing dataset (rolling stats & derivatives)...")
+    # Датасет не помещается в бюджет улучшения: улучшение идет потоково
+    budget_mb = config.enhance_budget_mb if config.enhance_budget_mb is not None else config.memory_budget_mb
+    if not config.enhance_out_of_core and budget_mb is not None:
+        needed_mb = enhance_memory_mb(config, base_path)
+        if needed_mb > budget_mb:
+            print(f"[*] In-memory enhancement needs ~{needed_mb:.0f} MB of "
+                  f"{budget_mb:.0f} MB budget: switching to out-of-core")
+            config.enhance_out_of_core = True
+    if config.enhance_out_of_core:
+        from src.stream_enhancer import StreamingEnhancer
+        # Потоково по подшипникам: память ограничена пакетом enhance_batch_rows строк
+        with profiler.stage("enhance.stream"):
+            rows = StreamingEnhancer(
+                rolling_window=config.rolling_window,
+                extra_windows=config.extra_rolling_windows,
+                ewm_spans=config.ewm_spans,
+                batch_rows=config.enhance_batch_rows,
+                profile=config.storage
+            ).process(base_path, enhanced_path)
+        profiler.count("enhanced_rows", rows)
     else:
-        # Если файла нет — запускаем обработку
-            
-        loader = IMSRawLoader(config)
-        aggregator = DataAggregator()
-        calc = FeatureCalculator()
-        calc_spec = SpectralCalculator()
-
-        target_test = "1st_test"
-        print(f"[*] Starting pipeline for: {target_test}")
+        from src.enhancer import DatasetEnhancer
+        from src.storage_manager import read_dataset, write_frame
+        with profiler.stage("enhance.read"):
+            base_df = read_dataset(base_path)
+        with profiler.stage("enhance.process"):
+            enhancer = DatasetEnhancer(base_df)
+            final_df = enhancer.process(
+                rolling_window=config.rolling_window,
+                extra_windows=config.extra_rolling_windows,
+                ewm_spans=config.ewm_spans
+            )
+        with profiler.stage("enhance.write"):
+            write_frame(final_df, enhanced_path, config.storage)
+    print(f"[+] Enhanced dataset saved to {enhanced_path}")
+
+################################################################################
+# ВЫГРУЗКА ПОСЛЕДОВАТЕЛЬНОСТЕЙ ДЛЯ ОБУЧЕНИЯ (memory-mapped SequenceStore)
+################################################################################
+def export_stage(config: GlobalConfig, enhanced_path: str, profiler: StageProfiler) -> None:
+    """Выгрузка улучшенного датасета в хранилище последовательностей.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        enhanced_path (str): Путь к улучшенному датасету.
+        profiler (StageProfiler): Профайлер этапов.
+    """
+    from src.sequence_store import SequenceStore
+    store_dir = enhanced_path.replace(".parquet", "_sequences")
+    if not is_up_to_date(os.path.join(store_dir, SequenceStore.META_NAME), enhanced_path):
+        with profiler.stage("export.sequences"):
+            rows = SequenceStore.build(enhanced_path, store_dir, dtype=config.sequence_dtype,
+                                       fill_nan=config.sequence_fill_nan,
+                                       batch_rows=config.export_batch_rows)
+        profiler.count("sequence_rows", rows)
+    n_sequences = len(SequenceStore(store_dir).sequence_starts(config.sequence_length, config.sequence_stride))
+    print(f"[+] Sequence store at {store_dir}: {n_sequences} sequences of {config.sequence_length} rows")
+
+################################################################################
+# ТЕСТ ДАТАФРЕЙМА
+################################################################################
+def validate_stage(enhanced_path: str, profiler: Optional[StageProfiler] = None) -> None:
+    """Проверка улучшенного датасета (DataExplorer.run_basic_checks).
+
+    Args:
+        enhanced_path (str): Путь к улучшенному датасету.
+        profiler (Optional[StageProfiler]): Профайлер этапов (None - без замеров).
+    """
+    from src.data_explorer import DataExplorer
+    profiler = profiler if profiler is not None else StageProfiler()
+    print("[*] Running dataset validation...")
+    with profiler.stage("validate"):
+        explorer = DataExplorer(enhanced_path)
+        explorer.run_basic_checks()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки.
+
+    Args:
+        argv (Optional[List[str]]): Аргументы (по умолчанию sys.argv).
+
+    Returns:
+        argparse.Namespace: Разобранные аргументы.
+    """
+    parser = argparse.ArgumentParser(description="NASA IMS feature pipeline")
+    parser.add_argument("--watch", action="store_true",
+                        help="следить за папками тестов и обрабатывать новые файлы")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="пауза между опросами папок в режиме --watch (сек)")
+    parser.add_argument("--max-files", type=int, default=None,
+                        help="остановить --watch после стольких файлов")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="остановить --watch через столько секунд")
+    parser.add_argument("--profile", action="store_true",
+                        help="замерить этапы и сохранить отчет *_profile.json рядом с датасетом")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="с --profile: добавить в отчет самые затратные функции (cProfile)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="с --profile: отслеживать аллокации памяти (tracemalloc)")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="улучшать датасет потоково по подшипникам (ограниченная память)")
+    parser.add_argument("--raw-store", action="store_true",
+                        help="читать сырые сигналы из консолидированного memory-mapped хранилища теста")
+    parser.add_argument("--sequences", action="store_true",
+                        help="выгрузить улучшенный датасет в memory-mapped хранилище последовательностей")
+    return parser.parse_args(argv)
 
+def build_base_dataset(config: GlobalConfig, base_path: str,
+                       profiler: Optional[StageProfiler] = None) -> None:
+    """Инкрементально строит базовый датасет по всем тестам из config.target_tests.
+
+    Результат - hive-партиционированный датасет
+    base_path/test_id=<тест>/bearing_id=<подшипник>/part-NNNNN.parquet
+    с отдельным манифестом на каждый тест. Файлы всех тестов идут в один
+    пул процессов, поэтому тесты обрабатываются параллельно.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг.
+        base_path (str): Корневая папка датасета.
+        profiler (Optional[StageProfiler]): Профайлер этапов (None - без замеров).
+    """
+    from tqdm import tqdm
+    from src.data_loader import IMSRawLoader
+    from src.file_processor import FileProcessor
+    from src.manifest import config_fingerprint
+    from src.storage_manager import PartitionedAggregator
+    from src.labeling import RULLabeler, relabel_test
+    from src.raw_store import RawSignalStore
+
+    profiler = profiler if profiler is not None else StageProfiler()
+    loader = IMSRawLoader(config)
+    processor = FileProcessor(config)
+    fingerprint = config_fingerprint(config)
+    labeler = RULLabeler(config)
+
+    manifests: Dict[str, ProcessingManifest] = {}
+    file_lists: Dict[str, List[str]] = {}
+    jobs: List[Tuple[str, str]] = []
+
+    for target_test in config.target_tests:
+        print(f"[*] Starting pipeline for: {target_test}")
         try:
             file_list = loader.get_file_list(target_test)
         except FileNotFoundError as e:
             print(f"[!] Error: {e}")
-            return
-
-        # Используем tqdm для отслеживания прогресса по файлам
-        for file_path in tqdm(file_list, desc="Processing files"):
-            ts = loader.parse_timestamp(file_path)
-            df = loader.load_file_content(file_path, target_test)
-
-            win_len = config.window.length
-            step = config.window.step
-            spec = config.experiments[target_test]
-            
-            for b_name in spec.bearing_names:
-                # 1. Сбор признаков по всем каналам подшипника
-                b_features: Dict[str, float] = {}
-                channels = spec.bearing_to_channels[b_name]
-                
-                # Подготовка сигналов для всех осей подшипника
-                axis_signals = {ch: df[ch].to_numpy(dtype=np.float64) for ch in channels}
-                
-                # 2. Нарезка на окна (синхронно для всех осей)
-                n_samples = len(next(iter(axis_signals.values())))
-                for start in range(0, n_samples - win_len + 1, step):
-                    window_features: Dict[str, float] = {}
-                    
-                    for ch_name, full_signal in axis_signals.items():
-                        window = full_signal[start : start + win_len]
-                        
-                        # Базовая статистика
-                        base_f = calc.calculate_all(window)
-                        # Спектральная статистика
-                        spec_f = calc_spec.calculate_spectral(window, config.window.sampling_rate)
-                        
-                        # Добавление суффикса канала (например, _x или _y)
-                        suffix = ch_name[-1] if "_" in ch_name else ""
-                        for k, v in {**base_f, **spec_f}.items():
-                            window_features[f"{k}_{suffix}" if suffix else k] = v
-                    
-                    # 3. Расчет RUL и Health State
-                    rul, state = calculate_bearing_status(ts, b_name, spec, config)
-                    
-                    aggregator.add_row(
-                        timestamp=ts,
-                        test_id=target_test,
-                        bearing_id=b_name,
-                        features=window_features,
-                        rul=rul,
-                        health_state=state
-                    )
-
-        # Сохранение результата
-        print(f"[*] Processing complete. Saving to {base_path}...")
-        aggregator.save(base_path)
-
-    ################################################################################
-    # ЭТАП УЛУЧШЕНИЯ (Enhancement) - выполняется всегда, если есть базовый файл
-    ################################################################################
-    if not os.path.exists(enhanced_path):
-        print("[*] Enhancing dataset (rolling stats & derivatives)...")
-        base_df = pd.read_parquet(base_path)
-        enhancer = DatasetEnhancer(base_df)
-        final_df = enhancer.process(rolling_window=10)
-        final_df.to_parquet(enhanced_path, index=False)
-        print(f"[+] Enhanced dataset saved to {enhanced_path}")
-    else:
-        print(f"[*] Enhanced dataset already exists at {enhanced_path}")
+            continue
 
-    ################################################################################
-    # ТЕСТ ДАТАФРЕЙМА
-    ################################################################################
-    print("[*] Running dataset validation...")
-    explorer = DataExplorer(enhanced_path)
-    explorer.run_basic_checks()
+        # Изменились только настройки разметки: части переразмечаются без пересчета признаков
+        test_dir = os.path.join(base_path, f"test_id={target_test}")
+        with profiler.stage("build.relabel"):
+            relabeled = relabel_test(test_dir, target_test, labeler)
+        if relabeled is not None:
+            print(f"[*] {target_test}: labeling changed, relabeled {relabeled} rows")
 
-    print("[+] Done.")
+        # Сырые сигналы теста упаковываются в один отображаемый массив до обработки
+        if config.use_raw_store:
+            with profiler.stage("build.raw_store"):
+                packed = RawSignalStore(config, target_test).build(file_list)
+            if packed:
+                print(f"[*] {target_test}: packed {packed} files into raw signal store")
 
-def calculate_bearing_status(current_ts: datetime, b_name: str, 
-                             spec: ExperimentSpec, config: GlobalConfig) -> tuple[float, int]:
-    """Рассчитывает RUL и класс здоровья подшипника.
+        # Обрабатываются только новые и изменившиеся файлы
+        with profiler.stage("build.manifest"):
+            manifest = ProcessingManifest(test_dir, fingerprint)
+            pending = manifest.pending_files(file_list)
+        print(f"[*] {target_test}: files to process: {len(pending)} of {len(file_list)}")
+
+        manifests[target_test] = manifest
+        file_lists[target_test] = file_list
+        jobs.extend((f, target_test) for f in pending)
+
+    # Файлы независимы: при workers > 1 они раздаются пулу процессов,
+    # результаты приходят в порядке jobs (по тестам и по времени)
+    results = processor.iter_jobs(jobs, workers=config.workers, chunk_size=config.chunk_size)
+
+    aggregator: Optional["PartitionedAggregator"] = None
+    current_test: str = ""
+    part_files: List[str] = []
+
+    # Используем tqdm для отслеживания прогресса по файлам
+    progress = tqdm(results, total=len(jobs), desc="Processing files")
+    for result in progress:
+        # Опережающее чтение: готовые файлы в очереди и суммарное ожидание диска
+        if processor.reader is not None:
+            stats = processor.reader.stats()
+            progress.set_postfix(queue=f"{stats['ready']}/{processor.reader.depth}",
+                                 stall=f"{stats['stall_s']:.1f}s", refresh=False)
+        profiler.merge_file(result.file_path, result.profile)
+        profiler.count("rows", len(result.columns["bearing_id"]))
+
+        # Фиксация части: после этого прерванный запуск продолжится отсюда
+        if aggregator is not None and (result.test_id != current_test or len(part_files) >= config.commit_every):
+            with profiler.stage("build.commit"):
+                commit_part(manifests[current_test], aggregator, part_files)
+            aggregator = None
+
+        if aggregator is None:
+            current_test, part_files = result.test_id, []
+            manifest = manifests[current_test]
+            aggregator = PartitionedAggregator(
+                manifest.dataset_path, manifest.next_part_name(), config.write_batch_rows,
+                profile=config.storage
+            )
+
+        with profiler.stage("build.write"):
+            aggregator.add_batch(
+                timestamp=result.timestamp,
+                test_id=result.test_id,
+                columns=result.columns
+            )
+        part_files.append(result.file_path)
+
+    if aggregator is not None:
+        with profiler.stage("build.commit"):
+            commit_part(manifests[current_test], aggregator, part_files)
+    if processor.reader is not None:
+        profiler.count("prefetch_stall_s", processor.reader.stall_s)
+
+    # Вытеснение давно не использованных записей кеша признаков сверх лимита
+    if processor.feature_cache is not None:
+        removed, freed = processor.feature_cache.evict()
+        if removed:
+            print(f"[*] Feature cache: evicted {removed} entries ({freed / 2**20:.1f} MB)")
+
+    if config.use_raw_cache:
+        with profiler.stage("build.cache_index"):
+            for target_test, file_list in file_lists.items():
+                loader.write_cache_index(target_test, file_list)
+
+def commit_part(manifest: ProcessingManifest, aggregator: "PartitionedAggregator", files: List[str]) -> None:
+    """Дописывает очередную часть датасета и фиксирует ее в манифесте.
+
+    Часть без строк (все ее файлы короче окна) не создает файлов и не
+    фиксируется: манифест ссылается только на части, которые есть на диске,
+    а такие файлы снова попадут в очередь при следующем запуске.
 
     Args:
-        current_ts (datetime): Текущее время файла.
-        b_name (str): Имя подшипника.
-        spec (ExperimentSpec): Спецификация теста.
-        config (GlobalConfig): Глобальный конфиг.
+        manifest (ProcessingManifest): Манифест теста.
+        aggregator (PartitionedAggregator): Агрегатор, пишущий часть.
+        files (List[str]): Исходные файлы, вошедшие в часть.
+    """
+    aggregator.close()
+    if aggregator.n_rows:
+        manifest.commit(aggregator.file_name, files)
+
+def enhance_memory_mb(config: GlobalConfig, base_path: str) -> float:
+    """Оценивает память пакетного улучшения (DatasetEnhancer) по метаданным parquet.
+
+    В памяти одновременно находятся базовый датафрейм, производные колонки
+    (скользящие средние, diff, EWM) и их объединенная копия.
+
+    Args:
+        config (GlobalConfig): Глобальный конфиг (окна и span энхансера).
+        base_path (str): Базовый датасет.
 
     Returns:
-        tuple[float, int]: (RUL в часах, класс здоровья 0-2).
+        float: Оценка пика памяти (МБ).
     """
-    fail_str = spec.failure_times.get(b_name)
-    
-    # Если подшипник не ломался - он всегда здоров
-    if fail_str is None:
-        return config.rul_threshold_hours, 0
-    
-    fail_ts = datetime.strptime(fail_str, "%Y.%m.%d.%H.%M.%S")
-    time_to_fail = (fail_ts - current_ts).total_seconds() / 3600.0
-    
-    # Ограничение RUL сверху согласно логике Piecewise Linear
-    rul = min(config.rul_threshold_hours, max(0.0, time_to_fail))
-    
-    # Определение класса здоровья
-    if rul >= config.rul_threshold_hours:
-        state = 0 # Здоров (A)
-    elif rul >= config.health_threshold_yellow:
-        state = 1 # Предупреждение (B)
-    else:
-        state = 2 # Критический (C)
-        
-    return float(rul), int(state)
+    from src.enhancer import DatasetEnhancer
+    from src.storage_manager import open_dataset
+    dataset = open_dataset(base_path)
+    n_rows = dataset.count_rows()
+    n_features = len([c for c in dataset.schema.names if c not in DatasetEnhancer.EXCLUDE])
+    n_derived = n_features * (2 + len(config.extra_rolling_windows) + len(config.ewm_spans))
+    return n_rows * (n_features + 2 * n_derived) * 8 / 2**20
+
+def is_up_to_date(derived_path: str, base_path: str) -> bool:
+    """Проверяет, что производный файл новее базового датасета.
+
+    Args:
+        derived_path (str): Путь к производному файлу (например, enhanced).
+        base_path (str): Путь к базовому датасету (файл или папка с манифестами тестов).
+
+    Returns:
+        bool: True, если пересчет не требуется.
+    """
+    if not os.path.exists(derived_path):
+        return False
+    sources = [base_path]
+    if os.path.isdir(base_path):
+        sources = glob.glob(os.path.join(base_path, "*", ProcessingManifest.FILE_NAME))
+    return all(os.path.getmtime(derived_path) >= os.path.getmtime(p) for p in sources)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
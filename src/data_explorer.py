@@ -1,17 +1,35 @@
 # src/data_explorer.py
 
+import os
+import re
+import glob
 import pandas as pd
 import numpy as np
-from typing import Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
 
 class DataExplorer:
-    """Класс для анализа и валидации обработанного датасета."""
+    """Класс для анализа и валидации обработанного датасета.
+
+    Проверки run_basic_checks отвечаются по метаданным parquet (футер и
+    статистика row group) и чтению отдельных колонок потоком по row group,
+    без загрузки всего датасета в pandas.
+    """
+
+    # Базовые колонки RMS: rms или rms_<канал> (без производных признаков энхансера)
+    RMS_PATTERN = re.compile(r"^rms(_[a-z])?$")
+    # Строк в одном пакете при потоковом чтении колонки
+    SCAN_BATCH_ROWS: int = 65536
 
     def __init__(self, file_path: str):
         """Инициализация эксплорера.
 
         Args:
-            file_path (str): Путь к итоговому parquet-файлу.
+            file_path (str): Путь к итоговому parquet-файлу или папке
+                hive-партиционированного датасета.
         """
         self.file_path = file_path
         self.df: Optional[pd.DataFrame] = None
@@ -22,22 +40,22 @@ class DataExplorer:
 
     def run_basic_checks(self) -> None:
         """Выполняет базовый аудит данных и выводит результаты в консоль."""
-        if self.df is None:
-            self.load_data()
-        
-        # Проверка на наличие данных (pylance/mypy check)
-        df = self.df
-        if df is None: return
+        files = self._parquet_files()
+        if not files:
+            print(f"[!] No parquet files found at {self.file_path}")
+            return
+        schema = self._schema(files)
+        total_rows = sum(pf.metadata.num_rows for _, pf in files)
 
         print("\n--- [DATASET VALIDATION REPORT] ---")
-        print(f"[*] Total rows: {len(df)}")
-        print(f"[*] Dataset shape (rows, cols): {df.shape}")
+        print(f"[*] Total rows: {total_rows}")
+        print(f"[*] Dataset shape (rows, cols): {(total_rows, len(schema.names))}")
         print("[*] List of all columns:")
-        for col in df.columns:
+        for col in schema.names:
             print(f"  - {col}")
-     
-        # 1. Проверка на пустые значения
-        null_counts = df.isnull().sum().sum()
+
+        # 1. Проверка на пустые значения (null_count из статистики футера)
+        null_counts = sum(self.null_counts(files).values())
         if null_counts > 0:
             print(f"[!] Warning: Found {null_counts} null values!")
         else:
@@ -45,21 +63,156 @@ class DataExplorer:
 
         # 2. Статистика по датчикам
         print("\n[Counts by Bearing]:")
-        print(df['bearing_id'].value_counts())
+        print(self.bearing_counts(files))
 
         # 3. Проверка физических диапазонов (пример для RMS)
-        if 'rms' in df.columns:
-            print(f"\n[Feature Stats - RMS]:")
-            print(f"  Min: {df['rms'].min():.4f}")
-            print(f"  Max: {df['rms'].max():.4f}")
-            print(f"  Mean: {df['rms'].mean():.4f}")
+        for col in [c for c in schema.names if self.RMS_PATTERN.match(c)]:
+            col_min, col_max = self.column_min_max(col, files)
+            print(f"\n[Feature Stats - {col.upper()}]:")
+            print(f"  Min: {col_min:.4f}")
+            print(f"  Max: {col_max:.4f}")
+            print(f"  Mean: {self.column_mean(col, files):.4f}")
 
-        # 4. Просмотр первых строк
+        # 4. Просмотр первых строк (только первый row group первого файла)
         print("\n[Head of Data]:")
-        print(df.head(5))
-        
+        print(self.head(5, files))
+
         print("-----------------------------------\n")
 
+    def null_counts(self, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> Dict[str, int]:
+        """Число null по колонкам.
+
+        Берется из статистики row group; колонки без статистики читаются потоком.
+        NaN, записанный как значение (а не null), статистикой не учитывается;
+        pandas.to_parquet пишет NaN как null.
+
+        Args:
+            files (Optional[List[Tuple[str, pq.ParquetFile]]]): Открытые файлы
+                (по умолчанию - все файлы датасета).
+
+        Returns:
+            Dict[str, int]: Колонка -> число null.
+        """
+        files = files if files is not None else self._parquet_files()
+        counts: Counter = Counter()
+        for _, pf in files:
+            meta = pf.metadata
+            for j in range(meta.num_columns):
+                name = meta.schema.column(j).name
+                for g in range(meta.num_row_groups):
+                    stats = meta.row_group(g).column(j).statistics
+                    if stats is not None and stats.has_null_count:
+                        counts[name] += stats.null_count
+                    else:
+                        column = pf.read_row_group(g, columns=[name]).column(0)
+                        counts[name] += column.null_count
+        return dict(counts)
+
+    def bearing_counts(self, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> pd.Series:
+        """Число строк по подшипникам.
+
+        Row group с одинаковыми min/max bearing_id (датасет отсортирован по
+        подшипникам) учитываются по метаданным; в партиционированном датасете
+        значение берется из пути bearing_id=<...>. Остальное читается потоком.
+
+        Args:
+            files (Optional[List[Tuple[str, pq.ParquetFile]]]): Открытые файлы.
+
+        Returns:
+            pd.Series: bearing_id -> число строк (по убыванию), как value_counts.
+        """
+        files = files if files is not None else self._parquet_files()
+        counts: Counter = Counter()
+        for path, pf in files:
+            meta = pf.metadata
+            names = pf.schema_arrow.names
+            if "bearing_id" not in names:
+                partition = re.search(r"bearing_id=([^/\\]+)", path)
+                if partition:
+                    counts[partition.group(1)] += meta.num_rows
+                continue
+
+            j = names.index("bearing_id")
+            for g in range(meta.num_row_groups):
+                stats = meta.row_group(g).column(j).statistics
+                if stats is not None and stats.has_min_max and stats.null_count == 0 and stats.min == stats.max:
+                    value = stats.min.decode() if isinstance(stats.min, bytes) else stats.min
+                    counts[value] += meta.row_group(g).num_rows
+                    continue
+                column = pf.read_row_group(g, columns=["bearing_id"]).column(0)
+                for item in pc.value_counts(column).to_pylist():
+                    counts[item["values"]] += item["counts"]
+        return pd.Series(counts, name="count", dtype=np.int64).rename_axis("bearing_id").sort_values(ascending=False)
+
+    def column_min_max(self, column: str, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> Tuple[float, float]:
+        """Минимум и максимум колонки по статистике row group (без чтения данных).
+
+        Args:
+            column (str): Имя колонки.
+            files (Optional[List[Tuple[str, pq.ParquetFile]]]): Открытые файлы.
+
+        Returns:
+            Tuple[float, float]: (min, max); NaN, если значений нет.
+        """
+        files = files if files is not None else self._parquet_files()
+        lows: List[float] = []
+        highs: List[float] = []
+        for _, pf in files:
+            names = pf.schema_arrow.names
+            if column not in names:
+                continue
+            j = names.index(column)
+            meta = pf.metadata
+            for g in range(meta.num_row_groups):
+                stats = meta.row_group(g).column(j).statistics
+                if stats is not None and stats.has_min_max:
+                    lows.append(stats.min)
+                    highs.append(stats.max)
+                else:
+                    values = pf.read_row_group(g, columns=[column]).column(0)
+                    bounds = pc.min_max(values).as_py()
+                    if bounds["min"] is not None:
+                        lows.append(bounds["min"])
+                        highs.append(bounds["max"])
+        if not lows:
+            return np.nan, np.nan
+        return float(min(lows)), float(max(highs))
+
+    def column_mean(self, column: str, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> float:
+        """Среднее колонки потоковым чтением (в памяти один пакет одной колонки).
+
+        Args:
+            column (str): Имя колонки.
+            files (Optional[List[Tuple[str, pq.ParquetFile]]]): Открытые файлы.
+
+        Returns:
+            float: Среднее без учета null/NaN (как pandas.Series.mean).
+        """
+        total = 0.0
+        count = 0
+        for batch in self._scan(column, files):
+            values = batch.column(0).to_numpy(zero_copy_only=False)
+            finite = ~np.isnan(values)
+            total += float(values[finite].sum())
+            count += int(finite.sum())
+        return total / count if count else np.nan
+
+    def head(self, n: int = 5, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> pd.DataFrame:
+        """Первые строки датасета из первого row group первого файла.
+
+        Args:
+            n (int): Число строк.
+            files (Optional[List[Tuple[str, pq.ParquetFile]]]): Открытые файлы.
+
+        Returns:
+            pd.DataFrame: Первые n строк.
+        """
+        files = files if files is not None else self._parquet_files()
+        for _, pf in files:
+            if pf.metadata.num_row_groups and pf.metadata.num_rows:
+                return pf.read_row_group(0).slice(0, n).to_pandas()
+        return pd.DataFrame()
+
     def get_df(self) -> pd.DataFrame:
         """Возвращает загруженный датафрейм.
 
@@ -68,4 +221,36 @@ class DataExplorer:
         """
         if self.df is None:
             self.load_data()
-        return self.df # type: ignore
\ No newline at end of file
+        return self.df # type: ignore
+
+    def _parquet_files(self) -> List[Tuple[str, pq.ParquetFile]]:
+        """Открывает файл датасета или все части партиционированной папки (только футеры)."""
+        if os.path.isdir(self.file_path):
+            paths = sorted(
+                p for p in glob.glob(os.path.join(self.file_path, "**", "*.parquet"), recursive=True)
+                if not os.path.basename(p).startswith(".")
+            )
+        elif os.path.exists(self.file_path):
+            paths = [self.file_path]
+        else:
+            paths = []
+        return [(p, pq.ParquetFile(p)) for p in paths]
+
+    def _schema(self, files: List[Tuple[str, pq.ParquetFile]]) -> pa.Schema:
+        """Объединенная схема файлов (у тестов разный набор каналов) с ключами hive-партиций."""
+        schema = pa.unify_schemas([pf.schema_arrow for _, pf in files])
+        root = self.file_path if os.path.isdir(self.file_path) else os.path.dirname(self.file_path)
+        keys = dict.fromkeys(
+            key for path, _ in files for key in re.findall(r"([^/\\=]+)=[^/\\]+[/\\]", os.path.relpath(path, root) + os.sep)
+        )
+        for key in keys:
+            if key not in schema.names:
+                schema = schema.append(pa.field(key, pa.string()))
+        return schema
+
+    def _scan(self, column: str, files: Optional[List[Tuple[str, pq.ParquetFile]]] = None) -> Iterator[pa.RecordBatch]:
+        """Потоково читает одну колонку всех файлов пакетами по SCAN_BATCH_ROWS строк."""
+        files = files if files is not None else self._parquet_files()
+        for _, pf in files:
+            if column in pf.schema_arrow.names:
+                yield from pf.iter_batches(batch_size=self.SCAN_BATCH_ROWS, columns=[column])
\ No newline at end of file
@@ -1,13 +1,22 @@
 # src/data_loader.py
 import pandas as pd
+import numpy as np
 import os
+import json
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+from tqdm import tqdm
 from .settings import GlobalConfig
 
 class IMSRawLoader:
     """Загрузчик сырых данных из текстовых файлов NASA IMS."""
 
+    INDEX_FILE: str = "index.json"
+    # Формат имени файла IMS: 2003.10.22.12.06.24
+    TIMESTAMP_FORMAT: str = "%Y.%m.%d.%H.%M.%S"
+    # Позиции разделителей имени и их замена для разбора как ISO 8601
+    _ISO_SEPARATORS: Dict[int, str] = {4: "-", 7: "-", 10: "T", 13: ":", 16: ":"}
+
     def __init__(self, config: GlobalConfig):
         """Инициализация загрузчика.
 
@@ -28,7 +37,7 @@ class IMSRawLoader:
         path = os.path.join(self.config.raw_data_path, test_name)
         if not os.path.exists(path):
             raise FileNotFoundError(f"Путь не найден: {path}")
-        
+
         files = sorted(os.listdir(path))
         return [os.path.join(path, f) for f in files if not f.startswith('.')]
 
@@ -42,11 +51,38 @@ class IMSRawLoader:
             datetime: Объект времени.
         """
         filename = os.path.basename(file_path)
-        return datetime.strptime(filename, "%Y.%m.%d.%H.%M.%S")
+        return datetime.strptime(filename, self.TIMESTAMP_FORMAT)
+
+    def parse_timestamps(self, file_paths: Sequence[str]) -> np.ndarray:
+        """Разбирает метки времени всех файлов теста одним вызовом NumPy.
+
+        Имена переводятся в ISO 8601 заменой разделителей в массиве символов,
+        после чего весь массив разбирается как datetime64 без strptime на файл.
+
+        Args:
+            file_paths (Sequence[str]): Пути к файлам.
+
+        Returns:
+            np.ndarray: Метки времени (datetime64[s]) в порядке file_paths.
+        """
+        if len(file_paths) == 0:
+            return np.empty(0, dtype="datetime64[s]")
+        raw = np.array([os.path.basename(f) for f in file_paths], dtype=str)
+        names = raw.astype("U19")
+        chars = names.view("U1").reshape(len(names), 19)
+        bad = (np.char.str_len(raw) != 19) | (chars[:, list(self._ISO_SEPARATORS)] != ".").any(axis=1)
+        if bad.any():
+            raise ValueError(f"Имя файла не в формате {self.TIMESTAMP_FORMAT}: {file_paths[int(np.argmax(bad))]}")
+        for pos, sep in self._ISO_SEPARATORS.items():
+            chars[:, pos] = sep
+        return names.astype("datetime64[s]")
 
     def load_file_content(self, file_path: str, test_name: str) -> pd.DataFrame:
         """Читает содержимое файла в DataFrame согласно спекам теста.
 
+        Если для файла есть актуальная бинарная копия, данные отображаются
+        в память без разбора текста.
+
         Args:
             file_path (str): Путь к файлу.
             test_name (str): Имя теста для определения колонок.
@@ -55,11 +91,178 @@ class IMSRawLoader:
             pd.DataFrame: Матрица данных файла.
         """
         spec = self.config.experiments[test_name]
+        cached = self._open_cached(file_path, test_name)
+        if cached is not None:
+            return pd.DataFrame(cached, columns=spec.channels, copy=False)
+        return self._parse_text(file_path, test_name)
+
+    def load_file_array(self, file_path: str, test_name: str) -> np.ndarray:
+        """Читает файл как матрицу (samples, channels) в порядке spec.channels.
+
+        При наличии кеша возвращает read-only memmap без копирования данных.
+
+        Args:
+            file_path (str): Путь к файлу.
+            test_name (str): Имя теста для определения колонок.
+
+        Returns:
+            np.ndarray: Матрица сигналов файла.
+        """
+        cached = self._open_cached(file_path, test_name)
+        if cached is not None:
+            return cached
+        return self._parse_text(file_path, test_name).to_numpy()
+
+    def cache_dir(self, test_name: str) -> str:
+        """Возвращает папку бинарного кеша для теста.
+
+        Args:
+            test_name (str): Имя теста.
+
+        Returns:
+            str: Путь к папке с .npy файлами и индексом.
+        """
+        return os.path.join(self.config.cache_path, "raw", test_name)
+
+    def cache_file(self, file_path: str, test_name: str) -> str:
+        """Конвертирует один текстовый файл в .npy, если копии нет или она устарела.
+
+        Запись идет через временный файл, так что прерванная конвертация
+        не оставляет битых копий. Рядом с копией пишется отпечаток исходника
+        (размер, mtime_ns) и тип; он записывается после копии, поэтому
+        прерывание между ними делает копию устаревшей, а не ошибочной.
+        Безопасно вызывать из разных процессов.
+
+        Args:
+            file_path (str): Путь к исходному файлу.
+            test_name (str): Имя теста.
+
+        Returns:
+            str: Путь к бинарной копии.
+        """
+        cached = self._cached_path(file_path, test_name)
+        if cached is not None:
+            return cached
+
+        os.makedirs(self.cache_dir(test_name), exist_ok=True)
+        # Отпечаток снимается до чтения: файл, измененный во время разбора, останется устаревшим
+        signature = self._signature(file_path)
+        data = self._parse_text(file_path, test_name).to_numpy(dtype=self.config.raw_cache_dtype)
+        target = self._npy_path(file_path, test_name)
+        tmp_path = f"{target}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, data)
+        os.replace(tmp_path, target)
+        meta_path = self._meta_path(file_path, test_name)
+        with open(f"{meta_path}.{os.getpid()}.tmp", "w", encoding="utf-8") as fh:
+            json.dump(signature, fh)
+        os.replace(f"{meta_path}.{os.getpid()}.tmp", meta_path)
+        return target
+
+    def write_cache_index(self, test_name: str, files: List[str]) -> str:
+        """Пишет индекс времени кеша: имя файла -> метка времени.
+
+        Args:
+            test_name (str): Имя теста.
+            files (List[str]): Файлы теста в порядке времени.
+
+        Returns:
+            str: Путь к файлу индекса.
+        """
+        out_dir = self.cache_dir(test_name)
+        os.makedirs(out_dir, exist_ok=True)
+        index = {
+            "dtype": self.config.raw_cache_dtype,
+            "channels": self.config.experiments[test_name].channels,
+            "files": [os.path.basename(f) for f in files],
+            "timestamps": np.datetime_as_string(self.parse_timestamps(files)).tolist()
+        }
+        index_path = os.path.join(out_dir, self.INDEX_FILE)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(index, fh)
+        os.replace(index_path + ".tmp", index_path)
+        return index_path
+
+    def build_binary_cache(self, test_name: str, file_list: Optional[List[str]] = None) -> str:
+        """Однократно конвертирует текстовые файлы теста в .npy и пишет индекс.
+
+        Уже сконвертированные и не изменившиеся файлы пропускаются, поэтому
+        повторный вызов стоит лишь нескольких stat.
+
+        Args:
+            test_name (str): Имя теста.
+            file_list (Optional[List[str]]): Файлы для конвертации (по умолчанию все).
+
+        Returns:
+            str: Путь к папке кеша.
+        """
+        files = file_list if file_list is not None else self.get_file_list(test_name)
+        pending = [f for f in files if self._cached_path(f, test_name) is None]
+        for file_path in tqdm(pending, desc=f"Caching {test_name}", disable=not pending):
+            self.cache_file(file_path, test_name)
+
+        self.write_cache_index(test_name, files)
+        return self.cache_dir(test_name)
+
+    def load_cache_index(self, test_name: str) -> Tuple[List[str], np.ndarray]:
+        """Читает индекс бинарного кеша теста.
+
+        Args:
+            test_name (str): Имя теста.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Имена файлов и их метки времени (datetime64[s]).
+        """
+        with open(os.path.join(self.cache_dir(test_name), self.INDEX_FILE), encoding="utf-8") as fh:
+            index = json.load(fh)
+        return index["files"], np.array(index["timestamps"], dtype="datetime64[s]")
+
+    def _parse_text(self, file_path: str, test_name: str) -> pd.DataFrame:
+        """Разбирает исходный текстовый файл IMS (tab-separated)."""
+        spec = self.config.experiments[test_name]
         df = pd.read_csv(file_path, sep='\t', header=None)
-        
+
         if df.shape[1] != spec.column_count:
             # На случай, если в файле есть лишние пустые колонки (бывает в IMS)
             df = df.iloc[:, :spec.column_count]
-            
+
         df.columns = spec.channels
-        return df
\ No newline at end of file
+        return df
+
+    def _npy_path(self, file_path: str, test_name: str) -> str:
+        """Путь к бинарной копии файла."""
+        return os.path.join(self.cache_dir(test_name), os.path.basename(file_path) + ".npy")
+
+    def _meta_path(self, file_path: str, test_name: str) -> str:
+        """Путь к отпечатку исходника бинарной копии."""
+        return os.path.join(self.cache_dir(test_name), os.path.basename(file_path) + ".meta.json")
+
+    def _signature(self, file_path: str) -> Dict[str, object]:
+        """Отпечаток исходного файла и типа копии: размер, mtime_ns, dtype."""
+        st = os.stat(file_path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                "dtype": np.dtype(self.config.raw_cache_dtype).name}
+
+    def _cached_path(self, file_path: str, test_name: str) -> Optional[str]:
+        """Возвращает путь к кешу, если отпечаток совпадает с исходником и raw_cache_dtype.
+
+        Сравнение точное: исходник, замененный файлом с более старым mtime
+        (cp -p, rsync -t), и смена raw_cache_dtype делают копию устаревшей.
+        """
+        npy_path = self._npy_path(file_path, test_name)
+        try:
+            with open(self._meta_path(file_path, test_name), encoding="utf-8") as fh:
+                stored = json.load(fh)
+            if stored == self._signature(file_path) and os.path.exists(npy_path):
+                return npy_path
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _open_cached(self, file_path: str, test_name: str) -> Optional[np.ndarray]:
+        """Отображает бинарную копию файла в память, если кеш включен и актуален."""
+        if not self.config.use_raw_cache:
+            return None
+        npy_path = self._cached_path(file_path, test_name)
+        if npy_path is None:
+            return None
+        return np.load(npy_path, mmap_mode='r')
\ No newline at end of file
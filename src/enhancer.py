@@ -2,11 +2,15 @@
 
 import pandas as pd
 import numpy as np
-from typing import List
+from scipy.signal import lfilter
+from typing import Dict, List, Sequence
 
 class DatasetEnhancer:
     """Класс для обогащения датасета временными признаками."""
 
+    # Служебные колонки, не подлежащие расширению
+    EXCLUDE: List[str] = ['timestamp', 'test_id', 'bearing_id', 'rul', 'health_state']
+
     def __init__(self, df: pd.DataFrame):
         """Инициализация энхансера.
 
@@ -15,40 +19,178 @@ class DatasetEnhancer:
         """
         self.df: pd.DataFrame = df
 
-    def process(self, rolling_window: int = 10) -> pd.DataFrame:
+    def process(self, rolling_window: int = 10, extra_windows: Sequence[int] = (),
+                ewm_spans: Sequence[int] = ()) -> pd.DataFrame:
         """Добавляет скользящие средние и производные для числовых признаков.
 
-        Группировка выполняется по 'sensor_id', чтобы избежать смешивания 
-        статистик разных подшипников.
+        Группировка выполняется по ('test_id', 'bearing_id'), чтобы избежать
+        смешивания статистик разных подшипников и экспериментов. Все признаки
+        обрабатываются одной матрицей NumPy: скользящие средние - через
+        кумулятивные суммы с учетом границ групп, EWM - одним линейным
+        фильтром на группу.
 
         Args:
             rolling_window (int): Размер окна для скользящего среднего.
+            extra_windows (Sequence[int]): Дополнительные окна
+                (колонки '<признак>_rolling_mean_<окно>').
+            ewm_spans (Sequence[int]): Параметры span экспоненциального
+                среднего (колонки '<признак>_ewm_<span>').
 
         Returns:
             pd.DataFrame: Обогащенный датафрейм.
         """
         # Сортировка важна для корректного расчета скользящего окна
-        self.df = self.df.sort_values(['bearing_id', 'timestamp']) ## ИЗМЕНЕНО
-        
-        # Список колонок, которые подлежат расширению
-        exclude: List[str] = ['timestamp', 'test_id', 'bearing_id', 'rul', 'health_state']
-        feature_cols: List[str] = [c for c in self.df.columns if c not in exclude]
-        
-        new_cols_dict: dict = {}
-        
-        for col in feature_cols:
-            group = self.df.groupby('bearing_id')[col]
-            
-            # Скользящее среднее (тренд)
-            new_cols_dict[f"{col}_rolling_mean"] = group.transform(
-                lambda x: x.rolling(window=rolling_window).mean()
-            )
-            
-            # Дифференциал (скорость изменения)
-            new_cols_dict[f"{col}_diff"] = group.diff().fillna(0)
-            
+        keys: List[str] = [c for c in ('test_id', 'bearing_id') if c in self.df.columns]
+        self.df = self.df.sort_values(keys + ['timestamp'])
+
+        feature_cols: List[str] = [c for c in self.df.columns if c not in self.EXCLUDE]
+        values: np.ndarray = self.df[feature_cols].to_numpy(dtype=np.float64)
+        starts: np.ndarray = self._group_starts(self.df, keys)
+
+        rolling: Dict[int, np.ndarray] = {
+            w: self.rolling_mean(values, starts, w)
+            for w in dict.fromkeys([rolling_window, *extra_windows])
+        }
+        diff: np.ndarray = self.diff(values, starts)
+        ewm: Dict[int, np.ndarray] = {s: self.ewm_mean(values, starts, s) for s in ewm_spans}
+
+        new_cols_dict = self.derived_columns(feature_cols, rolling_window, extra_windows, ewm_spans,
+                                             rolling, diff, ewm)
+
         enhanced_df: pd.DataFrame = pd.concat(
-            [self.df, pd.DataFrame(new_cols_dict, index=self.df.index)], 
+            [self.df, pd.DataFrame(new_cols_dict, index=self.df.index)],
             axis=1
         )
-        return enhanced_df
\ No newline at end of file
+        return enhanced_df
+
+    @staticmethod
+    def derived_columns(feature_cols: Sequence[str], rolling_window: int, extra_windows: Sequence[int],
+                        ewm_spans: Sequence[int], rolling: Dict[int, np.ndarray], diff: np.ndarray,
+                        ewm: Dict[int, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Раскладывает матрицы временных признаков по именованным колонкам.
+
+        Args:
+            feature_cols (Sequence[str]): Признаки в порядке столбцов матриц.
+            rolling_window (int): Основное окно скользящего среднего.
+            extra_windows (Sequence[int]): Дополнительные окна.
+            ewm_spans (Sequence[int]): Параметры span EWM.
+            rolling (Dict[int, np.ndarray]): Окно -> матрица скользящих средних.
+            diff (np.ndarray): Матрица разностей.
+            ewm (Dict[int, np.ndarray]): span -> матрица EWM.
+
+        Returns:
+            Dict[str, np.ndarray]: Колонки в порядке выхода process.
+        """
+        new_cols_dict: Dict[str, np.ndarray] = {}
+        for j, col in enumerate(feature_cols):
+            # Скользящее среднее (тренд)
+            new_cols_dict[f"{col}_rolling_mean"] = rolling[rolling_window][:, j]
+            # Дифференциал (скорость изменения)
+            new_cols_dict[f"{col}_diff"] = diff[:, j]
+            for w in extra_windows:
+                new_cols_dict[f"{col}_rolling_mean_{w}"] = rolling[w][:, j]
+            for s in ewm_spans:
+                new_cols_dict[f"{col}_ewm_{s}"] = ewm[s][:, j]
+        return new_cols_dict
+
+    @staticmethod
+    def _group_starts(df: pd.DataFrame, keys: List[str]) -> np.ndarray:
+        """Возвращает индексы строк, с которых начинаются группы отсортированного df."""
+        n = len(df)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        changed = np.zeros(n, dtype=bool)
+        changed[0] = True
+        for key in keys:
+            codes = pd.factorize(df[key])[0]
+            changed[1:] |= codes[1:] != codes[:-1]
+        return np.flatnonzero(changed)
+
+    @staticmethod
+    def _positions(n: int, starts: np.ndarray) -> np.ndarray:
+        """Позиция каждой строки внутри своей группы."""
+        lengths = np.diff(np.append(starts, n))
+        return np.arange(n) - np.repeat(starts, lengths)
+
+    @staticmethod
+    def rolling_mean(values: np.ndarray, starts: np.ndarray, window: int) -> np.ndarray:
+        """Скользящее среднее по строкам внутри групп (как rolling(window).mean()).
+
+        Значение определено, только если все window строк окна лежат в одной
+        группе и не содержат NaN; иначе NaN.
+
+        Args:
+            values (np.ndarray): Матрица признаков (rows, features).
+            starts (np.ndarray): Индексы начала групп.
+            window (int): Размер окна.
+
+        Returns:
+            np.ndarray: Матрица скользящих средних той же формы.
+        """
+        n = values.shape[0]
+        finite = np.isfinite(values)
+        # Центрирование уменьшает величину кумулятивных сумм и ошибку округления
+        filled = np.where(finite, values, 0.0)
+        offset = filled.sum(axis=0) / np.maximum(finite.sum(axis=0), 1)
+        centered = np.where(finite, filled - offset, 0.0)
+
+        csum = np.zeros((n + 1, values.shape[1]))
+        np.cumsum(centered, axis=0, out=csum[1:])
+        ccount = np.zeros((n + 1, values.shape[1]), dtype=np.int64)
+        np.cumsum(finite, axis=0, out=ccount[1:])
+
+        result = np.full(values.shape, np.nan)
+        if n < window:
+            return result
+        end = np.arange(window, n + 1)
+        sums = csum[end] - csum[end - window]
+        counts = ccount[end] - ccount[end - window]
+        valid = (DatasetEnhancer._positions(n, starts)[window - 1:] >= window - 1)[:, None] & (counts == window)
+        result[window - 1:] = np.where(valid, sums / window + offset, np.nan)
+        return result
+
+    @staticmethod
+    def diff(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Разность с предыдущей строкой группы (как diff().fillna(0)).
+
+        Args:
+            values (np.ndarray): Матрица признаков (rows, features).
+            starts (np.ndarray): Индексы начала групп.
+
+        Returns:
+            np.ndarray: Матрица разностей; первая строка группы и NaN -> 0.
+        """
+        result = np.zeros(values.shape)
+        result[1:] = values[1:] - values[:-1]
+        result[starts] = 0.0
+        result[np.isnan(result)] = 0.0
+        return result
+
+    @staticmethod
+    def ewm_mean(values: np.ndarray, starts: np.ndarray, span: int) -> np.ndarray:
+        """Экспоненциальное среднее внутри групп (как ewm(span=span).mean()).
+
+        Используется формула adjust=True: числитель и знаменатель считаются
+        одним рекурсивным фильтром scipy по всем признакам сразу.
+
+        Args:
+            values (np.ndarray): Матрица признаков (rows, features).
+            starts (np.ndarray): Индексы начала групп.
+            span (int): Параметр span (alpha = 2 / (span + 1)).
+
+        Returns:
+            np.ndarray: Матрица экспоненциальных средних той же формы.
+        """
+        decay = 1.0 - 2.0 / (span + 1.0)
+        finite = np.isfinite(values)
+        weighted = np.where(finite, values, 0.0)
+        weights = finite.astype(np.float64)
+
+        result = np.empty(values.shape)
+        bounds = np.append(starts, values.shape[0])
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            num = lfilter([1.0], [1.0, -decay], weighted[lo:hi], axis=0)
+            den = lfilter([1.0], [1.0, -decay], weights[lo:hi], axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result[lo:hi] = np.where(den > 0, num / den, np.nan)
+        return result
\ No newline at end of file
@@ -0,0 +1,140 @@
+# src/feature_cache.py
+
+import os
+import json
+import glob
+import hashlib
+import zipfile
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+class FeatureCache:
+    """Дисковый кеш признаков файла, адресуемый по содержимому входов.
+
+    Ключ записи - хеш от (отпечатка исходного файла, параметров обработки,
+    группы признаков и версий ее признаков). Группы (статистика, спектр)
+    кешируются отдельно, поэтому изменение одной группы пересчитывает только
+    ее, а файл с полностью закешированными группами даже не читается.
+    Записи вытесняются по LRU (время последнего обращения хранится в mtime)
+    при превышении лимита размера.
+    """
+
+    DIR_NAME: str = "features"
+
+    def __init__(self, cache_path: str, max_bytes: Optional[int] = None, key_mode: str = "stat"):
+        """Инициализация кеша.
+
+        Args:
+            cache_path (str): Корень кеша (GlobalConfig.cache_path).
+            max_bytes (Optional[int]): Лимит размера кеша (None - без лимита).
+            key_mode (str): Отпечаток файла: "stat" (путь, размер, mtime) или
+                "content" (хеш содержимого; переименование файла не сбрасывает кеш).
+        """
+        if key_mode not in ("stat", "content"):
+            raise ValueError(f"Неизвестный режим ключа кеша признаков: {key_mode}")
+        self.root = os.path.join(cache_path, self.DIR_NAME)
+        self.max_bytes = max_bytes
+        self.key_mode = key_mode
+
+    def file_digest(self, file_path: str) -> str:
+        """Отпечаток исходного файла.
+
+        Args:
+            file_path (str): Путь к файлу.
+
+        Returns:
+            str: Хеш-строка.
+        """
+        if self.key_mode == "content":
+            digest = hashlib.blake2b(digest_size=20)
+            with open(file_path, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    digest.update(block)
+            return digest.hexdigest()
+        stat = os.stat(file_path)
+        return _hash([os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns])
+
+    def entry_key(self, file_digest: str, group: str, versions: Dict[str, int], params: Dict[str, Any]) -> str:
+        """Ключ записи группы признаков файла.
+
+        Args:
+            file_digest (str): Отпечаток файла (file_digest).
+            group (str): Имя группы признаков.
+            versions (Dict[str, int]): Признак -> версия формулы.
+            params (Dict[str, Any]): Параметры обработки (окно, каналы, движок...).
+
+        Returns:
+            str: Хеш-ключ записи.
+        """
+        return _hash({"file": file_digest, "group": group, "versions": versions, "params": params})
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Читает запись и отмечает обращение (для LRU).
+
+        Args:
+            key (str): Ключ записи.
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: Признак -> массив или None при промахе.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # Нет записи или она повреждена (например, прерванная запись)
+            return None
+        return arrays
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Атомарно записывает запись (безопасно при записи из нескольких процессов).
+
+        Args:
+            key (str): Ключ записи.
+            arrays (Dict[str, np.ndarray]): Признак -> массив.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> Tuple[int, int]:
+        """Удаляет давно не использованные записи, пока кеш больше лимита.
+
+        Returns:
+            Tuple[int, int]: (число удаленных записей, освобожденные байты).
+        """
+        if self.max_bytes is None:
+            return 0, 0
+        entries = []
+        for path in glob.glob(os.path.join(self.root, "*", "*.npz")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def _path(self, key: str) -> str:
+        """Путь записи: подпапка по первым символам ключа ограничивает размер папок."""
+        return os.path.join(self.root, key[:2], f"{key}.npz")
+
+def _hash(payload: Any) -> str:
+    """Стабильный хеш JSON-представления."""
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=20).hexdigest()
\ No newline at end of file
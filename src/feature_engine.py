@@ -1,12 +1,25 @@
 # src/feature_engine.py
 
 import numpy as np
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
 from scipy.stats import kurtosis, skew
-from typing import Dict
+from typing import Dict, Tuple
 
 class FeatureCalculator:
     """Расчет статистических и физических признаков для окна сигнала."""
 
+    # Порядок признаков совпадает с порядком ключей calculate_all
+    FEATURE_NAMES: Tuple[str, ...] = (
+        "mean", "std", "rms", "peak", "skewness", "kurtosis",
+        "crest_factor", "peak_to_peak", "clearance_factor"
+    )
+    # Версии формул признаков: увеличивать при изменении расчета признака
+    # (ключ кеша признаков и отпечаток датасета зависят от них)
+    FEATURE_VERSIONS: Dict[str, int] = {name: 1 for name in FEATURE_NAMES}
+    # Окно считается вырожденным в calculate_running, если дисперсия меньше
+    # этой доли среднего квадрата (ошибка разности бегущих сумм ~1e-15)
+    RUNNING_VAR_RTOL: float = 1e-12
+
     @staticmethod
     def calculate_all(signal: np.ndarray) -> Dict[str, float]:
         """Считает базовый набор признаков для вектора данных.
@@ -44,4 +57,106 @@ class FeatureCalculator:
 
         mean_sqrt = float(np.mean(np.sqrt(np.abs(signal)))**2)
 
-        return float(peak / mean_sqrt) if mean_sqrt != 0 else 0.0
\ No newline at end of file
+        return float(peak / mean_sqrt) if mean_sqrt != 0 else 0.0
+
+    @staticmethod
+    def degenerate(mean: np.ndarray, m2: np.ndarray) -> np.ndarray:
+        """Маска вырожденных (почти постоянных) окон: тот же критерий, что и в scipy.stats.
+
+        Args:
+            mean (np.ndarray): Средние окон.
+            m2 (np.ndarray): Вторые центральные моменты окон.
+
+        Returns:
+            np.ndarray: True там, где дисперсия неотличима от ошибки округления.
+        """
+        return m2 <= (np.finfo(np.float64).eps * mean) ** 2
+
+    @staticmethod
+    def calculate_batch(windows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Считает все признаки сразу для пачки окон (векторизованно).
+
+        Обертка над реестром признаков (feature_registry.compute_features) -
+        тем же путем, которым признаки считает FileProcessor. Промежуточные
+        величины (центрированный сигнал, его квадрат, модуль) считаются один
+        раз и переиспользуются всеми признаками. Результат совпадает с
+        calculate_all в пределах точности float64.
+
+        Args:
+            windows (np.ndarray): Окна формы (n_windows, win_len) или
+                (channels, n_windows, win_len), например из segment_signal.
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы windows.shape[:-1].
+        """
+        from .feature_registry import FeatureContext, compute_features
+        if windows.ndim not in (2, 3):
+            raise ValueError(f"Ожидается 2D или 3D массив окон, получено: {windows.shape}")
+        # Базовым признакам частота дискретизации не нужна
+        return compute_features(FeatureContext(windows, 0), FeatureCalculator.FEATURE_NAMES)
+
+    @staticmethod
+    def calculate_running(signals: np.ndarray, length: int, step: int) -> Dict[str, np.ndarray]:
+        """Считает признаки перекрывающихся окон за линейное по длине сигнала время.
+
+        Суммы степеней сигнала по окнам берутся разностями кумулятивных сумм,
+        центральные моменты восстанавливаются из них; максимум и минимум окна
+        считаются скользящими фильтрами. Стоимость не зависит от перекрытия,
+        тогда как calculate_batch на stride view растет как length / step.
+        Результат совпадает с calculate_batch в пределах ~1e-9 (относительно;
+        наибольшая ошибка у kurtosis).
+
+        Args:
+            signals (np.ndarray): Сигналы формы (samples,) или (channels, samples).
+            length (int): Длина окна.
+            step (int): Шаг между окнами.
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы signals.shape[:-1] + (n_windows,).
+        """
+        x = np.asarray(signals, dtype=np.float64)
+        n_samples = x.shape[-1]
+        if n_samples < length:
+            return {name: np.empty(x.shape[:-1] + (0,)) for name in FeatureCalculator.FEATURE_NAMES}
+        starts = np.arange(0, n_samples - length + 1, step)
+
+        def window_means(values: np.ndarray) -> np.ndarray:
+            """Средние по окнам через разность кумулятивных сумм."""
+            csum = np.zeros(values.shape[:-1] + (n_samples + 1,))
+            np.cumsum(values, axis=-1, out=csum[..., 1:])
+            return (csum[..., starts + length] - csum[..., starts]) / length
+
+        # Сдвиг на среднее сигнала уменьшает потерю точности в разностях сумм
+        shift = x.mean(axis=-1, keepdims=True)
+        y = x - shift
+        y2 = y * y
+        s1 = window_means(y)
+        s2 = window_means(y2)
+        s3 = window_means(y2 * y)
+        s4 = window_means(y2 * y2)
+
+        m2 = np.maximum(s2 - s1**2, 0.0)
+        mean = s1 + shift
+        mean_sq = np.maximum(s2 + 2.0 * shift * s1 + shift**2, 0.0)
+
+        # Скользящий фильтр с центром в starts + length // 2 покрывает [start, start + length)
+        w_max = maximum_filter1d(x, length, axis=-1)[..., starts + length // 2]
+        w_min = minimum_filter1d(x, length, axis=-1)[..., starts + length // 2]
+
+        # Формулы признаков берутся из реестра; ему передаются промежуточные
+        # величины из бегущих сумм вместо расчета по окнам
+        from .feature_registry import FeatureContext, compute_features
+        ctx = FeatureContext.from_values(length, {
+            "mean": mean,
+            "m2": m2,
+            "m3": s3 - 3.0 * s1 * s2 + 2.0 * s1**3,
+            "m4": s4 - 4.0 * s1 * s3 + 6.0 * s1**2 * s2 - 3.0 * s1**4,
+            "rms": np.sqrt(mean_sq),
+            "max": w_max,
+            "min": w_min,
+            "mean_sqrt_abs": window_means(np.sqrt(np.abs(x))) ** 2,
+            # Разность бегущих сумм оставляет ошибку ~1e-15 от среднего квадрата
+            "degenerate": FeatureCalculator.degenerate(mean, m2)
+                          | (m2 <= FeatureCalculator.RUNNING_VAR_RTOL * mean_sq)
+        })
+        return compute_features(ctx, FeatureCalculator.FEATURE_NAMES)
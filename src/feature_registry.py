@@ -0,0 +1,358 @@
+# src/feature_registry.py
+
+import numpy as np
+from dataclasses import dataclass
+from scipy.fft import ifft, rfft
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from .settings import BearingGeometry
+from .feature_engine import FeatureCalculator
+from .spectral_engine import SpectralCalculator
+
+FeatureOutput = Union[np.ndarray, Dict[str, np.ndarray]]
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Описание признака реестра."""
+    name: str
+    # Промежуточные величины, которые нужны признаку (считаются один раз на пачку)
+    requires: Tuple[str, ...]
+    # Функция ctx -> массив (выход с именем name) или словарь выходов
+    compute: Callable[["FeatureContext"], FeatureOutput]
+    # Версия формулы: увеличивать при изменении расчета
+    version: int = 1
+
+# Имя промежуточной величины -> (зависимости, функция ctx -> массив)
+INTERMEDIATES: Dict[str, Tuple[Tuple[str, ...], Callable[["FeatureContext"], Any]]] = {}
+# Имя признака -> описание
+FEATURES: Dict[str, FeatureSpec] = {}
+
+def intermediate(name: str, requires: Sequence[str] = ()) -> Callable:
+    """Декоратор регистрации промежуточной величины."""
+    def register(func: Callable[["FeatureContext"], Any]) -> Callable:
+        INTERMEDIATES[name] = (tuple(requires), func)
+        return func
+    return register
+
+def feature(name: str, requires: Sequence[str] = (), version: int = 1) -> Callable:
+    """Декоратор регистрации признака."""
+    def register(func: Callable[["FeatureContext"], FeatureOutput]) -> Callable:
+        FEATURES[name] = FeatureSpec(name, tuple(requires), func, version)
+        return func
+    return register
+
+class FeatureContext:
+    """Ленивый кеш промежуточных величин для одной пачки окон.
+
+    Каждая величина считается при первом обращении ctx[name] и дальше
+    переиспользуется всеми признаками, поэтому стоимость набора признаков
+    определяется числом уникальных промежуточных величин.
+    """
+
+    def __init__(self, windows: np.ndarray, sampling_rate: int, fft_workers: Optional[int] = None,
+                 bands: Sequence[Tuple[float, float]] = (), geometry: Optional[BearingGeometry] = None,
+                 envelope_band: Optional[Tuple[float, float]] = None):
+        """Инициализация контекста.
+
+        Args:
+            windows (np.ndarray): Окна формы (..., win_len).
+            sampling_rate (int): Частота дискретизации (Гц).
+            fft_workers (Optional[int]): Число потоков scipy.fft.
+            bands (Sequence[Tuple[float, float]]): Полосы для band_energy (Гц).
+            geometry (Optional[BearingGeometry]): Геометрия для частот дефектов.
+            envelope_band (Optional[Tuple[float, float]]): Полоса демодуляции
+                огибающей (Гц); None - вся полоса.
+        """
+        self.windows = windows
+        self.n: int = windows.shape[-1]
+        self.sampling_rate = sampling_rate
+        self.fft_workers = fft_workers
+        self.bands: List[Tuple[float, float]] = [tuple(b) for b in bands]  # type: ignore[misc]
+        self.geometry = geometry if geometry is not None else BearingGeometry()
+        self.envelope_band = envelope_band
+        self.values: Dict[str, Any] = {}
+
+    @classmethod
+    def from_values(cls, n: int, values: Dict[str, Any], sampling_rate: int = 0) -> "FeatureContext":
+        """Контекст без окон с заранее посчитанными промежуточными величинами.
+
+        Признаки берут переданные величины вместо расчета по окнам (например,
+        моменты из бегущих сумм calculate_running); признак, которому нужна
+        не переданная величина, этим контекстом не считается.
+
+        Args:
+            n (int): Длина окна.
+            values (Dict[str, Any]): Имя промежуточной величины -> массив.
+            sampling_rate (int): Частота дискретизации (Гц).
+        """
+        ctx = cls(np.empty((0, n)), sampling_rate)
+        ctx.values.update(values)
+        return ctx
+
+    def __getitem__(self, name: str) -> Any:
+        """Возвращает промежуточную величину, вычисляя ее (и зависимости) при первом обращении."""
+        if name not in self.values:
+            requires, func = INTERMEDIATES[name]
+            for dep in requires:
+                self[dep]
+            self.values[name] = func(self)
+        return self.values[name]
+
+def compute_features(ctx: FeatureContext, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Считает выбранные признаки реестра на общем контексте.
+
+    Args:
+        ctx (FeatureContext): Контекст пачки окон.
+        names (Sequence[str]): Имена признаков в порядке выходных колонок.
+
+    Returns:
+        Dict[str, np.ndarray]: Выход -> массив формы windows.shape[:-1].
+    """
+    unknown = [n for n in names if n not in FEATURES]
+    if unknown:
+        raise ValueError(f"Неизвестные признаки: {unknown}. Доступны: {sorted(FEATURES)}")
+    result: Dict[str, np.ndarray] = {}
+    for name in names:
+        spec = FEATURES[name]
+        for dep in spec.requires:
+            ctx[dep]
+        out = spec.compute(ctx)
+        if isinstance(out, dict):
+            result.update(out)
+        else:
+            result[name] = out
+    return result
+
+def feature_versions(names: Sequence[str]) -> Dict[str, int]:
+    """Версии формул выбранных признаков (для ключей кеша и отпечатка датасета)."""
+    return {name: FEATURES[name].version for name in names}
+
+def feature_column(feature_name: str, channel: str) -> str:
+    """Имя колонки признака канала: суффикс оси (B1_x -> rms_x), без суффикса для B1."""
+    return f"{feature_name}_{channel[-1]}" if "_" in channel else feature_name
+
+################################################################################
+# ПРОМЕЖУТОЧНЫЕ ВЕЛИЧИНЫ
+################################################################################
+
+@intermediate("x")
+def _x(ctx: FeatureContext) -> np.ndarray:
+    """Окна в float64."""
+    return np.asarray(ctx.windows, dtype=np.float64)
+
+@intermediate("mean", ("x",))
+def _mean(ctx: FeatureContext) -> np.ndarray:
+    """Среднее окна."""
+    return ctx["x"].mean(axis=-1)
+
+@intermediate("centered", ("x", "mean"))
+def _centered(ctx: FeatureContext) -> np.ndarray:
+    """Центрированный сигнал."""
+    return ctx["x"] - ctx["mean"][..., None]
+
+@intermediate("centered_sq", ("centered",))
+def _centered_sq(ctx: FeatureContext) -> np.ndarray:
+    """Квадрат центрированного сигнала."""
+    centered = ctx["centered"]
+    return centered * centered
+
+@intermediate("m2", ("centered_sq",))
+def _m2(ctx: FeatureContext) -> np.ndarray:
+    """Второй центральный момент."""
+    return ctx["centered_sq"].mean(axis=-1)
+
+@intermediate("m3", ("centered", "centered_sq"))
+def _m3(ctx: FeatureContext) -> np.ndarray:
+    """Третий центральный момент (einsum без временного массива)."""
+    return np.einsum("...i,...i->...", ctx["centered_sq"], ctx["centered"]) / ctx.n
+
+@intermediate("m4", ("centered_sq",))
+def _m4(ctx: FeatureContext) -> np.ndarray:
+    """Четвертый центральный момент."""
+    sq = ctx["centered_sq"]
+    return np.einsum("...i,...i->...", sq, sq) / ctx.n
+
+@intermediate("degenerate", ("mean", "m2"))
+def _degenerate(ctx: FeatureContext) -> np.ndarray:
+    """Вырожденные окна (тот же критерий, что и в scipy.stats)."""
+    return FeatureCalculator.degenerate(ctx["mean"], ctx["m2"])
+
+@intermediate("rms", ("x",))
+def _rms(ctx: FeatureContext) -> np.ndarray:
+    """Среднеквадратичное значение (сумма квадратов без центрирования)."""
+    x = ctx["x"]
+    return np.sqrt(np.einsum("...i,...i->...", x, x) / ctx.n)
+
+@intermediate("max", ("x",))
+def _max(ctx: FeatureContext) -> np.ndarray:
+    """Максимум окна."""
+    return ctx["x"].max(axis=-1)
+
+@intermediate("min", ("x",))
+def _min(ctx: FeatureContext) -> np.ndarray:
+    """Минимум окна."""
+    return ctx["x"].min(axis=-1)
+
+@intermediate("peak", ("max", "min"))
+def _peak(ctx: FeatureContext) -> np.ndarray:
+    """Максимум модуля окна по экстремумам (без прохода по |x|)."""
+    return np.maximum(ctx["max"], -ctx["min"])
+
+@intermediate("abs", ("x",))
+def _abs(ctx: FeatureContext) -> np.ndarray:
+    """Модуль сигнала."""
+    return np.abs(ctx["x"])
+
+@intermediate("mean_sqrt_abs", ("abs",))
+def _mean_sqrt_abs(ctx: FeatureContext) -> np.ndarray:
+    """Квадрат среднего sqrt(|x|) (знаменатель clearance factor)."""
+    return np.sqrt(ctx["abs"]).mean(axis=-1) ** 2
+
+@intermediate("spectrum", ("x",))
+def _spectrum(ctx: FeatureContext) -> np.ndarray:
+    """Комплексный спектр rfft окон."""
+    return np.asarray(rfft(ctx["x"], axis=-1, workers=ctx.fft_workers))
+
+@intermediate("psd", ("spectrum",))
+def _psd(ctx: FeatureContext) -> np.ndarray:
+    """Спектр мощности без DC бина (эквивалент детрендирования окна)."""
+    yf = ctx["spectrum"]
+    psd = np.square(yf.real) + np.square(yf.imag)
+    psd[..., 0] = 0.0
+    return psd
+
+@intermediate("psd_sum", ("psd",))
+def _psd_sum(ctx: FeatureContext) -> np.ndarray:
+    """Суммарная мощность спектра окна."""
+    return ctx["psd"].sum(axis=-1)
+
+@intermediate("freqs")
+def _freqs(ctx: FeatureContext) -> np.ndarray:
+    """Ось частот rfft (Гц)."""
+    return SpectralCalculator.frequency_grid(ctx.n, ctx.sampling_rate)
+
+@intermediate("envelope", ("spectrum", "freqs"))
+def _envelope(ctx: FeatureContext) -> np.ndarray:
+    """Огибающая: модуль аналитического сигнала (преобразование Гильберта).
+
+    Аналитический спектр строится из общего rfft окон, поэтому прямое БПФ
+    не повторяется. Без полосы демодуляции результат совпадает с
+    abs(scipy.signal.hilbert(x - mean)).
+    """
+    n = ctx.n
+    spectrum = ctx["spectrum"]
+    half = spectrum.shape[-1]
+    analytic = np.zeros(spectrum.shape[:-1] + (n,), dtype=np.complex128)
+    analytic[..., :half] = spectrum
+    analytic[..., 0] = 0.0
+    analytic[..., 1:(n + 1) // 2] *= 2.0
+    if ctx.envelope_band is not None:
+        low, high = ctx.envelope_band
+        freqs = ctx["freqs"]
+        analytic[..., :half][..., (freqs < low) | (freqs >= high)] = 0.0
+    return np.abs(ifft(analytic, axis=-1, workers=ctx.fft_workers))
+
+@intermediate("envelope_psd", ("envelope",))
+def _envelope_psd(ctx: FeatureContext) -> np.ndarray:
+    """Спектр мощности огибающей без DC бина."""
+    yf = np.asarray(rfft(ctx["envelope"], axis=-1, workers=ctx.fft_workers))
+    psd = np.square(yf.real) + np.square(yf.imag)
+    psd[..., 0] = 0.0
+    return psd
+
+################################################################################
+# ПРИЗНАКИ (формулы совпадают с FeatureCalculator / SpectralCalculator)
+################################################################################
+
+_BASE_VERSIONS = FeatureCalculator.FEATURE_VERSIONS
+_SPECTRAL_VERSIONS = SpectralCalculator.FEATURE_VERSIONS
+
+@feature("mean", ("mean",), _BASE_VERSIONS["mean"])
+def _f_mean(ctx: FeatureContext) -> np.ndarray:
+    """Среднее."""
+    return ctx["mean"]
+
+@feature("std", ("m2", "degenerate"), _BASE_VERSIONS["std"])
+def _f_std(ctx: FeatureContext) -> np.ndarray:
+    """СКО; остаток ошибки округления в вырожденном окне не выдается за разброс."""
+    return np.where(ctx["degenerate"], 0.0, np.sqrt(ctx["m2"]))
+
+@feature("rms", ("rms",), _BASE_VERSIONS["rms"])
+def _f_rms(ctx: FeatureContext) -> np.ndarray:
+    """Среднеквадратичное значение."""
+    return ctx["rms"]
+
+@feature("peak", ("peak",), _BASE_VERSIONS["peak"])
+def _f_peak(ctx: FeatureContext) -> np.ndarray:
+    """Максимум модуля."""
+    return ctx["peak"]
+
+@feature("skewness", ("m2", "m3", "degenerate"), _BASE_VERSIONS["skewness"])
+def _f_skewness(ctx: FeatureContext) -> np.ndarray:
+    """Асимметрия (NaN у вырожденного окна)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ctx["degenerate"], np.nan, ctx["m3"] / ctx["m2"]**1.5)
+
+@feature("kurtosis", ("m2", "m4", "degenerate"), _BASE_VERSIONS["kurtosis"])
+def _f_kurtosis(ctx: FeatureContext) -> np.ndarray:
+    """Эксцесс по Фишеру (NaN у вырожденного окна)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ctx["degenerate"], np.nan, ctx["m4"] / ctx["m2"]**2) - 3.0
+
+@feature("crest_factor", ("peak", "rms"), _BASE_VERSIONS["crest_factor"])
+def _f_crest_factor(ctx: FeatureContext) -> np.ndarray:
+    """Пик-фактор."""
+    rms = ctx["rms"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rms != 0, ctx["peak"] / rms, 0.0)
+
+@feature("peak_to_peak", ("max", "min"), _BASE_VERSIONS["peak_to_peak"])
+def _f_peak_to_peak(ctx: FeatureContext) -> np.ndarray:
+    """Размах."""
+    return ctx["max"] - ctx["min"]
+
+@feature("clearance_factor", ("peak", "mean_sqrt_abs"), _BASE_VERSIONS["clearance_factor"])
+def _f_clearance_factor(ctx: FeatureContext) -> np.ndarray:
+    """Clearance factor."""
+    mean_sqrt = ctx["mean_sqrt_abs"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mean_sqrt != 0, ctx["peak"] / mean_sqrt, 0.0)
+
+@feature("spectral_centroid", ("psd", "psd_sum", "freqs"), _SPECTRAL_VERSIONS["spectral_centroid"])
+def _f_spectral_centroid(ctx: FeatureContext) -> np.ndarray:
+    """Центроид спектра мощности (Гц)."""
+    sum_psd = ctx["psd_sum"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(sum_psd != 0, (ctx["psd"] @ ctx["freqs"]) / sum_psd, 0.0)
+
+@feature("spectral_energy", ("psd_sum",), _SPECTRAL_VERSIONS["spectral_energy"])
+def _f_spectral_energy(ctx: FeatureContext) -> np.ndarray:
+    """Энергия спектра, нормированная на длину окна."""
+    sum_psd = ctx["psd_sum"]
+    return np.where(sum_psd != 0, sum_psd / ctx.n, 0.0)
+
+@feature("band_energy", ("psd", "freqs"))
+def _f_band_energy(ctx: FeatureContext) -> Dict[str, np.ndarray]:
+    """Энергия спектра в полосах ctx.bands (нормировка как у spectral_energy)."""
+    freqs = ctx["freqs"]
+    result: Dict[str, np.ndarray] = {}
+    for low, high in ctx.bands:
+        mask = (freqs >= low) & (freqs < high)
+        result[f"band_energy_{low:g}_{high:g}"] = ctx["psd"][..., mask].sum(axis=-1) / ctx.n
+    return result
+
+@feature("envelope_defects", ("envelope_psd", "freqs"))
+def _f_envelope_defects(ctx: FeatureContext) -> Dict[str, np.ndarray]:
+    """Доля энергии спектра огибающей у частот дефектов (BPFO, BPFI, BSF, FTF).
+
+    Берутся бины в пределах одного шага сетки частот от частоты дефекта.
+    """
+    psd = ctx["envelope_psd"]
+    freqs = ctx["freqs"]
+    resolution = ctx.sampling_rate / ctx.n
+    total = psd.sum(axis=-1)
+    result: Dict[str, np.ndarray] = {}
+    for name, freq in ctx.geometry.defect_frequencies().items():
+        mask = np.abs(freqs - freq) <= resolution
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[f"env_{name}"] = np.where(total != 0, psd[..., mask].sum(axis=-1) / total, 0.0)
+    return result
\ No newline at end of file
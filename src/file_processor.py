@@ -0,0 +1,375 @@
+# src/file_processor.py
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .settings import GlobalConfig
+from .data_loader import IMSRawLoader
+from .feature_engine import FeatureCalculator
+from .spectral_engine import SpectralCalculator
+from .windowing import segment_signal
+from .profiler import StageProfiler
+from .feature_cache import FeatureCache
+from .feature_registry import FEATURES, FeatureContext, compute_features, feature_column, feature_versions
+from .labeling import RULLabeler
+from .raw_store import RawSignalStore
+from .prefetch import PrefetchReader
+from .native_threads import limit_native_threads
+
+@dataclass
+class FileFeatures:
+    """Колоночный результат обработки одного файла IMS."""
+    file_path: str
+    test_id: str
+    timestamp: datetime
+    # bearing_id, rul, health_state и признаки: по одному элементу на окно
+    columns: Dict[str, np.ndarray]
+    # Время этапов и счетчики обработки файла (только при config.profile)
+    profile: Optional[Dict[str, Any]] = None
+
+@dataclass
+class FileInput:
+    """Прочитанный файл IMS перед расчетом признаков (FileProcessor.read)."""
+    file_path: str
+    test_id: str
+    timestamp: datetime
+    # Группа признаков -> значения из кеша (None - группу нужно посчитать)
+    groups: Dict[str, Optional[Dict[str, np.ndarray]]]
+    # Группа признаков -> ключ кеша признаков
+    keys: Dict[str, str]
+    # Сигналы (channels, samples) в float64; None - все группы взяты из кеша
+    signals: Optional[np.ndarray]
+    # Профайлер файла: этапы чтения и расчета попадают в один отчет
+    profiler: StageProfiler
+
+class FileProcessor:
+    """Полная обработка одного файла: загрузка -> окна -> признаки -> RUL."""
+
+    def __init__(self, config: GlobalConfig):
+        """Инициализация обработчика.
+
+        Args:
+            config (GlobalConfig): Объект конфигурации.
+        """
+        self.config = config
+        self.loader = IMSRawLoader(config)
+        self.labeler = RULLabeler(config)
+        # Тест -> открытое хранилище сырых сигналов (None - хранилища нет)
+        self._raw_stores: Dict[str, Optional[RawSignalStore]] = {}
+        # Опережающее чтение последнего последовательного прогона (iter_jobs)
+        self.reader: Optional[PrefetchReader] = None
+        self.calc = FeatureCalculator()
+        self.calc_spec = SpectralCalculator()
+        # torch импортируется только при выборе этого движка
+        self.torch_engine = None
+        if config.feature_backend == "torch":
+            from .torch_engine import TorchFeatureEngine
+            self.torch_engine = TorchFeatureEngine(config.torch_device, config.torch_threads, config.torch_dtype)
+        elif config.feature_backend != "numpy":
+            raise ValueError(f"Неизвестный движок признаков: {config.feature_backend}")
+
+        # Группы признаков (считаются и кешируются независимо) в порядке колонок
+        self.feature_groups: Dict[str, List[str]] = {
+            "features": list(FeatureCalculator.FEATURE_NAMES),
+            "spectral": list(SpectralCalculator.FEATURE_VERSIONS)
+        }
+        if config.extra_features:
+            unknown = [name for name in config.extra_features if name not in FEATURES]
+            if unknown:
+                raise ValueError(f"Неизвестные признаки: {unknown}. Доступны: {sorted(FEATURES)}")
+            self.feature_groups["extra"] = list(config.extra_features)
+
+        self.feature_cache: Optional[FeatureCache] = None
+        if config.use_feature_cache:
+            max_bytes = None if config.feature_cache_max_mb is None else int(config.feature_cache_max_mb * 2**20)
+            self.feature_cache = FeatureCache(config.cache_path, max_bytes, config.feature_cache_key)
+
+    def process(self, file_path: str, test_name: str) -> FileFeatures:
+        """Считает признаки и разметку для всех окон всех подшипников файла.
+
+        Args:
+            file_path (str): Путь к файлу.
+            test_name (str): Имя теста.
+
+        Returns:
+            FileFeatures: Колонки результата; строки идут по подшипникам,
+                внутри подшипника - по окнам.
+        """
+        return self.compute(self.read(file_path, test_name))
+
+    def read(self, file_path: str, test_name: str) -> FileInput:
+        """Этап ввода-вывода: признаки из кеша и сигналы файла, если их нужно считать.
+
+        Не меняет состояние обработчика, кроме ленивого открытия RawSignalStore,
+        поэтому может выполняться в потоке чтения (PrefetchReader), пока
+        основной поток считает признаки предыдущего файла.
+
+        Args:
+            file_path (str): Путь к файлу.
+            test_name (str): Имя теста.
+
+        Returns:
+            FileInput: Прочитанный файл для compute.
+        """
+        config = self.config
+        ts = self.loader.parse_timestamp(file_path)
+        # Профайлер на файл: отчет уходит вместе с результатом, в том числе из пула процессов
+        prof = StageProfiler(enabled=config.profile)
+
+        # Группы признаков из кеша; сырой файл читается, только если хотя бы
+        # одной группы (или ее актуальной версии) в кеше нет
+        groups: Dict[str, Optional[Dict[str, np.ndarray]]] = dict.fromkeys(self.feature_groups)
+        keys: Dict[str, str] = {}
+        if self.feature_cache is not None:
+            with prof.stage("feature_cache"):
+                keys = self._cache_keys(file_path, test_name)
+                for group in groups:
+                    groups[group] = self.feature_cache.load(keys[group])
+            prof.count("feature_cache_hits", sum(f is not None for f in groups.values()))
+
+        signals: Optional[np.ndarray] = None
+        if any(f is None for f in groups.values()):
+            # Файл из консолидированного хранилища теста - срез одного отображенного массива
+            data = self._stored_array(file_path, test_name) if config.use_raw_store else None
+            # Однократная конвертация текста в бинарный кеш; далее файл читается через memmap
+            if data is None and config.use_raw_cache:
+                with prof.stage("cache"):
+                    self.loader.cache_file(file_path, test_name)
+            # Копия в float64 входит в этап загрузки: при memmap именно здесь читается диск
+            with prof.stage("load"):
+                if data is None:
+                    data = self.loader.load_file_array(file_path, test_name)
+                signals = np.ascontiguousarray(data.T, dtype=np.float64)
+            prof.count("bytes_read", data.nbytes)
+
+        return FileInput(file_path=file_path, test_id=test_name, timestamp=ts, groups=groups,
+                         keys=keys, signals=signals, profiler=prof)
+
+    def compute(self, inp: FileInput) -> FileFeatures:
+        """Вычислительный этап: признаки недостающих групп, разметка и сборка колонок.
+
+        Args:
+            inp (FileInput): Результат read.
+
+        Returns:
+            FileFeatures: Колонки результата; строки идут по подшипникам,
+                внутри подшипника - по окнам.
+        """
+        config = self.config
+        test_name, ts, prof = inp.test_id, inp.timestamp, inp.profiler
+        spec = config.experiments[test_name]
+        groups, keys, signals = inp.groups, inp.keys, inp.signals
+
+        missing = [group for group, f in groups.items() if f is None]
+        if missing:
+            assert signals is not None
+            if self.feature_cache is not None:
+                prof.count("feature_cache_misses", len(missing))
+
+            # 1. Нарезка всех каналов файла на окна одним stride view:
+            # (channels, samples) -> (channels, n_windows, win_len)
+            if self.torch_engine is not None:
+                windows = self.torch_engine.segment(signals, config.window.length, config.window.step)
+            else:
+                windows = segment_signal(signals, config.window.length, config.window.step)
+
+            # 2. Группы признаков сразу для всех окон всех каналов; промежуточные
+            # величины реестра (спектр, огибающая...) общие для всех групп файла
+            ctx = self._feature_context(windows, signals)
+            for group in missing:
+                with prof.stage(group):
+                    groups[group] = self._compute_group(group, windows, signals, ctx)
+                if self.feature_cache is not None:
+                    self.feature_cache.store(keys[group], groups[group])  # type: ignore[arg-type]
+
+        features = {k: a for f in groups.values() for k, a in f.items()}  # type: ignore[union-attr]
+        n_channels, n_windows = features["mean"].shape
+        prof.count("files")
+        prof.count("windows", n_channels * n_windows)
+        ch_index = {ch: i for i, ch in enumerate(spec.channels)}
+
+        # 3. RUL и Health State всех подшипников файла (одинаковы для всех окон файла)
+        with prof.stage("label"):
+            file_ruls, file_states = self.labeler.label(test_name, np.array([ts], dtype="datetime64[us]"))
+
+        # Сборка колонок результата по подшипникам
+        with prof.stage("assemble"):
+            bearing_ids: List[np.ndarray] = []
+            ruls: List[np.ndarray] = []
+            states: List[np.ndarray] = []
+            feature_blocks: List[Dict[str, np.ndarray]] = []
+
+            for j, b_name in enumerate(spec.bearing_names):
+                # Сбор колонок признаков по всем каналам подшипника
+                b_columns: Dict[str, np.ndarray] = {}
+                for ch_name in spec.bearing_to_channels[b_name]:
+                    i = ch_index[ch_name]
+                    # Добавление суффикса канала (например, _x или _y)
+                    for k, a in features.items():
+                        b_columns[feature_column(k, ch_name)] = a[i]
+
+                bearing_ids.append(np.full(n_windows, b_name))
+                ruls.append(np.full(n_windows, file_ruls[0, j], dtype=np.float64))
+                states.append(np.full(n_windows, file_states[0, j], dtype=np.int64))
+                feature_blocks.append(b_columns)
+
+            columns: Dict[str, np.ndarray] = {
+                "bearing_id": np.concatenate(bearing_ids),
+                "rul": np.concatenate(ruls),
+                "health_state": np.concatenate(states)
+            }
+            for name in feature_blocks[0]:
+                columns[name] = np.concatenate([block[name] for block in feature_blocks])
+
+        return FileFeatures(file_path=inp.file_path, test_id=test_name, timestamp=ts, columns=columns,
+                            profile=prof.report() if prof.enabled else None)
+
+    def _stored_array(self, file_path: str, test_name: str) -> Optional[np.ndarray]:
+        """Сигналы файла из RawSignalStore теста (None - хранилища нет или файл в нем устарел)."""
+        if test_name not in self._raw_stores:
+            store = RawSignalStore(self.config, test_name)
+            self._raw_stores[test_name] = store.open() if store.exists() else None
+        store = self._raw_stores[test_name]
+        return store.file_array(file_path) if store is not None else None
+
+    def _feature_context(self, windows: Any, signals: np.ndarray) -> FeatureContext:
+        """Контекст реестра признаков над окнами файла (NumPy stride view)."""
+        win = self.config.window
+        if not isinstance(windows, np.ndarray):
+            windows = segment_signal(signals, win.length, win.step)
+        return FeatureContext(windows, win.sampling_rate, fft_workers=self.config.fft_workers,
+                              bands=self.config.spectral_bands, geometry=self.config.bearing,
+                              envelope_band=self.config.envelope_band)
+
+    def _compute_group(self, group: str, windows: Any, signals: np.ndarray,
+                       ctx: FeatureContext) -> Dict[str, np.ndarray]:
+        """Считает группу признаков выбранным движком.
+
+        Args:
+            group (str): Имя группы из feature_groups.
+            windows (Any): Окна (channels, n_windows, win_len): np.ndarray или torch.Tensor.
+            signals (np.ndarray): Исходные сигналы (channels, samples).
+            ctx (FeatureContext): Общий контекст промежуточных величин реестра.
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив (channels, n_windows).
+        """
+        win = self.config.window
+        if group == "extra":
+            return compute_features(ctx, self.feature_groups[group])
+        if self._running_mode():
+            if group == "features":
+                return self.calc.calculate_running(signals, win.length, win.step)
+            return self.calc_spec.calculate_stft(signals, win.length, win.step, win.sampling_rate,
+                                                 workers=self.config.fft_workers)
+        if self.torch_engine is not None:
+            if group == "features":
+                return self.torch_engine.calculate_batch(windows)
+            return self.torch_engine.calculate_spectral_batch(windows, win.sampling_rate)
+        return compute_features(ctx, self.feature_groups[group])
+
+    def _running_mode(self) -> bool:
+        """Перекрывающиеся окна считаются бегущими суммами (см. calculate_running)."""
+        win = self.config.window
+        return self.config.running_stats and self.torch_engine is None and win.step < win.length
+
+    def _cache_keys(self, file_path: str, test_name: str) -> Dict[str, str]:
+        """Ключи кеша признаков файла по группам.
+
+        Ключ зависит от файла, окна, раскладки каналов, источника сигнала
+        (тип бинарного кеша или текст), движка и версий признаков группы.
+        """
+        assert self.feature_cache is not None
+        config = self.config
+        spec = config.experiments[test_name]
+        params: Dict[str, Any] = {
+            "window": asdict(config.window),
+            "channels": spec.channels,
+            "source": config.raw_cache_dtype if config.use_raw_cache else "text",
+            "backend": config.feature_backend
+        }
+        if config.feature_backend == "torch":
+            params["torch_dtype"] = config.torch_dtype
+        if self._running_mode():
+            params["running_stats"] = True
+        digest = self.feature_cache.file_digest(file_path)
+        keys = {
+            g: self.feature_cache.entry_key(digest, g, feature_versions(names), params)
+            for g, names in self.feature_groups.items() if g != "extra"
+        }
+        if "extra" in self.feature_groups:
+            # Полосы и геометрия подшипника влияют только на признаки реестра
+            extra_params = {**params, "bands": config.spectral_bands, "bearing": asdict(config.bearing),
+                            "envelope_band": config.envelope_band}
+            keys["extra"] = self.feature_cache.entry_key(
+                digest, "extra", feature_versions(self.feature_groups["extra"]), extra_params
+            )
+        return keys
+
+    def iter_files(self, file_list: List[str], test_name: str, workers: int = 1,
+                   chunk_size: int = 1) -> Iterator[FileFeatures]:
+        """Обрабатывает файлы одного теста последовательно или в пуле процессов.
+
+        Args:
+            file_list (List[str]): Файлы теста.
+            test_name (str): Имя теста.
+            workers (int): Число процессов (1 - без пула).
+            chunk_size (int): Сколько файлов передавать процессу за раз.
+
+        Yields:
+            FileFeatures: Результат очередного файла.
+        """
+        yield from self.iter_jobs([(f, test_name) for f in file_list], workers, chunk_size)
+
+    def iter_jobs(self, jobs: List[Tuple[str, str]], workers: int = 1,
+                  chunk_size: int = 1) -> Iterator[FileFeatures]:
+        """Обрабатывает задания (файл, тест) последовательно или в пуле процессов.
+
+        Результаты всегда выдаются в порядке jobs (т.е. по тестам и по времени),
+        поэтому итоговый датасет не зависит от числа процессов. Без пула
+        чтение идет с опережением на config.prefetch_files файлов (self.reader). Задания разных
+        тестов идут в один пул, так что процессы не простаивают на границе тестов.
+
+        Args:
+            jobs (List[Tuple[str, str]]): Пары (путь к файлу, имя теста).
+            workers (int): Число процессов (1 - без пула).
+            chunk_size (int): Сколько файлов передавать процессу за раз.
+
+        Yields:
+            FileFeatures: Результат очередного файла.
+        """
+        if workers <= 1:
+            if self.config.prefetch_files <= 0:
+                for file_path, test_name in jobs:
+                    yield self.process(file_path, test_name)
+                return
+            # Следующие файлы читаются в фоне, пока считаются признаки текущего
+            self.reader = PrefetchReader(self.read, jobs, self.config.prefetch_files,
+                                         self.config.prefetch_threads)
+            for inp in self.reader:
+                yield self.compute(inp)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.config,)) as executor:
+            yield from executor.map(_process_in_worker, [f for f, _ in jobs],
+                                    [t for _, t in jobs], chunksize=chunk_size)
+
+# Обработчик, созданный один раз на процесс пула
+_WORKER: Optional[FileProcessor] = None
+
+def _init_worker(config: GlobalConfig) -> None:
+    """Создает FileProcessor в дочернем процессе."""
+    global _WORKER
+    # Потоки BLAS процесса пула по плану ресурсов (иначе каждый процесс займет все ядра)
+    if config.blas_threads is not None:
+        limit_native_threads(config.blas_threads)
+    _WORKER = FileProcessor(config)
+
+def _process_in_worker(file_path: str, test_name: str) -> FileFeatures:
+    """Точка входа задачи пула процессов."""
+    assert _WORKER is not None
+    return _WORKER.process(file_path, test_name)
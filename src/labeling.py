@@ -0,0 +1,257 @@
+# src/labeling.py
+
+import os
+import glob
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from .settings import GlobalConfig
+from .data_loader import IMSRawLoader
+from .manifest import ProcessingManifest, config_fingerprint, features_fingerprint
+from .storage_manager import cast_column, write_frame, writer_options
+
+# (RUL в часах, класс здоровья 0-2)
+LabelArrays = Tuple[np.ndarray, np.ndarray]
+# Имя схемы -> функция (часы до отказа, конфиг) -> (RUL, класс здоровья)
+LABELING_SCHEMES: Dict[str, Callable[[np.ndarray, GlobalConfig], LabelArrays]] = {}
+
+def labeling_scheme(name: str) -> Callable:
+    """Декоратор регистрации схемы разметки."""
+    def register(func: Callable[[np.ndarray, GlobalConfig], LabelArrays]) -> Callable:
+        LABELING_SCHEMES[name] = func
+        return func
+    return register
+
+def health_state(hours_to_failure: np.ndarray, config: GlobalConfig) -> np.ndarray:
+    """Класс здоровья по времени до отказа (общий для всех схем).
+
+    Args:
+        hours_to_failure (np.ndarray): Часы до отказа (NaN - подшипник не ломался).
+        config (GlobalConfig): Глобальный конфиг (пороги разметки).
+
+    Returns:
+        np.ndarray: 0 - здоров (A), 1 - предупреждение (B), 2 - критический (C).
+    """
+    capped = np.clip(hours_to_failure, 0.0, config.rul_threshold_hours)
+    state = np.zeros(capped.shape, dtype=np.int64)
+    # NaN не проходит ни одно сравнение: неотказавший подшипник всегда здоров
+    with np.errstate(invalid="ignore"):
+        state[capped < config.rul_threshold_hours] = 1
+        state[capped < config.health_threshold_yellow] = 2
+    return state
+
+@labeling_scheme("piecewise_linear")
+def _piecewise_linear(hours_to_failure: np.ndarray, config: GlobalConfig) -> LabelArrays:
+    """RUL линейно убывает к отказу и ограничен сверху порогом rul_threshold_hours."""
+    rul = np.clip(hours_to_failure, 0.0, config.rul_threshold_hours)
+    rul[np.isnan(rul)] = config.rul_threshold_hours
+    return rul, health_state(hours_to_failure, config)
+
+@labeling_scheme("linear")
+def _linear(hours_to_failure: np.ndarray, config: GlobalConfig) -> LabelArrays:
+    """RUL - время до отказа без ограничения; у неотказавших подшипников NaN (цензурирование)."""
+    return np.maximum(hours_to_failure, 0.0), health_state(hours_to_failure, config)
+
+@labeling_scheme("exponential")
+def _exponential(hours_to_failure: np.ndarray, config: GlobalConfig) -> LabelArrays:
+    """Гладкое насыщение RUL: у отказа наклон 1, вдали от отказа - стремится к порогу."""
+    limit = config.rul_threshold_hours
+    rul = limit * -np.expm1(-np.maximum(hours_to_failure, 0.0) / limit)
+    rul[np.isnan(rul)] = limit
+    return rul, health_state(hours_to_failure, config)
+
+class RULLabeler:
+    """Векторная разметка RUL и класса здоровья.
+
+    Времена отказа ExperimentSpec.failure_times разбираются один раз на тест,
+    метки времени файлов - одним вызовом IMSRawLoader.parse_timestamps, а
+    разметка всех пар (файл, подшипник) считается массивами NumPy. Разметка
+    не зависит от признаков, поэтому ее можно заново применить к готовому
+    датасету (relabel_dataset).
+    """
+
+    def __init__(self, config: GlobalConfig):
+        """Инициализация разметчика.
+
+        Args:
+            config (GlobalConfig): Глобальный конфиг (схема и пороги разметки).
+        """
+        if config.labeling_scheme not in LABELING_SCHEMES:
+            raise ValueError(f"Неизвестная схема разметки: {config.labeling_scheme}. "
+                             f"Доступны: {sorted(LABELING_SCHEMES)}")
+        self.config = config
+        self.loader = IMSRawLoader(config)
+        self.scheme = LABELING_SCHEMES[config.labeling_scheme]
+        # Тест -> время отказа подшипников в порядке spec.bearing_names
+        self._failures: Dict[str, np.ndarray] = {}
+
+    def failure_times(self, test_name: str) -> np.ndarray:
+        """Время отказа подшипников теста (разбирается один раз).
+
+        Args:
+            test_name (str): Имя теста.
+
+        Returns:
+            np.ndarray: datetime64[s] в порядке spec.bearing_names; NaT - без отказа.
+        """
+        if test_name not in self._failures:
+            spec = self.config.experiments[test_name]
+            failures = np.full(len(spec.bearing_names), np.datetime64("NaT"), dtype="datetime64[s]")
+            known = [i for i, b in enumerate(spec.bearing_names) if spec.failure_times.get(b) is not None]
+            failures[known] = self.loader.parse_timestamps(
+                [spec.failure_times[spec.bearing_names[i]] for i in known]  # type: ignore[misc]
+            )
+            self._failures[test_name] = failures
+        return self._failures[test_name]
+
+    def hours_to_failure(self, test_name: str, timestamps: np.ndarray) -> np.ndarray:
+        """Часы до отказа для всех пар (метка времени, подшипник).
+
+        Args:
+            test_name (str): Имя теста.
+            timestamps (np.ndarray): Метки времени файлов (datetime64).
+
+        Returns:
+            np.ndarray: Массив (n_timestamps, n_bearings); NaN - подшипник не ломался.
+        """
+        ts = np.asarray(timestamps, dtype="datetime64[us]")
+        return (self.failure_times(test_name)[None, :] - ts[:, None]) / np.timedelta64(1, "s") / 3600.0
+
+    def label(self, test_name: str, timestamps: np.ndarray) -> LabelArrays:
+        """Разметка всех подшипников теста для набора меток времени.
+
+        Args:
+            test_name (str): Имя теста.
+            timestamps (np.ndarray): Метки времени файлов (datetime64).
+
+        Returns:
+            LabelArrays: RUL (float64) и класс здоровья (int64) формы
+                (n_timestamps, n_bearings), подшипники в порядке spec.bearing_names.
+        """
+        return self.scheme(self.hours_to_failure(test_name, timestamps), self.config)
+
+    def label_files(self, test_name: str, file_paths: Sequence[str]) -> LabelArrays:
+        """Разметка всех пар (файл, подшипник) теста по именам файлов.
+
+        Args:
+            test_name (str): Имя теста.
+            file_paths (Sequence[str]): Файлы теста.
+
+        Returns:
+            LabelArrays: Массивы формы (n_files, n_bearings).
+        """
+        return self.label(test_name, self.loader.parse_timestamps(file_paths))
+
+    def label_rows(self, test_name: str, timestamps: np.ndarray, bearing_ids: np.ndarray) -> LabelArrays:
+        """Разметка строк датасета одного теста.
+
+        Args:
+            test_name (str): Имя теста.
+            timestamps (np.ndarray): Метка времени каждой строки (datetime64).
+            bearing_ids (np.ndarray): Подшипник каждой строки.
+
+        Returns:
+            LabelArrays: RUL и класс здоровья по строкам.
+        """
+        bearing_names = self.config.experiments[test_name].bearing_names
+        uniques, inverse = np.unique(np.asarray(bearing_ids, dtype=str), return_inverse=True)
+        unknown = [b for b in uniques if b not in bearing_names]
+        if unknown:
+            raise ValueError(f"Подшипники {unknown} отсутствуют в спецификации теста {test_name}")
+        columns = np.array([bearing_names.index(b) for b in uniques], dtype=np.intp)[inverse]
+
+        ts = np.asarray(timestamps, dtype="datetime64[us]")
+        failures = self.failure_times(test_name)[columns]
+        hours = (failures - ts) / np.timedelta64(1, "s") / 3600.0
+        return self.scheme(hours, self.config)
+
+    def relabel_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Пересчитывает колонки rul и health_state датафрейма без пересчета признаков.
+
+        Args:
+            df (pd.DataFrame): Датасет с колонками timestamp, test_id, bearing_id.
+
+        Returns:
+            pd.DataFrame: Копия df с новой разметкой.
+        """
+        rul = np.empty(len(df), dtype=np.float64)
+        state = np.empty(len(df), dtype=np.int64)
+        test_ids = df["test_id"].astype(str).to_numpy()
+        timestamps = df["timestamp"].to_numpy()
+        bearing_ids = df["bearing_id"].astype(str).to_numpy()
+        for test_name in pd.unique(test_ids):
+            mask = test_ids == test_name
+            rul[mask], state[mask] = self.label_rows(test_name, timestamps[mask], bearing_ids[mask])
+        return df.assign(rul=rul, health_state=state)
+
+def relabel_dataset(base_path: str, config: GlobalConfig) -> int:
+    """Заново размечает готовый базовый датасет текущими настройками разметки.
+
+    Признаки не пересчитываются: в каждой части переписываются только колонки
+    rul и health_state, после чего манифест теста переводится на новый
+    отпечаток настроек. Тесты, у которых изменились настройки признаков,
+    пропускаются - их пересоберет build_base_dataset.
+
+    Args:
+        base_path (str): Монолитный parquet-файл или папка партиционированного датасета.
+        config (GlobalConfig): Глобальный конфиг.
+
+    Returns:
+        int: Число переразмеченных строк.
+    """
+    labeler = RULLabeler(config)
+    if os.path.isfile(base_path):
+        df = labeler.relabel_frame(pd.read_parquet(base_path))
+        write_frame(df, base_path, config.storage)
+        return len(df)
+
+    rows = 0
+    for test_dir in sorted(glob.glob(os.path.join(base_path, "test_id=*"))):
+        test_name = os.path.basename(test_dir).split("=", 1)[1]
+        relabeled = relabel_test(test_dir, test_name, labeler)
+        if relabeled is None and ProcessingManifest.read_fingerprint(test_dir) != config_fingerprint(config):
+            print(f"[!] {test_name}: feature configuration changed, relabeling skipped")
+        rows += relabeled or 0
+    return rows
+
+def relabel_test(test_dir: str, test_name: str, labeler: RULLabeler) -> Optional[int]:
+    """Переразмечает части одного теста, если изменились только настройки разметки.
+
+    Args:
+        test_dir (str): Папка теста (.../test_id=<тест>) с манифестом.
+        test_name (str): Имя теста.
+        labeler (RULLabeler): Разметчик с новыми настройками.
+
+    Returns:
+        Optional[int]: Число переразмеченных строк или None, если переразметка
+            не нужна (отпечаток совпадает) или невозможна (нет манифеста,
+            изменились настройки признаков).
+    """
+    fingerprint = config_fingerprint(labeler.config)
+    stored = ProcessingManifest.read_fingerprint(test_dir)
+    if stored is None or stored == fingerprint or features_fingerprint(stored) != features_fingerprint(fingerprint):
+        return None
+    rows = 0
+    for part_path in sorted(glob.glob(os.path.join(test_dir, "bearing_id=*", "part-*.parquet"))):
+        bearing = os.path.basename(os.path.dirname(part_path)).split("=", 1)[1]
+        rows += _relabel_part(labeler, part_path, test_name, bearing)
+    # Манифест обновляется последним: прерванная переразметка просто повторится
+    ProcessingManifest.write_fingerprint(test_dir, fingerprint)
+    return rows
+
+def _relabel_part(labeler: RULLabeler, part_path: str, test_name: str, bearing: str) -> int:
+    """Атомарно переписывает разметку одной части партиции bearing_id=<bearing>."""
+    profile = labeler.config.storage
+    table = pq.ParquetFile(part_path).read()
+    rul, state = labeler.label_rows(
+        test_name, table.column("timestamp").to_numpy(), np.full(table.num_rows, bearing)
+    )
+    for name, values in (("rul", rul), ("health_state", state)):
+        i = table.schema.get_field_index(name)
+        field = table.schema.field(i)
+        table = table.set_column(i, field, cast_column(values, field, profile))
+    tmp_path = os.path.join(os.path.dirname(part_path), "." + os.path.basename(part_path))
+    pq.write_table(table, tmp_path, row_group_size=profile.row_group_rows, **writer_options(profile))
+    os.replace(tmp_path, part_path)
+    return table.num_rows
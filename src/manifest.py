@@ -0,0 +1,243 @@
+# src/manifest.py
+
+import os
+import json
+import glob
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+from .settings import GlobalConfig, StorageProfile
+
+# Версия набора признаков: увеличивать при изменении формул в движках
+FEATURE_VERSION: str = "1"
+# Ключи отпечатка, влияющие только на разметку: при их изменении датасет
+# можно переразметить (src/labeling.py), не пересчитывая признаки
+LABEL_KEYS: Tuple[str, ...] = ("rul_threshold_hours", "health_threshold_yellow", "labeling_scheme")
+
+def config_fingerprint(config: GlobalConfig) -> str:
+    """Строит отпечаток настроек, влияющих на содержимое датасета.
+
+    Args:
+        config (GlobalConfig): Объект конфигурации.
+
+    Returns:
+        str: Стабильная строка; при ее изменении датасет пересобирается целиком.
+    """
+    # Движки (scipy) импортируются только для отпечатка: проверка манифестов
+    # в validate/enhance обходится без них
+    from .feature_engine import FeatureCalculator
+    from .spectral_engine import SpectralCalculator
+    from .feature_registry import feature_versions
+    payload = {
+        "feature_version": FEATURE_VERSION,
+        "feature_versions": {**FeatureCalculator.FEATURE_VERSIONS, **SpectralCalculator.FEATURE_VERSIONS},
+        "window": asdict(config.window),
+        "raw_cache_dtype": config.raw_cache_dtype,
+        "rul_threshold_hours": config.rul_threshold_hours,
+        "health_threshold_yellow": config.health_threshold_yellow
+    }
+    # Схема по умолчанию не входит в отпечаток, чтобы не пересобирать старые датасеты
+    if config.labeling_scheme != "piecewise_linear":
+        payload["labeling_scheme"] = config.labeling_scheme
+    if config.extra_features:
+        payload["extra_features"] = feature_versions(config.extra_features)
+        payload["spectral_bands"] = config.spectral_bands
+        payload["bearing"] = asdict(config.bearing)
+        payload["envelope_band"] = config.envelope_band
+    # Типы частей зависят от профиля хранения; профиль по умолчанию в отпечаток не входит
+    if config.storage != StorageProfile():
+        payload["storage"] = asdict(config.storage)
+    # Движок по умолчанию не входит в отпечаток, чтобы не пересобирать старые датасеты
+    if config.feature_backend != "numpy":
+        payload["feature_backend"] = config.feature_backend
+        payload["torch_dtype"] = config.torch_dtype
+    return json.dumps(payload, sort_keys=True)
+
+def features_fingerprint(fingerprint: str) -> str:
+    """Часть отпечатка без настроек разметки (LABEL_KEYS).
+
+    Args:
+        fingerprint (str): Отпечаток из config_fingerprint.
+
+    Returns:
+        str: Отпечаток настроек признаков.
+    """
+    payload = json.loads(fingerprint)
+    for key in LABEL_KEYS:
+        payload.pop(key, None)
+    return json.dumps(payload, sort_keys=True)
+
+class ProcessingManifest:
+    """Манифест инкрементальной сборки датасета из частей (part-*.parquet).
+
+    Часть - это набор одноименных файлов, которые могут лежать в подпапках
+    партиций (например, bearing_id=Bearing1/part-00000.parquet).
+    Для каждой части хранится список исходных файлов с размером и mtime.
+    Часть считается действительной, пока все ее файлы не изменились;
+    манифест обновляется только после успешной записи части, поэтому
+    прерванный запуск продолжается с последней зафиксированной части.
+    """
+
+    FILE_NAME: str = "_manifest.json"
+    PART_PATTERN: str = "part-{:05d}.parquet"
+
+    def __init__(self, dataset_path: str, fingerprint: str):
+        """Инициализация манифеста.
+
+        Args:
+            dataset_path (str): Папка датасета (части и манифест).
+            fingerprint (str): Отпечаток настроек из config_fingerprint.
+        """
+        self.dataset_path = dataset_path
+        self.fingerprint = fingerprint
+        self.manifest_path = os.path.join(dataset_path, self.FILE_NAME)
+        # Имя части -> [(путь, размер, mtime_ns), ...]
+        self.parts: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._load()
+
+    @staticmethod
+    def file_signature(file_path: str) -> Tuple[str, int, int]:
+        """Возвращает (путь, размер, mtime_ns) исходного файла."""
+        st = os.stat(file_path)
+        return file_path, st.st_size, st.st_mtime_ns
+
+    def pending_files(self, file_list: List[str]) -> List[str]:
+        """Удаляет устаревшие части и возвращает файлы, требующие обработки.
+
+        Часть удаляется целиком, если хотя бы один ее файл изменился или исчез;
+        все ее файлы при этом снова попадают в очередь. Также удаляются
+        недописанные части, не попавшие в манифест.
+
+        Args:
+            file_list (List[str]): Текущий список файлов теста.
+
+        Returns:
+            List[str]: Новые и измененные файлы в порядке file_list.
+        """
+        current = set(file_list)
+        stale = [
+            name for name, entries in self.parts.items()
+            if not all(path in current and self.file_signature(path) == (path, size, mtime)
+                       for path, size, mtime in entries)
+        ]
+        for name in stale:
+            self._remove_part(name)
+        self._remove_orphans()
+        # Манифест переписывается только при изменениях: по его mtime
+        # определяется, устарели ли производные файлы
+        if stale or not os.path.exists(self.manifest_path):
+            self._save()
+
+        done = {path for entries in self.parts.values() for path, _, _ in entries}
+        return [f for f in file_list if f not in done]
+
+    @classmethod
+    def read_fingerprint(cls, dataset_path: str) -> Optional[str]:
+        """Возвращает отпечаток сохраненного манифеста, не изменяя датасет.
+
+        Args:
+            dataset_path (str): Папка датасета.
+
+        Returns:
+            Optional[str]: Отпечаток или None, если манифеста нет.
+        """
+        manifest_path = os.path.join(dataset_path, cls.FILE_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as fh:
+            return json.load(fh).get("fingerprint")
+
+    @classmethod
+    def write_fingerprint(cls, dataset_path: str, fingerprint: str) -> None:
+        """Переводит манифест на новый отпечаток, сохраняя зафиксированные части.
+
+        Используется после переразметки, когда части уже соответствуют новым настройкам.
+
+        Args:
+            dataset_path (str): Папка датасета.
+            fingerprint (str): Новый отпечаток.
+        """
+        manifest_path = os.path.join(dataset_path, cls.FILE_NAME)
+        with open(manifest_path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        data["fingerprint"] = fingerprint
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def next_part_name(self) -> str:
+        """Возвращает имя файла для следующей части датасета."""
+        numbers = [int(name[5:10]) for name in self.parts]
+        return self.PART_PATTERN.format(max(numbers, default=-1) + 1)
+
+    def commit(self, part_name: str, files: List[str]) -> None:
+        """Фиксирует записанную часть в манифесте (атомарно).
+
+        Args:
+            part_name (str): Имя файла уже записанной части.
+            files (List[str]): Исходные файлы, вошедшие в часть.
+        """
+        self.parts[part_name] = [self.file_signature(f) for f in files]
+        self._save()
+
+    def merge(self, part_names: List[str], merged_name: str) -> None:
+        """Заменяет части одной слитой частью (после записи ее файлов).
+
+        Манифест фиксирует слитую часть и забывает прежние одной атомарной
+        записью, затем файлы прежних частей удаляются; после прерывания между
+        этими шагами они удаляются как не зафиксированные.
+
+        Args:
+            part_names (List[str]): Слитые части по порядку.
+            merged_name (str): Имя уже записанной слитой части.
+        """
+        entries = [entry for name in part_names for entry in self.parts[name]]
+        for name in part_names:
+            self.parts.pop(name)
+        self.parts[merged_name] = entries
+        self._save()
+        for name in part_names:
+            self._remove_part(name)
+
+    def _load(self) -> None:
+        """Читает манифест; при смене настроек сбрасывает датасет."""
+        os.makedirs(self.dataset_path, exist_ok=True)
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("fingerprint") != self.fingerprint:
+            print("[*] Feature configuration changed. Rebuilding dataset from scratch...")
+            for name in data.get("parts", {}):
+                self._remove_part(name)
+            self._save()
+            return
+        self.parts = {name: [tuple(e) for e in entries] for name, entries in data["parts"].items()}
+
+    def _save(self) -> None:
+        """Атомарно записывает манифест."""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"fingerprint": self.fingerprint, "parts": self.parts}, fh)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _part_files(self, pattern: str) -> List[str]:
+        """Ищет файлы частей в папке датасета и в подпапках партиций."""
+        return glob.glob(os.path.join(self.dataset_path, "**", pattern), recursive=True)
+
+    def _remove_part(self, name: str) -> None:
+        """Удаляет часть с диска и из манифеста."""
+        self.parts.pop(name, None)
+        for path in self._part_files(name):
+            os.remove(path)
+
+    def _remove_orphans(self) -> None:
+        """Удаляет остатки прерванного запуска.
+
+        Это части, не зафиксированные в манифесте, и скрытые временные файлы
+        .part-*.parquet недописанных частей (ColumnarAggregator, слияние частей).
+        """
+        for path in self._part_files("part-*.parquet"):
+            if os.path.basename(path) not in self.parts:
+                os.remove(path)
+        for path in self._part_files(".part-*.parquet"):
+            os.remove(path)
\ No newline at end of file
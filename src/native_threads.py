@@ -0,0 +1,28 @@
+# src/native_threads.py
+
+import os
+from typing import Optional
+
+# Переменные размера пулов потоков нативных библиотек (BLAS, OpenMP, numexpr)
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def limit_native_threads(threads: Optional[int]) -> None:
+    """Ограничивает пулы потоков BLAS/OpenMP текущего процесса.
+
+    Переменные окружения действуют на библиотеки, загружаемые позже (torch
+    импортируется лениво) и на дочерние процессы; уже загруженный BLAS
+    ограничивается через threadpoolctl, если он установлен.
+
+    Args:
+        threads (Optional[int]): Число потоков (None - не менять).
+    """
+    if threads is None:
+        return
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=threads)
@@ -0,0 +1,230 @@
+# src/online_enhancer.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
+from .enhancer import DatasetEnhancer
+
+@dataclass
+class _BearingState:
+    """Состояние одного подшипника: кольцевой буфер и бегущие суммы."""
+    ring: np.ndarray     # (max_window, features) - последние строки
+    sums: np.ndarray     # (n_windows, features) - суммы конечных значений по окнам
+    counts: np.ndarray   # (n_windows, features) - число конечных значений по окнам
+    last: np.ndarray     # (features,) - предыдущая строка для diff
+    ewm_num: np.ndarray  # (n_spans, features) - числитель EWM
+    ewm_den: np.ndarray  # (n_spans, features) - знаменатель EWM
+    seen: int = 0        # сколько строк уже пришло
+    head: int = 0        # позиция записи следующей строки в ring
+
+class OnlineEnhancer:
+    """Потоковый энхансер: те же признаки, что DatasetEnhancer.process, по одной строке.
+
+    Для каждого (test_id, bearing_id) хранится кольцевой буфер последних строк
+    и бегущие суммы, поэтому обновление стоит O(число признаков) и не требует
+    перечитывания датасета. Результат совпадает с пакетным process в пределах
+    точности float64 (бегущие суммы пересчитываются из буфера на каждом обороте
+    кольца, чтобы ошибка округления не накапливалась).
+    """
+
+    def __init__(self, feature_cols: Sequence[str], rolling_window: int = 10,
+                 extra_windows: Sequence[int] = (), ewm_spans: Sequence[int] = ()):
+        """Инициализация энхансера.
+
+        Args:
+            feature_cols (Sequence[str]): Признаки в порядке колонок датасета.
+            rolling_window (int): Размер окна для скользящего среднего.
+            extra_windows (Sequence[int]): Дополнительные окна скользящего среднего.
+            ewm_spans (Sequence[int]): Параметры span экспоненциального среднего.
+        """
+        self.feature_cols: List[str] = list(feature_cols)
+        self.rolling_window = rolling_window
+        self.extra_windows: List[int] = list(extra_windows)
+        self.ewm_spans: List[int] = list(ewm_spans)
+
+        self._windows: List[int] = list(dict.fromkeys([rolling_window, *self.extra_windows]))
+        self._decays: np.ndarray = np.array([1.0 - 2.0 / (s + 1.0) for s in self.ewm_spans])
+        self._capacity: int = max(self._windows)
+        self.states: Dict[Tuple[str, str], _BearingState] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "OnlineEnhancer":
+        """Создает энхансер с набором признаков базового датафрейма.
+
+        Args:
+            df (pd.DataFrame): Базовый датафрейм (или его схема без строк).
+            **kwargs: Параметры окон, как в конструкторе.
+
+        Returns:
+            OnlineEnhancer: Новый энхансер.
+        """
+        return cls([c for c in df.columns if c not in DatasetEnhancer.EXCLUDE], **kwargs)
+
+    def output_columns(self) -> List[str]:
+        """Имена выходных колонок в том же порядке, что у DatasetEnhancer.process."""
+        names: List[str] = []
+        for col in self.feature_cols:
+            names += [f"{col}_rolling_mean", f"{col}_diff"]
+            names += [f"{col}_rolling_mean_{w}" for w in self.extra_windows]
+            names += [f"{col}_ewm_{s}" for s in self.ewm_spans]
+        return names
+
+    def update(self, test_id: str, bearing_id: str,
+               features: Union[Mapping[str, float], np.ndarray]) -> Dict[str, float]:
+        """Принимает очередную строку подшипника и возвращает ее временные признаки.
+
+        Строки одного подшипника должны приходить в порядке времени.
+
+        Args:
+            test_id (str): ID эксперимента.
+            bearing_id (str): Имя подшипника.
+            features (Union[Mapping[str, float], np.ndarray]): Признаки строки
+                (словарь или вектор в порядке feature_cols).
+
+        Returns:
+            Dict[str, float]: Колонка -> значение (см. output_columns).
+        """
+        if isinstance(features, np.ndarray):
+            x = features.astype(np.float64, copy=False)
+        else:
+            x = np.array([features[c] for c in self.feature_cols], dtype=np.float64)
+
+        state = self.states.get((test_id, bearing_id))
+        if state is None:
+            state = self._new_state()
+            self.states[(test_id, bearing_id)] = state
+
+        finite = np.isfinite(x)
+        x_filled = np.where(finite, x, 0.0)
+
+        # Скользящие окна: вычитается строка, выпадающая из окна, добавляется новая
+        for k, w in enumerate(self._windows):
+            if state.seen >= w:
+                old = state.ring[(state.head - w) % self._capacity]
+                old_finite = np.isfinite(old)
+                state.sums[k] -= np.where(old_finite, old, 0.0)
+                state.counts[k] -= old_finite
+            state.sums[k] += x_filled
+            state.counts[k] += finite
+
+        state.ring[state.head] = x
+        state.head = (state.head + 1) % self._capacity
+        state.seen += 1
+        if state.head == 0:
+            self._resync(state)
+
+        if len(self._decays):
+            state.ewm_num = x_filled + self._decays[:, None] * state.ewm_num
+            state.ewm_den = finite + self._decays[:, None] * state.ewm_den
+
+        diff = x - state.last if state.seen > 1 else np.zeros_like(x)
+        diff[np.isnan(diff)] = 0.0
+        state.last = x.copy()
+
+        means = {
+            w: np.where((state.seen >= w) & (state.counts[k] == w), state.sums[k] / w, np.nan)
+            for k, w in enumerate(self._windows)
+        }
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ewm = np.where(state.ewm_den > 0, state.ewm_num / state.ewm_den, np.nan)
+
+        result: Dict[str, float] = {}
+        for j, col in enumerate(self.feature_cols):
+            result[f"{col}_rolling_mean"] = float(means[self.rolling_window][j])
+            result[f"{col}_diff"] = float(diff[j])
+            for w in self.extra_windows:
+                result[f"{col}_rolling_mean_{w}"] = float(means[w][j])
+            for i, s in enumerate(self.ewm_spans):
+                result[f"{col}_ewm_{s}"] = float(ewm[i, j])
+        return result
+
+    def process_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Прогоняет строки датафрейма через update в порядке (test, bearing, время).
+
+        Args:
+            df (pd.DataFrame): Базовый датафрейм с признаками.
+
+        Returns:
+            pd.DataFrame: Датафрейм с добавленными временными признаками,
+                как у DatasetEnhancer.process.
+        """
+        df = df.sort_values(['test_id', 'bearing_id', 'timestamp'])
+        values = df[self.feature_cols].to_numpy(dtype=np.float64)
+        rows = [
+            self.update(str(t), str(b), values[i])
+            for i, (t, b) in enumerate(zip(df['test_id'], df['bearing_id']))
+        ]
+        derived = pd.DataFrame(rows, index=df.index, columns=self.output_columns())
+        return pd.concat([df, derived], axis=1)
+
+    def save_state(self, path: str) -> None:
+        """Сохраняет состояние всех подшипников в .npz (атомарно).
+
+        Args:
+            path (str): Путь к файлу чекпоинта.
+        """
+        meta = {
+            "feature_cols": self.feature_cols,
+            "rolling_window": self.rolling_window,
+            "extra_windows": self.extra_windows,
+            "ewm_spans": self.ewm_spans,
+            "keys": [list(key) for key in self.states],
+            "seen": [s.seen for s in self.states.values()],
+            "head": [s.head for s in self.states.values()]
+        }
+        arrays: Dict[str, np.ndarray] = {"meta": np.array(json.dumps(meta))}
+        for i, s in enumerate(self.states.values()):
+            arrays.update({
+                f"ring_{i}": s.ring, f"sums_{i}": s.sums, f"counts_{i}": s.counts,
+                f"last_{i}": s.last, f"ewm_num_{i}": s.ewm_num, f"ewm_den_{i}": s.ewm_den
+            })
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_state(cls, path: str) -> "OnlineEnhancer":
+        """Восстанавливает энхансер из чекпоинта save_state.
+
+        Args:
+            path (str): Путь к файлу чекпоинта.
+
+        Returns:
+            OnlineEnhancer: Энхансер с восстановленным состоянием.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            enhancer = cls(meta["feature_cols"], meta["rolling_window"],
+                           meta["extra_windows"], meta["ewm_spans"])
+            for i, key in enumerate(meta["keys"]):
+                enhancer.states[(key[0], key[1])] = _BearingState(
+                    ring=data[f"ring_{i}"], sums=data[f"sums_{i}"], counts=data[f"counts_{i}"],
+                    last=data[f"last_{i}"], ewm_num=data[f"ewm_num_{i}"], ewm_den=data[f"ewm_den_{i}"],
+                    seen=meta["seen"][i], head=meta["head"][i]
+                )
+        return enhancer
+
+    def _new_state(self) -> _BearingState:
+        """Создает пустое состояние подшипника."""
+        n_features = len(self.feature_cols)
+        return _BearingState(
+            ring=np.full((self._capacity, n_features), np.nan),
+            sums=np.zeros((len(self._windows), n_features)),
+            counts=np.zeros((len(self._windows), n_features), dtype=np.int64),
+            last=np.full(n_features, np.nan),
+            ewm_num=np.zeros((len(self.ewm_spans), n_features)),
+            ewm_den=np.zeros((len(self.ewm_spans), n_features))
+        )
+
+    def _resync(self, state: _BearingState) -> None:
+        """Пересчитывает бегущие суммы из буфера, сбрасывая ошибку округления."""
+        for k, w in enumerate(self._windows):
+            # Последние w строк (буфер заполнен, head указывает на самую старую)
+            idx = (state.head - 1 - np.arange(w)) % self._capacity
+            tail = state.ring[idx]
+            finite = np.isfinite(tail)
+            state.sums[k] = np.where(finite, tail, 0.0).sum(axis=0)
+            state.counts[k] = finite.sum(axis=0)
\ No newline at end of file
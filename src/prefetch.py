@@ -0,0 +1,82 @@
+# src/prefetch.py
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Generic, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class PrefetchReader(Generic[T]):
+    """Опережающее чтение в фоновых потоках с ограниченной очередью.
+
+    Пока потребитель обрабатывает очередной элемент, потоки уже читают
+    следующие, так что диск (или сетевой каталог) и CPU заняты одновременно.
+    Вперед запрошено не больше depth элементов: когда потребитель отстает,
+    новые чтения не начинаются (backpressure), и в памяти лежит не больше
+    depth прочитанных элементов. Результаты выдаются в порядке items;
+    исключение чтения пробрасывается потребителю на его элементе.
+    """
+
+    def __init__(self, func: Callable[..., T], items: Iterable[Tuple[Any, ...]],
+                 depth: int = 4, threads: int = 1):
+        """Инициализация читателя.
+
+        Args:
+            func (Callable[..., T]): Функция чтения, вызывается как func(*item).
+            items (Iterable[Tuple[Any, ...]]): Аргументы чтений по порядку.
+            depth (int): Максимум чтений, запрошенных вперед (размер очереди).
+            threads (int): Число потоков чтения (> 1 скрывает задержку сетевых дисков).
+        """
+        if depth < 1 or threads < 1:
+            raise ValueError("depth и threads должны быть положительными")
+        self.func = func
+        self.items = items
+        self.depth = depth
+        self.threads = threads
+        # Статистика: готовых элементов в очереди, суммарное ожидание потребителя
+        self.ready: int = 0
+        self.stall_s: float = 0.0
+        self.stalls: int = 0
+        self.consumed: int = 0
+
+    def __iter__(self) -> Iterator[T]:
+        """Выдает результаты чтения по порядку."""
+        items = iter(self.items)
+        pending: Deque[Future] = deque()
+        executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="prefetch")
+        try:
+            for item in items:
+                pending.append(executor.submit(self.func, *item))
+                if len(pending) >= self.depth:
+                    break
+            while pending:
+                future = pending.popleft()
+                if not future.done():
+                    started = time.perf_counter()
+                    future.result()
+                    self.stall_s += time.perf_counter() - started
+                    self.stalls += 1
+                # Место в очереди освободилось: запрашивается следующее чтение
+                for item in items:
+                    pending.append(executor.submit(self.func, *item))
+                    break
+                self.ready = sum(f.done() for f in pending)
+                self.consumed += 1
+                yield future.result()
+        finally:
+            # Остановка потребителя: еще не начатые чтения отменяются
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Глубина очереди и простои потребителя для строки прогресса.
+
+        Returns:
+            Dict[str, float]: ready (готово вперед), stall_s (ожидание чтения, с),
+                stall_pct (доля элементов, которых пришлось ждать, %).
+        """
+        return {
+            "ready": self.ready,
+            "stall_s": self.stall_s,
+            "stall_pct": 100.0 * self.stalls / self.consumed if self.consumed else 0.0
+        }
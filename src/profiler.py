@@ -0,0 +1,187 @@
+# src/profiler.py
+
+import io
+import json
+import time
+import heapq
+import pstats
+import cProfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+# Общий пустой контекст: выключенный профайлер не создает объектов на каждый вызов
+_NOOP: ContextManager[None] = contextlib.nullcontext()
+
+class StageProfiler:
+    """Таймеры и счетчики этапов пайплайна с опциональными cProfile/tracemalloc.
+
+    В выключенном состоянии stage() возвращает общий пустой контекст, а count()
+    сразу выходит, поэтому инструментирование горячих мест почти бесплатно.
+    """
+
+    def __init__(self, enabled: bool = False, use_cprofile: bool = False,
+                 use_tracemalloc: bool = False, top_files: int = 10):
+        """Инициализация профайлера.
+
+        Args:
+            enabled (bool): Включить сбор таймеров и счетчиков.
+            use_cprofile (bool): Дополнительно собрать профиль функций cProfile.
+            use_tracemalloc (bool): Дополнительно отслеживать аллокации (tracemalloc).
+            top_files (int): Сколько самых медленных файлов хранить.
+        """
+        self.enabled = enabled
+        self.use_cprofile = enabled and use_cprofile
+        self.use_tracemalloc = enabled and use_tracemalloc
+        self.top_files = top_files
+
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._slowest: List[Tuple[float, str]] = []
+        self._depth: int = 0
+        self._started: float = time.perf_counter()
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        """Запускает cProfile/tracemalloc (если включены) и общий таймер."""
+        self._started = time.perf_counter()
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.use_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Контекст замера этапа.
+
+        Args:
+            name (str): Имя этапа.
+
+        Returns:
+            ContextManager[None]: Контекст, суммирующий время (и пик аллокаций
+                для этапов верхнего уровня при включенном tracemalloc).
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Увеличивает счетчик.
+
+        Args:
+            name (str): Имя счетчика (files, windows, bytes_read, ...).
+            value (float): Приращение.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_stage(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Добавляет время этапа, измеренное в другом месте (например, в процессе пула)."""
+        entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += calls
+
+    def report(self) -> Dict[str, Any]:
+        """Компактный отчет (этапы и счетчики) для передачи между процессами."""
+        return {"stages": {k: v["seconds"] for k, v in self.stages.items()}, "counters": dict(self.counters)}
+
+    def merge_file(self, file_path: str, report: Optional[Dict[str, Any]], prefix: str = "file.") -> None:
+        """Вливает отчет обработки одного файла и учитывает его в списке самых медленных.
+
+        При обработке в пуле процессов время таких этапов - сумма по процессам,
+        поэтому может превышать общее время запуска.
+
+        Args:
+            file_path (str): Путь к файлу.
+            report (Optional[Dict[str, Any]]): Результат report() обработчика файла.
+            prefix (str): Префикс имен этапов файла.
+        """
+        if not self.enabled or report is None:
+            return
+        for name, seconds in report["stages"].items():
+            self.add_stage(prefix + name, seconds)
+        for name, value in report["counters"].items():
+            self.count(name, value)
+        total = sum(report["stages"].values())
+        heapq.heappush(self._slowest, (total, file_path))
+        if len(self._slowest) > self.top_files:
+            heapq.heappop(self._slowest)
+
+    def summary(self) -> Dict[str, Any]:
+        """Собирает итоговый структурированный отчет.
+
+        Returns:
+            Dict[str, Any]: Время этапов, счетчики, пропускная способность,
+                самые медленные файлы и (если включены) данные cProfile/tracemalloc.
+        """
+        wall = time.perf_counter() - self._started
+        result: Dict[str, Any] = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "wall_time_s": wall,
+            "stages": self.stages,
+            "counters": self.counters,
+            "throughput": {
+                "files_per_s": self.counters.get("files", 0) / wall if wall > 0 else None,
+                "windows_per_s": self.counters.get("windows", 0) / wall if wall > 0 else None,
+                "mb_read_per_s": self.counters.get("bytes_read", 0) / 2**20 / wall if wall > 0 else None
+            },
+            "slowest_files": [
+                {"file": path, "seconds": seconds} for seconds, path in sorted(self._slowest, reverse=True)
+            ]
+        }
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            result["allocations"] = {
+                "current_mb": current / 2**20,
+                "peak_mb": peak / 2**20,
+                "top_sites": [{"site": str(s.traceback), "size_mb": s.size / 2**20, "count": s.count} for s in top]
+            }
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+            rows = [
+                {"function": f"{func[0]}:{func[1]}({func[2]})", "calls": nc, "tottime_s": tt, "cumtime_s": ct}
+                for func, (_, nc, tt, ct, _) in stats.stats.items()  # type: ignore[attr-defined]
+            ]
+            result["cprofile_top"] = sorted(rows, key=lambda r: r["cumtime_s"], reverse=True)[:30]
+        return result
+
+    def dump(self, path: str) -> Dict[str, Any]:
+        """Пишет итоговый отчет в JSON и печатает краткую сводку.
+
+        Args:
+            path (str): Путь к JSON-файлу.
+
+        Returns:
+            Dict[str, Any]: Записанный отчет.
+        """
+        summary = self.summary()
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+
+        print(f"\n[Profile] wall {summary['wall_time_s']:.2f} s -> {path}")
+        for name, entry in sorted(self.stages.items(), key=lambda kv: -kv[1]["seconds"]):
+            print(f"  {name:<24} {entry['seconds']:9.3f} s  ({int(entry['calls'])} calls)")
+        for name, value in self.counters.items():
+            print(f"  {name:<24} {value:12.0f}")
+        return summary
+
+    @contextlib.contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        """Реализация замера этапа для включенного профайлера."""
+        top_level = self._depth == 0
+        if top_level and self.use_tracemalloc:
+            tracemalloc.reset_peak()
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.add_stage(name, time.perf_counter() - start)
+            if top_level and self.use_tracemalloc:
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                entry = self.stages[name]
+                entry["alloc_peak_mb"] = max(entry.get("alloc_peak_mb", 0.0), peak)
\ No newline at end of file
@@ -0,0 +1,351 @@
+# src/raw_store.py
+
+import io
+import os
+import json
+import shutil
+import numpy as np
+from tqdm import tqdm
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .settings import GlobalConfig
+from .data_loader import IMSRawLoader
+
+class RawSignalStore:
+    """Консолидированное memory-mapped хранилище сырых сигналов теста.
+
+    Все файлы теста лежат одним массивом signals.npy формы
+    (files, samples, channels) в порядке времени, рядом - индекс index.json
+    (имена и метки времени файлов, каналы и их принадлежность подшипникам из
+    ExperimentSpec, длины файлов и отпечатки исходников). Файл короче
+    остальных дополняется NaN, его длина хранится в индексе. Окно
+    (файл, канал, начало, длина) - вид на отображенный массив, пакет окон
+    копируется из него срезами, поэтому читаются только нужные страницы.
+    Новые снимки дописываются в конец массива без перезаписи прежних строк.
+    """
+
+    DIR_NAME: str = "raw_store"
+    DATA_FILE: str = "signals.npy"
+    INDEX_FILE: str = "index.json"
+
+    def __init__(self, config: GlobalConfig, test_name: str):
+        """Инициализация хранилища (без открытия файлов).
+
+        Args:
+            config (GlobalConfig): Глобальный конфиг (cache_path, raw_cache_dtype).
+            test_name (str): Имя теста.
+        """
+        self.config = config
+        self.test_name = test_name
+        self.spec = config.experiments[test_name]
+        self.loader = IMSRawLoader(config)
+        self.store_dir = os.path.join(config.cache_path, self.DIR_NAME, test_name)
+        self.signals: Optional[np.ndarray] = None
+        self.files: List[str] = []
+        self.timestamps: np.ndarray = np.empty(0, dtype="datetime64[s]")
+        self.lengths: np.ndarray = np.empty(0, dtype=np.int64)
+        self.channels: List[str] = list(self.spec.channels)
+        # Имя файла -> (строка массива, размер, mtime_ns исходника)
+        self._rows: Dict[str, Tuple[int, int, int]] = {}
+
+    def exists(self) -> bool:
+        """Есть ли собранное хранилище на диске."""
+        return os.path.exists(os.path.join(self.store_dir, self.INDEX_FILE))
+
+    def open(self) -> "RawSignalStore":
+        """Читает индекс и отображает массив сигналов в память (только чтение).
+
+        Returns:
+            RawSignalStore: Это же хранилище.
+        """
+        with open(os.path.join(self.store_dir, self.INDEX_FILE), encoding="utf-8") as fh:
+            index = json.load(fh)
+        self.files = index["files"]
+        self.timestamps = np.array(index["timestamps"], dtype="datetime64[s]")
+        self.lengths = np.array(index["lengths"], dtype=np.int64)
+        self.channels = index["channels"]
+        self._rows = {name: (i, size, mtime) for i, (name, (size, mtime))
+                      in enumerate(zip(self.files, index["signatures"]))}
+        # Строки за концом индекса (прерванное дописывание) не видны
+        self.signals = np.load(os.path.join(self.store_dir, self.DATA_FILE), mmap_mode="r")[:len(self.files)]
+        return self
+
+    def build(self, file_list: Optional[List[str]] = None) -> int:
+        """Собирает или обновляет хранилище теста.
+
+        Если прежние файлы идут в начале списка в том же порядке (обычный
+        случай - дописан новый снимок), новые строки дописываются в конец
+        signals.npy на месте: файл удлиняется, заголовок .npy и индекс
+        переписываются, старые строки не копируются. Иначе (другой порядок,
+        тип, каналы или более длинный файл) хранилище собирается заново во
+        временной скрытой папке и заменяет старое целиком; строки
+        неизменившихся файлов при этом копируются из прежнего хранилища.
+        Новые файлы читаются через IMSRawLoader (бинарный кеш или текст) один раз.
+
+        Args:
+            file_list (Optional[List[str]]): Файлы теста в порядке времени (по умолчанию все).
+
+        Returns:
+            int: Число прочитанных из исходников файлов.
+
+        Raises:
+            ValueError: Файл длиннее, чем оценено по остальным файлам при полной сборке.
+        """
+        files = file_list if file_list is not None else self.loader.get_file_list(self.test_name)
+        dtype = np.dtype(self.config.raw_cache_dtype)
+        old = RawSignalStore(self.config, self.test_name)
+        if old.exists():
+            try:
+                old.open()
+            except (OSError, ValueError, KeyError):
+                old = RawSignalStore(self.config, self.test_name)
+            if old.signals is not None and (old.channels != list(self.spec.channels) or old.signals.dtype != dtype):
+                old = RawSignalStore(self.config, self.test_name)
+        reused = [old.lookup(f) if old.signals is not None else None for f in files]
+        if old.signals is not None and reused == list(range(len(old.files))):
+            self.open()
+            return 0
+
+        names = [os.path.basename(f) for f in files]
+        min_samples = 0
+        if old.signals is not None and names[:len(old.files)] == old.files:
+            read, min_samples = self._append(old, files, reused)
+            if read is not None:
+                return read
+        return self._rebuild(old, files, reused, dtype, min_samples)
+
+    def _append(self, old: "RawSignalStore", files: List[str],
+                reused: List[Optional[int]]) -> Tuple[Optional[int], int]:
+        """Дописывает новые и перечитывает изменившиеся файлы на месте.
+
+        Returns:
+            Tuple[Optional[int], int]: (число прочитанных файлов, 0) или
+                (None, длина файла), если файл длиннее строки хранилища
+                и нужна полная пересборка.
+        """
+        data_path = os.path.join(self.store_dir, self.DATA_FILE)
+        n_samples = old.signals.shape[1]  # type: ignore[union-attr]
+        lengths = np.zeros(len(files), dtype=np.int64)
+        lengths[:len(old.files)] = old.lengths
+        self._resize(data_path, len(files))
+        signals = np.load(data_path, mmap_mode="r+")
+        pending = [i for i, row in enumerate(reused) if row is None]
+        for i in tqdm(pending, desc=f"Packing {self.test_name}"):
+            data = self.loader.load_file_array(files[i], self.test_name)
+            if len(data) > n_samples:
+                return None, len(data)
+            signals[i, :len(data)] = data
+            signals[i, len(data):] = np.nan
+            lengths[i] = len(data)
+        signals.flush()
+        del signals
+        # Индекс пишется последним: прерванное дописывание оставляет прежний индекс,
+        # строки за его концом игнорируются при открытии
+        self._write_index(self.store_dir, files, lengths)
+        self.open()
+        return len(pending), 0
+
+    def _rebuild(self, old: "RawSignalStore", files: List[str], reused: List[Optional[int]],
+                 dtype: np.dtype, min_samples: int = 0) -> int:
+        """Собирает хранилище заново во временной папке и заменяет им прежнее.
+
+        Длина строки - наибольшая из известных без разбора (строки прежнего
+        хранилища, заголовки бинарного кеша, min_samples) или длина первого
+        нового файла; файл длиннее нее не обрезается, а вызывает ошибку.
+        """
+        lengths = np.zeros(len(files), dtype=np.int64)
+        first: Optional[np.ndarray] = None
+        for i, (file_path, row) in enumerate(zip(files, reused)):
+            if row is not None:
+                lengths[i] = old.lengths[row]
+            else:
+                # Длина известна без разбора только по заголовку бинарного кеша
+                cached = self.loader._open_cached(file_path, self.test_name)
+                lengths[i] = cached.shape[0] if cached is not None else 0
+        n_samples = max(int(lengths.max(initial=0)), min_samples)
+        pending = [i for i, row in enumerate(reused) if row is None]
+        if n_samples == 0 and pending:
+            first = self.loader.load_file_array(files[pending[0]], self.test_name)
+            n_samples = len(first)
+
+        parent = os.path.dirname(self.store_dir)
+        tmp_dir = os.path.join(parent, "." + os.path.basename(self.store_dir))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        read = 0
+        try:
+            signals = np.lib.format.open_memmap(os.path.join(tmp_dir, self.DATA_FILE), mode="w+", dtype=dtype,
+                                                shape=(len(files), n_samples, len(self.spec.channels)))
+            for i, (file_path, row) in enumerate(tqdm(list(zip(files, reused)), desc=f"Packing {self.test_name}",
+                                                      disable=not pending)):
+                if row is not None:
+                    data = old.signals[row, :lengths[i]]  # type: ignore[index]
+                else:
+                    data = first if first is not None and i == pending[0] else \
+                        self.loader.load_file_array(file_path, self.test_name)
+                    if len(data) > n_samples:
+                        raise ValueError(f"{file_path}: {len(data)} отсчетов, ожидалось не больше {n_samples}")
+                    lengths[i] = len(data)
+                    read += 1
+                signals[i, :len(data)] = data
+                signals[i, len(data):] = np.nan
+            signals.flush()
+            del signals
+            self._write_index(tmp_dir, files, lengths)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        old.signals = None
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.store_dir)
+        self.open()
+        return read
+
+    def _write_index(self, store_dir: str, files: List[str], lengths: np.ndarray) -> None:
+        """Атомарно пишет index.json хранилища."""
+        index = {
+            "dtype": np.dtype(self.config.raw_cache_dtype).name,
+            "channels": list(self.spec.channels),
+            "bearing_to_channels": self.spec.bearing_to_channels,
+            "files": [os.path.basename(f) for f in files],
+            "timestamps": np.datetime_as_string(self.loader.parse_timestamps(files)).tolist(),
+            "lengths": lengths.tolist(),
+            "signatures": [list(self._signature(f)) for f in files]
+        }
+        index_path = os.path.join(store_dir, self.INDEX_FILE)
+        tmp_path = os.path.join(store_dir, "." + self.INDEX_FILE)
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(index, fh)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _resize(data_path: str, n_files: int) -> None:
+        """Меняет число файлов (первую ось) в signals.npy на месте.
+
+        Заголовок .npy оставляет запас под рост первой оси, поэтому его длина
+        не меняется; новые строки появляются в конце файла без копирования.
+        """
+        with open(data_path, "r+b") as fh:
+            version = np.lib.format.read_magic(fh)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) \
+                else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(fh)
+            offset = fh.tell()
+            header = io.BytesIO()
+            write_header = np.lib.format.write_array_header_1_0 if version == (1, 0) \
+                else np.lib.format.write_array_header_2_0
+            write_header(header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran_order,
+                                  "shape": (n_files,) + tuple(shape[1:])})
+            if len(header.getvalue()) != offset:
+                raise ValueError(f"Заголовок {data_path} нельзя переписать на месте")
+            fh.seek(0)
+            fh.write(header.getvalue())
+            fh.truncate(offset + n_files * int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize)
+
+    def lookup(self, file_path: str) -> Optional[int]:
+        """Строка массива файла, если он есть в хранилище и исходник не изменился.
+
+        Args:
+            file_path (str): Путь к исходному файлу.
+
+        Returns:
+            Optional[int]: Номер файла в хранилище или None.
+        """
+        entry = self._rows.get(os.path.basename(file_path))
+        if entry is None:
+            return None
+        try:
+            signature = self._signature(file_path)
+        except OSError:
+            return None
+        return entry[0] if signature == entry[1:] else None
+
+    def file_array(self, file_path: str) -> Optional[np.ndarray]:
+        """Сигналы файла без копирования (аналог IMSRawLoader.load_file_array).
+
+        Args:
+            file_path (str): Путь к исходному файлу.
+
+        Returns:
+            Optional[np.ndarray]: Вид (samples, channels) или None, если файла
+                нет в хранилище или он изменился.
+        """
+        row = self.lookup(file_path)
+        if row is None or self.signals is None:
+            return None
+        return self.signals[row, :self.lengths[row]]
+
+    def channel_index(self, channel: Union[int, str]) -> int:
+        """Номер канала по имени (или сам номер)."""
+        return channel if isinstance(channel, (int, np.integer)) else self.channels.index(channel)
+
+    def bearing_channels(self, bearing: str) -> List[int]:
+        """Номера каналов подшипника по ExperimentSpec.bearing_to_channels."""
+        return [self.channels.index(ch) for ch in self.spec.bearing_to_channels[bearing]]
+
+    def locate(self, timestamps: np.ndarray) -> np.ndarray:
+        """Номера последних файлов, записанных не позже заданных моментов.
+
+        Args:
+            timestamps (np.ndarray): Моменты времени (datetime64).
+
+        Returns:
+            np.ndarray: Номера файлов (int64); -1 - момент раньше первого файла.
+        """
+        ts = np.asarray(timestamps, dtype="datetime64[s]")
+        return np.searchsorted(self.timestamps, ts, side="right").astype(np.int64) - 1
+
+    def window(self, file: int, channel: Union[int, str], start: int, length: int) -> np.ndarray:
+        """Одно окно сигнала без копирования.
+
+        Args:
+            file (int): Номер файла в хранилище.
+            channel (Union[int, str]): Канал (номер или имя).
+            start (int): Первый отсчет.
+            length (int): Длина окна.
+
+        Returns:
+            np.ndarray: Вид (length,) на отображенный массив.
+        """
+        self._check(np.array([file]), np.array([start]), length)
+        return self.signals[file, start:start + length, self.channel_index(channel)]  # type: ignore[index]
+
+    def windows(self, files: Sequence[int], channels: Sequence[Union[int, str]], starts: Sequence[int],
+                length: int) -> np.ndarray:
+        """Пакет окон (читаются только страницы с нужными отсчетами).
+
+        Args:
+            files (Sequence[int]): Номера файлов окон.
+            channels (Sequence[Union[int, str]]): Каналы окон (номера или имена).
+            starts (Sequence[int]): Первые отсчеты окон.
+            length (int): Длина окна.
+
+        Returns:
+            np.ndarray: Окна формы (batch, length).
+        """
+        channel_ids = np.array([self.channel_index(c) for c in channels], dtype=np.int64)
+        file_ids, channel_ids, start_ids = np.broadcast_arrays(
+            np.asarray(files, dtype=np.int64), channel_ids, np.asarray(starts, dtype=np.int64)
+        )
+        self._check(file_ids, start_ids, length)
+        # Копирование срезов по одному окну вдвое быстрее общего fancy-индекса:
+        # каждое окно - один проход с постоянным шагом по отображенному массиву
+        signals = self.signals
+        out = np.empty((len(file_ids), length), dtype=signals.dtype)  # type: ignore[union-attr]
+        for i, (f, c, s) in enumerate(zip(file_ids.tolist(), channel_ids.tolist(), start_ids.tolist())):
+            out[i] = signals[f, s:s + length, c]  # type: ignore[index]
+        return out
+
+    def _check(self, files: np.ndarray, starts: np.ndarray, length: int) -> None:
+        """Проверяет, что окна лежат внутри записанных отсчетов файлов."""
+        if self.signals is None:
+            raise RuntimeError(f"Хранилище {self.store_dir} не открыто")
+        if np.any((files < 0) | (files >= len(self.files))):
+            raise IndexError("Номер файла вне хранилища")
+        if length < 1 or np.any(starts < 0) or np.any(starts + length > self.lengths[files]):
+            raise ValueError(f"Окно длины {length} выходит за пределы файла")
+
+    @staticmethod
+    def _signature(file_path: str) -> Tuple[int, int]:
+        """(размер, mtime_ns) исходного файла."""
+        st = os.stat(file_path)
+        return st.st_size, st.st_mtime_ns
@@ -0,0 +1,216 @@
+# src/sequence_store.py
+
+import os
+import json
+import shutil
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import List, Optional, Sequence, Set, Tuple
+from .enhancer import DatasetEnhancer
+
+# (test_id, bearing_id, первая строка, строка за последней)
+Group = Tuple[str, str, int, int]
+
+class SequenceStore:
+    """Memory-mapped хранилище улучшенного датасета для обучения моделей RUL.
+
+    Признаки лежат одной матрицей features.npy (строки x признаки, C-порядок),
+    разметка - векторами rul.npy и health_state.npy, а границы подшипников -
+    в meta.json. Строки подшипника идут подряд и упорядочены по времени,
+    поэтому последовательность длины L с началом s - это срез features[s:s+L]
+    (вид на отображенный файл без копирования), а допустимые начала
+    последовательностей считаются по границам групп и никогда не пересекают
+    подшипник или тест.
+    """
+
+    META_NAME: str = "meta.json"
+
+    def __init__(self, store_dir: str, mmap_mode: str = "r"):
+        """Открывает хранилище.
+
+        Args:
+            store_dir (str): Папка хранилища (SequenceStore.build).
+            mmap_mode (str): Режим np.load: "r" - только чтение, "c" - копирование
+                при записи (записываемые массивы без изменения файлов).
+        """
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, self.META_NAME), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        self.columns: List[str] = meta["columns"]
+        self.groups: List[Group] = [tuple(g) for g in meta["groups"]]  # type: ignore[misc]
+        self.features: np.ndarray = np.load(os.path.join(store_dir, "features.npy"), mmap_mode=mmap_mode)
+        self.rul: np.ndarray = np.load(os.path.join(store_dir, "rul.npy"), mmap_mode=mmap_mode)
+        self.health_state: np.ndarray = np.load(os.path.join(store_dir, "health_state.npy"), mmap_mode=mmap_mode)
+
+    @classmethod
+    def build(cls, enhanced_path: str, store_dir: str, dtype: str = "float32",
+              fill_nan: Optional[float] = 0.0, batch_rows: int = 65536) -> int:
+        """Выгружает улучшенный parquet в хранилище потоково, пакетами строк.
+
+        Файлы пишутся во временную скрытую папку, которая затем заменяет
+        store_dir, поэтому прерванная выгрузка не оставляет полуготового хранилища.
+
+        Args:
+            enhanced_path (str): Улучшенный датасет (один parquet-файл, строки
+                подшипника подряд и по времени, как пишут энхансеры).
+            store_dir (str): Папка хранилища.
+            dtype (str): Тип матрицы признаков ("float32" или "float64").
+            fill_nan (Optional[float]): Замена NaN в признаках (первые строки
+                скользящих средних и diff); None - оставить NaN.
+            batch_rows (int): Строк в одном читаемом пакете.
+
+        Returns:
+            int: Число выгруженных строк.
+
+        Raises:
+            ValueError: Строки подшипника идут не подряд или не по времени.
+        """
+        pf = pq.ParquetFile(enhanced_path)
+        names = pf.schema_arrow.names
+        columns = [c for c in names if c not in DatasetEnhancer.EXCLUDE]
+
+        parent = os.path.dirname(os.path.abspath(store_dir))
+        tmp_dir = os.path.join(parent, "." + os.path.basename(os.path.abspath(store_dir)))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            n_rows, groups = cls._write_arrays(pf, tmp_dir, columns, dtype, fill_nan, batch_rows, enhanced_path)
+            with open(os.path.join(tmp_dir, cls.META_NAME), "w", encoding="utf-8") as fh:
+                json.dump({"columns": columns, "groups": groups, "rows": n_rows, "source": enhanced_path}, fh)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.replace(tmp_dir, store_dir)
+        return n_rows
+
+    @staticmethod
+    def _write_arrays(pf: pq.ParquetFile, tmp_dir: str, columns: List[str], dtype: str,
+                      fill_nan: Optional[float], batch_rows: int, enhanced_path: str) -> Tuple[int, List[List]]:
+        """Пишет массивы хранилища в tmp_dir и находит границы групп."""
+        n_rows = pf.metadata.num_rows
+        features = np.lib.format.open_memmap(os.path.join(tmp_dir, "features.npy"), mode="w+",
+                                             dtype=dtype, shape=(n_rows, len(columns)))
+        rul = np.lib.format.open_memmap(os.path.join(tmp_dir, "rul.npy"), mode="w+",
+                                        dtype=np.float32, shape=(n_rows,))
+        state = np.lib.format.open_memmap(os.path.join(tmp_dir, "health_state.npy"), mode="w+",
+                                          dtype=np.int64, shape=(n_rows,))
+
+        groups: List[List] = []
+        seen: Set[Tuple[str, str]] = set()
+        last_ts = np.datetime64("NaT")
+        pos = 0
+        for batch in pf.iter_batches(batch_size=batch_rows):
+            table = pa.Table.from_batches([batch])
+            n = table.num_rows
+            if not n:
+                continue
+            for j, name in enumerate(columns):
+                values = table.column(name).to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+                if fill_nan is not None:
+                    values = np.where(np.isnan(values), fill_nan, values)
+                features[pos:pos + n, j] = values
+            rul[pos:pos + n] = table.column("rul").to_numpy(zero_copy_only=False)
+            state[pos:pos + n] = table.column("health_state").to_numpy(zero_copy_only=False)
+
+            test_ids = pc.cast(table.column("test_id"), pa.string()).to_numpy(zero_copy_only=False)
+            bearing_ids = pc.cast(table.column("bearing_id"), pa.string()).to_numpy(zero_copy_only=False)
+            ts = table.column("timestamp").to_numpy().astype("datetime64[us]")
+            # Начала групп внутри пакета; первая строка может продолжать группу прошлого пакета
+            changes = np.flatnonzero((test_ids[1:] != test_ids[:-1]) | (bearing_ids[1:] != bearing_ids[:-1])) + 1
+            same = np.ones(n, dtype=bool)
+            same[changes] = False
+            if not groups or (groups[-1][0], groups[-1][1]) != (str(test_ids[0]), str(bearing_ids[0])):
+                same[0] = False
+            elif ts[0] < last_ts:
+                raise ValueError(f"Строки {enhanced_path} не упорядочены по времени внутри подшипника")
+            if np.any(same[1:] & (ts[1:] < ts[:-1])):
+                raise ValueError(f"Строки {enhanced_path} не упорядочены по времени внутри подшипника")
+            for start in np.flatnonzero(~same).tolist():
+                key = (str(test_ids[start]), str(bearing_ids[start]))
+                if key in seen:
+                    raise ValueError(f"Строки подшипника {key} в {enhanced_path} идут не подряд")
+                if groups:
+                    groups[-1][3] = pos + start
+                seen.add(key)
+                groups.append([key[0], key[1], pos + start, n_rows])
+            last_ts = ts[-1]
+            pos += n
+
+        for array in (features, rul, state):
+            array.flush()
+        return n_rows, groups
+
+    def select_groups(self, bearings: Optional[Sequence[Tuple[str, str]]] = None) -> List[Group]:
+        """Группы хранилища, отобранные по (test_id, bearing_id).
+
+        Args:
+            bearings (Optional[Sequence[Tuple[str, str]]]): Пары (test_id, bearing_id);
+                None - все группы (например, для разбиения train/val по подшипникам).
+
+        Returns:
+            List[Group]: Группы в порядке хранения.
+
+        Raises:
+            ValueError: Запрошен подшипник, которого нет в хранилище.
+        """
+        if bearings is None:
+            return list(self.groups)
+        wanted = {(str(t), str(b)) for t, b in bearings}
+        missing = wanted - {(g[0], g[1]) for g in self.groups}
+        if missing:
+            raise ValueError(f"Подшипники {sorted(missing)} отсутствуют в хранилище {self.store_dir}")
+        return [g for g in self.groups if (g[0], g[1]) in wanted]
+
+    def sequence_starts(self, length: int, stride: int = 1,
+                        bearings: Optional[Sequence[Tuple[str, str]]] = None) -> np.ndarray:
+        """Индекс допустимых начал последовательностей.
+
+        Последовательность целиком лежит внутри одной группы: начала идут с
+        шагом stride от первой строки группы до stop - length.
+
+        Args:
+            length (int): Длина последовательности (строк).
+            stride (int): Шаг между началами.
+            bearings (Optional[Sequence[Tuple[str, str]]]): Отбор подшипников (select_groups).
+
+        Returns:
+            np.ndarray: Начала (int64) в порядке хранения.
+        """
+        if length < 1 or stride < 1:
+            raise ValueError("length и stride должны быть положительными")
+        starts = [np.arange(start, stop - length + 1, stride, dtype=np.int64)
+                  for _, _, start, stop in self.select_groups(bearings)]
+        return np.concatenate([np.empty(0, dtype=np.int64)] + starts)
+
+    def sequence(self, start: int, length: int) -> Tuple[np.ndarray, float, int]:
+        """Одна последовательность без копирования.
+
+        Args:
+            start (int): Первая строка (из sequence_starts).
+            length (int): Длина последовательности.
+
+        Returns:
+            Tuple[np.ndarray, float, int]: Вид (length, n_features) на матрицу
+                признаков и разметка последней строки (RUL, класс здоровья).
+        """
+        end = start + length - 1
+        return self.features[start:start + length], float(self.rul[end]), int(self.health_state[end])
+
+    def gather(self, starts: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Пакет последовательностей одним копированием.
+
+        Args:
+            starts (np.ndarray): Начала последовательностей пакета.
+            length (int): Длина последовательности.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Признаки (batch, length,
+                n_features), RUL (batch,) и класс здоровья (batch,) последних строк.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        rows = starts[:, None] + np.arange(length, dtype=np.int64)
+        ends = starts + (length - 1)
+        return np.take(self.features, rows, axis=0), self.rul[ends], self.health_state[ends]
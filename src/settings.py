@@ -1,8 +1,9 @@
 # src/settings.py
 
+import math
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 @dataclass(frozen=True)
 class WindowSettings:
@@ -11,6 +12,64 @@ class WindowSettings:
     step: int = 2048
     sampling_rate: int = 20000
 
+@dataclass(frozen=True)
+class BearingGeometry:
+    """Геометрия подшипника и частота вращения вала (по умолчанию - Rexnord ZA-2115 стенда IMS)."""
+    n_rollers: int = 16
+    pitch_diameter: float = 2.815    # дюймы
+    roller_diameter: float = 0.331   # дюймы
+    contact_angle_deg: float = 15.17
+    shaft_rpm: float = 2000.0
+
+    def defect_frequencies(self) -> Dict[str, float]:
+        """Характерные частоты дефектов (Гц).
+
+        Returns:
+            Dict[str, float]: bpfo (наружное кольцо), bpfi (внутреннее кольцо),
+                bsf (тело качения), ftf (сепаратор).
+        """
+        fr = self.shaft_rpm / 60.0
+        ratio = self.roller_diameter / self.pitch_diameter * math.cos(math.radians(self.contact_angle_deg))
+        return {
+            "bpfo": self.n_rollers / 2.0 * fr * (1.0 - ratio),
+            "bpfi": self.n_rollers / 2.0 * fr * (1.0 + ratio),
+            "bsf": self.pitch_diameter / (2.0 * self.roller_diameter) * fr * (1.0 - ratio**2),
+            "ftf": fr / 2.0 * (1.0 - ratio)
+        }
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """Формат хранения parquet базового и улучшенного датасетов.
+
+    По умолчанию совпадает с прежним форматом; StorageProfile.compact() -
+    компактный вариант для обучения (float32, zstd, порядок по подшипникам).
+    """
+    # Тип признаков: "float64" или "float32" (с проверкой точности при записи)
+    float_dtype: str = "float64"
+    # Допустимая относительная ошибка понижения до float32
+    float32_rtol: float = 1e-6
+    # test_id/bearing_id как словарь (pandas category) или обычные строки
+    dictionary_ids: bool = True
+    # Тип health_state ("int64" или "int8"). Словарный тип не нужен: parquet и так
+    # пишет колонку из трех классов словарными страницами, а целочисленный словарь
+    # pyarrow при чтении все равно раскрывает в обычные числа
+    health_state_dtype: str = "int64"
+    # Кодек parquet ("snappy", "zstd", "gzip", "lz4", "none") и его уровень
+    compression: str = "snappy"
+    compression_level: Optional[int] = None
+    # Максимум строк в row group; row group не пересекает границу подшипника,
+    # если строки подшипника идут подряд
+    row_group_rows: int = 65536
+    # Сортировка строк перед записью таблицы (None - порядок писателя);
+    # (test_id, bearing_id, timestamp) дает узкие min/max в статистике row group
+    sort_by: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def compact(cls) -> "StorageProfile":
+        """Компактный профиль: float32, int8, zstd, сортировка по подшипникам."""
+        return cls(float_dtype="float32", health_state_dtype="int8", compression="zstd",
+                   compression_level=3, sort_by=("test_id", "bearing_id", "timestamp"))
+
 @dataclass(frozen=True)
 class ExperimentSpec:
     """Описание структуры эксперимента."""
@@ -27,13 +86,111 @@ class GlobalConfig:
     """Глобальные настройки проекта."""
     raw_data_path: str = "/media/Cruiser/rnd_data/data/"
     output_path: str = "./processed_data.parquet"
+    # Кеш бинарных копий сырых сигналов (.npy на каждый файл + индекс времени)
+    cache_path: str = "./cache/"
+    use_raw_cache: bool = True
+    raw_cache_dtype: str = "float64"
+    # Консолидированное хранилище сырых сигналов (RawSignalStore): все файлы
+    # теста одним memory-mapped массивом (files, samples, channels)
+    use_raw_store: bool = False
+    # Кеш признаков по файлам (cache_path/features): ключ - отпечаток файла
+    # ("stat" - путь/размер/mtime, "content" - хеш содержимого), окно и версии
+    # признаков; при превышении лимита (МБ) вытесняются давно не использованные
+    use_feature_cache: bool = True
+    feature_cache_key: str = "stat"
+    feature_cache_max_mb: Optional[float] = 2048.0
     
     # Константы разметки здоровья
     rul_threshold_hours: float = 100.0
     health_threshold_yellow: float = 20.0
+    # Схема разметки RUL из src/labeling.py: "piecewise_linear" (RUL ограничен
+    # порогом), "linear" (без ограничения, у неотказавших NaN), "exponential"
+    labeling_scheme: str = "piecewise_linear"
+
+    # Число потоков scipy.fft для пакетного БПФ (None - значение по умолчанию)
+    fft_workers: Optional[int] = None
+
+    # Перекрывающиеся окна (window.step < window.length): признаки по бегущим
+    # суммам и скользящему STFT, время не растет с перекрытием (только numpy)
+    running_stats: bool = True
+
+    # Дополнительные признаки реестра (src/feature_registry.py), например
+    # ["band_energy", "envelope_defects"]; параметры - полосы спектра (Гц),
+    # полоса демодуляции огибающей (None - вся) и геометрия подшипника
+    extra_features: List[str] = field(default_factory=list)
+    spectral_bands: List[Tuple[float, float]] = field(
+        default_factory=lambda: [(0.0, 1000.0), (1000.0, 3000.0), (3000.0, 6000.0), (6000.0, 10000.0)]
+    )
+    envelope_band: Optional[Tuple[float, float]] = None
+    bearing: BearingGeometry = field(default_factory=BearingGeometry)
+
+    # Движок признаков: "numpy" (NumPy/SciPy) или "torch" (TorchFeatureEngine).
+    # Для torch: устройство (None - по плану ресурсов, без плана - cuda при
+    # наличии), потоки intra-op (None - по умолчанию torch) и тип вычислений
+    feature_backend: str = "numpy"
+    torch_device: Optional[str] = None
+    torch_threads: Optional[int] = None
+    torch_dtype: str = "float64"
+
+    # План ресурсов (EnvironmentAdapter.plan): при auto_plan число процессов,
+    # потоки BLAS/FFT/torch, размеры пакетов и бюджет памяти выбираются по
+    # ядрам, RAM и лимитам cgroup (переопределение - переменные PIML_*)
+    auto_plan: bool = True
+    # Потоки BLAS/OpenMP на процесс (None - по умолчанию библиотек), бюджет
+    # памяти пайплайна и этапа улучшения в МБ (None - не ограничен; выше
+    # бюджета улучшения датасет улучшается потоково)
+    blas_threads: Optional[int] = None
+    memory_budget_mb: Optional[float] = None
+    enhance_budget_mb: Optional[float] = None
+
+    # Параллельная обработка файлов: число процессов (1 - последовательно)
+    # и число файлов, передаваемых процессу за одну задачу
+    workers: int = 1
+    chunk_size: int = 8
+    # Опережающее чтение при workers=1 (PrefetchReader): сколько файлов читается
+    # вперед (0 - без опережения) и число потоков чтения (> 1 для сетевых дисков)
+    prefetch_files: int = 4
+    prefetch_threads: int = 1
+
+    # Инкрементальная сборка: сколько файлов входит в одну часть датасета
+    # (часть фиксируется в манифесте целиком, это единица возобновления)
+    commit_every: int = 100
+    # Режим наблюдения: сколько мелких частей (меньше commit_every файлов)
+    # теста накапливается до слияния в одну
+    watch_compact_parts: int = 16
+    # Размер record batch при потоковой записи parquet (строк)
+    write_batch_rows: int = 65536
+    # Формат хранения parquet (типы, кодек, row group, сортировка)
+    storage: StorageProfile = field(default_factory=StorageProfile)
+
+    # Профилирование этапов (таймеры и счетчики; JSON рядом с output_path)
+    profile: bool = False
 
     window: WindowSettings = field(default_factory=WindowSettings)
 
+    # Временные признаки энхансера: основное и дополнительные окна скользящего
+    # среднего (в строках датасета) и параметры span экспоненциального среднего
+    rolling_window: int = 10
+    extra_rolling_windows: List[int] = field(default_factory=list)
+    ewm_spans: List[int] = field(default_factory=list)
+    # Out-of-core улучшение (StreamingEnhancer): датасет читается по подшипникам
+    # пакетами по enhance_batch_rows строк и дописывается в файл по мере расчета
+    enhance_out_of_core: bool = False
+    enhance_batch_rows: int = 65536
+
+    # Выгрузка улучшенного датасета в memory-mapped хранилище последовательностей
+    # (SequenceStore) для обучения: тип признаков, замена NaN и параметры окна
+    export_sequences: bool = False
+    sequence_dtype: str = "float32"
+    sequence_fill_nan: Optional[float] = 0.0
+    sequence_length: int = 30
+    sequence_stride: int = 1
+    # Строк в читаемом пакете при выгрузке
+    export_batch_rows: int = 65536
+
+    # Эксперименты, обрабатываемые за один запуск
+    target_tests: List[str] = field(default_factory=lambda: ["1st_test"])
+
     # Спецификации экспериментов NASA IMS
     experiments: Dict[str, ExperimentSpec] = field(default_factory=lambda: {
         "1st_test": ExperimentSpec(
@@ -1,12 +1,33 @@
 # src/spectral_engine.py
 
 import numpy as np
+from functools import lru_cache
 from scipy.fft import rfft, rfftfreq
-from typing import Dict
+from typing import Dict, Optional
+from .windowing import segment_signal
 
 class SpectralCalculator:
     """Класс для частотного анализа вибрационного сигнала."""
 
+    # Версии формул признаков (см. FeatureCalculator.FEATURE_VERSIONS)
+    FEATURE_VERSIONS: Dict[str, int] = {"spectral_centroid": 1, "spectral_energy": 1}
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def frequency_grid(n: int, sampling_rate: int) -> np.ndarray:
+        """Возвращает ось частот rfft, закешированную по (n, sampling_rate).
+
+        Args:
+            n (int): Длина окна в отсчетах.
+            sampling_rate (int): Частота дискретизации (Гц).
+
+        Returns:
+            np.ndarray: Массив частот (Гц) длины n // 2 + 1. Только для чтения.
+        """
+        xf: np.ndarray = rfftfreq(n, 1 / sampling_rate)
+        xf.setflags(write=False)
+        return xf
+
     @staticmethod
     def calculate_spectral(signal: np.ndarray, sampling_rate: int) -> Dict[str, float]:
         """Вычисляет спектральные характеристики окна сигнала через БПФ.
@@ -23,7 +44,7 @@ class SpectralCalculator:
         detrended: np.ndarray = signal - np.mean(signal)
         
         yf: np.ndarray = np.asarray(rfft(detrended))
-        xf: np.ndarray = rfftfreq(n, 1 / sampling_rate)
+        xf: np.ndarray = SpectralCalculator.frequency_grid(n, sampling_rate)
         psd: np.ndarray = np.abs(yf)**2 
 
         sum_psd: float = float(np.sum(psd))
@@ -35,4 +56,61 @@ class SpectralCalculator:
             "spectral_centroid": float(np.sum(xf * psd) / sum_psd),
             "spectral_energy": float(sum_psd / n)
         }
-        return features
\ No newline at end of file
+        return features
+
+    @staticmethod
+    def calculate_spectral_batch(windows: np.ndarray, sampling_rate: int,
+                                 workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Вычисляет спектральные признаки для пачки окон одним вызовом rfft.
+
+        Обертка над реестром признаков (feature_registry.compute_features) -
+        тем же путем, которым признаки считает FileProcessor. Все окна всех
+        каналов преобразуются вдоль последней оси за один проход. Результат
+        совпадает с calculate_spectral в пределах точности.
+
+        Args:
+            windows (np.ndarray): Окна формы (..., win_len), например
+                (channels, n_windows, win_len).
+            sampling_rate (int): Частота дискретизации (Гц).
+            workers (Optional[int]): Число потоков scipy.fft (None - по умолчанию).
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы windows.shape[:-1].
+        """
+        from .feature_registry import FeatureContext, compute_features
+        ctx = FeatureContext(windows, sampling_rate, fft_workers=workers)
+        return compute_features(ctx, list(SpectralCalculator.FEATURE_VERSIONS))
+
+    @staticmethod
+    def calculate_stft(signals: np.ndarray, length: int, step: int, sampling_rate: int,
+                       workers: Optional[int] = None, max_chunk_mb: float = 64.0) -> Dict[str, np.ndarray]:
+        """Спектральные признаки перекрывающихся окон (скользящее STFT).
+
+        Кадры берутся stride view без копирования сигнала и преобразуются
+        пачками по оси окон, чтобы спектр при сильном перекрытии не занимал
+        память пропорционально length / step.
+
+        Args:
+            signals (np.ndarray): Сигналы формы (samples,) или (channels, samples).
+            length (int): Длина окна.
+            step (int): Шаг между окнами.
+            sampling_rate (int): Частота дискретизации (Гц).
+            workers (Optional[int]): Число потоков scipy.fft.
+            max_chunk_mb (float): Предельный объем спектра одной пачки (МБ).
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы signals.shape[:-1] + (n_windows,).
+        """
+        frames = segment_signal(np.asarray(signals, dtype=np.float64), length, step)
+        n_windows = frames.shape[-2]
+        # Комплексный спектр одного окна всех каналов: (length // 2 + 1) * 16 байт на канал
+        per_window = int(np.prod(frames.shape[:-2], dtype=np.int64)) * (length // 2 + 1) * 16
+        chunk = max(1, int(max_chunk_mb * 2**20 // per_window))
+        if n_windows <= chunk:
+            return SpectralCalculator.calculate_spectral_batch(frames, sampling_rate, workers=workers)
+
+        parts = [
+            SpectralCalculator.calculate_spectral_batch(frames[..., i:i + chunk, :], sampling_rate, workers=workers)
+            for i in range(0, n_windows, chunk)
+        ]
+        return {k: np.concatenate([p[k] for p in parts], axis=-1) for k in parts[0]}
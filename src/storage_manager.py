@@ -1,14 +1,322 @@
 # src/storage_manager.py
 
+import os
+import glob
+import time
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
 from datetime import datetime
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Set, Tuple
+from .settings import StorageProfile
+
+# Колонки-идентификаторы (словарные в StorageProfile.dictionary_ids)
+ID_COLUMNS: Tuple[str, ...] = ("test_id", "bearing_id")
+
+def read_dataset(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Читает parquet-файл или hive-партиционированный датасет в DataFrame.
+
+    Схемы частей объединяются: у тестов разный набор каналов, и без этого
+    колонки тестов, не попавших в первую часть, были бы потеряны.
+
+    Args:
+        path (str): Путь к файлу или корневой папке датасета.
+        columns (Optional[List[str]]): Читаемые колонки (по умолчанию все).
+
+    Returns:
+        pd.DataFrame: Данные в порядке частей (тест -> подшипник -> время).
+    """
+    return open_dataset(path).to_table(columns=columns).to_pandas()
+
+def open_dataset(path: str) -> ds.Dataset:
+    """Открывает parquet-файл или hive-партиционированный датасет с объединенной схемой.
+
+    Читаются только футеры частей; порядок колонок схемы совпадает с read_dataset.
+
+    Args:
+        path (str): Путь к файлу или корневой папке датасета.
+
+    Returns:
+        ds.Dataset: Датасет pyarrow.
+    """
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+    schema = pa.unify_schemas(
+        [dataset.schema] + [fragment.physical_schema for fragment in dataset.get_fragments()]
+    )
+    return ds.dataset(path, schema=schema, format="parquet", partitioning=partitioning)
+
+def profile_field(field: pa.Field, profile: StorageProfile) -> pa.Field:
+    """Тип колонки в хранилище согласно профилю.
+
+    Args:
+        field (pa.Field): Исходное поле.
+        profile (StorageProfile): Профиль хранения.
+
+    Returns:
+        pa.Field: Поле с типом хранения.
+    """
+    if field.name in ID_COLUMNS:
+        return pa.field(field.name, pa.dictionary(pa.int32(), pa.string()) if profile.dictionary_ids else pa.string())
+    if field.name == "health_state":
+        return pa.field(field.name, pa.from_numpy_dtype(np.dtype(profile.health_state_dtype)))
+    if pa.types.is_float64(field.type) and profile.float_dtype == "float32":
+        return pa.field(field.name, pa.float32())
+    return field
+
+def downcast_float32(values: np.ndarray, name: str, rtol: float) -> np.ndarray:
+    """Понижает float64 до float32 с проверкой точности.
+
+    Args:
+        values (np.ndarray): Значения колонки.
+        name (str): Имя колонки (для сообщения об ошибке).
+        rtol (float): Допустимая относительная ошибка.
+
+    Returns:
+        np.ndarray: Значения в float32.
+
+    Raises:
+        ValueError: Значения выходят за диапазон float32 или теряют точность
+            сильнее rtol (например, субнормальные числа).
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        narrow = values.astype(np.float32)
+        error = np.abs(narrow.astype(np.float64) - values)
+        ok = (narrow == values) | np.isnan(values) | (error <= rtol * np.abs(values))
+    if not ok.all():
+        bad = values[~ok]
+        raise ValueError(f"Колонка {name}: {bad.size} значений не представимы в float32 с точностью "
+                         f"{rtol:g} (например, {bad[0]!r}); используйте StorageProfile.float_dtype='float64'")
+    return narrow
+
+def cast_column(column: Any, field: pa.Field, profile: StorageProfile) -> pa.Array:
+    """Приводит колонку к типу хранения (NaN в float-колонках пишется как null).
+
+    Args:
+        column (Any): Массив NumPy, pa.Array или pa.ChunkedArray.
+        field (pa.Field): Поле из profile_field.
+        profile (StorageProfile): Профиль хранения.
+
+    Returns:
+        pa.Array: Колонка типа field.type.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    if pa.types.is_floating(field.type):
+        values = column.to_numpy(zero_copy_only=False) if isinstance(column, pa.Array) else np.asarray(column)
+        values = values.astype(np.float64, copy=False)
+        if pa.types.is_float32(field.type):
+            values = downcast_float32(values, field.name, profile.float32_rtol)
+        return pa.array(values, type=field.type, from_pandas=True)
+    if not isinstance(column, pa.Array):
+        column = pa.array(column)
+    return column.cast(field.type)
+
+def writer_options(profile: StorageProfile) -> Dict[str, Any]:
+    """Параметры pq.ParquetWriter / pq.write_table для профиля."""
+    return {"compression": profile.compression, "compression_level": profile.compression_level}
+
+def row_group_bounds(table: pa.Table, max_rows: int) -> List[Tuple[int, int]]:
+    """Границы row group: не больше max_rows строк и без пересечения групп (test_id, bearing_id).
+
+    Выравнивание по группам выполняется, только если строки каждой группы идут подряд.
+
+    Args:
+        table (pa.Table): Таблица в порядке записи.
+        max_rows (int): Максимум строк в row group.
+
+    Returns:
+        List[Tuple[int, int]]: Пары (начало, конец).
+    """
+    n = table.num_rows
+    cuts = {0, n}
+    keys = [k for k in ID_COLUMNS if k in table.column_names]
+    if keys and n:
+        changed = np.zeros(n, dtype=bool)
+        changed[0] = True
+        codes = [pd.factorize(table.column(k).to_numpy())[0] for k in keys]
+        for c in codes:
+            changed[1:] |= c[1:] != c[:-1]
+        starts = np.flatnonzero(changed)
+        n_groups = len(set(zip(*(c[starts] for c in codes))))
+        if len(starts) == n_groups:
+            cuts.update(starts.tolist())
+    bounds = sorted(cuts)
+    result: List[Tuple[int, int]] = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        result += [(start, min(start + max_rows, hi)) for start in range(lo, hi, max_rows)]
+    return result
+
+def write_frame(df: pd.DataFrame, path: str, profile: StorageProfile) -> None:
+    """Пишет DataFrame в parquet по профилю хранения (атомарно).
+
+    Args:
+        df (pd.DataFrame): Данные.
+        path (str): Итоговый путь к файлу.
+        profile (StorageProfile): Профиль хранения.
+    """
+    if profile.sort_by:
+        df = df.sort_values([c for c in profile.sort_by if c in df.columns], kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema([profile_field(f, profile) for f in table.schema])
+    table = pa.Table.from_arrays(
+        [cast_column(table.column(f.name), f, profile) for f in schema], schema=schema
+    )
+    tmp_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path))
+    with pq.ParquetWriter(tmp_path, schema, **writer_options(profile)) as writer:
+        for lo, hi in row_group_bounds(table, profile.row_group_rows):
+            writer.write_table(table.slice(lo, hi - lo), row_group_size=hi - lo)
+    os.replace(tmp_path, path)
+
+def compact_parts(root: str, part_names: List[str], target_name: str, profile: StorageProfile) -> int:
+    """Сливает части датасета теста в одну в каждой hive-партиции.
+
+    Строки идут в порядке part_names; файл каждой партиции пишется во
+    временный скрытый файл и атомарно переименовывается. Исходные части не
+    удаляются: это делает манифест после фиксации слитой части.
+
+    Args:
+        root (str): Папка теста (например, .../test_id=1st_test).
+        part_names (List[str]): Имена сливаемых частей.
+        target_name (str): Имя слитой части.
+        profile (StorageProfile): Профиль хранения (кодек, размер row group).
+
+    Returns:
+        int: Число строк в слитой части.
+    """
+    rows = 0
+    for part_dir in sorted(glob.glob(os.path.join(root, "*=*"))):
+        paths = [os.path.join(part_dir, name) for name in part_names]
+        tables = [pq.ParquetFile(p).read() for p in paths if os.path.exists(p)]
+        if not tables:
+            continue
+        table = pa.concat_tables(tables)
+        tmp_path = os.path.join(part_dir, "." + target_name)
+        pq.write_table(table, tmp_path, row_group_size=profile.row_group_rows, **writer_options(profile))
+        os.replace(tmp_path, os.path.join(part_dir, target_name))
+        rows += table.num_rows
+    return rows
+
+def bearing_row_groups(path: str, test_id: str, bearing_id: str) -> List[Tuple[str, List[int]]]:
+    """Файлы и row group, которые могут содержать строки подшипника.
+
+    Hive-партиции отбираются по пути, row group - по min/max статистике
+    test_id/bearing_id (фильтры pyarrow.dataset не используют статистику
+    словарных колонок, поэтому отбор выполняется по футеру вручную).
+
+    Args:
+        path (str): Parquet-файл или папка датасета.
+        test_id (str): ID эксперимента.
+        bearing_id (str): Имя подшипника.
+
+    Returns:
+        List[Tuple[str, List[int]]]: (путь к файлу, номера row group).
+    """
+    keys = {"test_id": test_id, "bearing_id": bearing_id}
+    result: List[Tuple[str, List[int]]] = []
+    for fragment in open_dataset(path).get_fragments():
+        partition = ds.get_partition_keys(fragment.partition_expression)
+        if any(str(partition[k]) != v for k, v in keys.items() if k in partition):
+            continue
+        meta = pq.ParquetFile(fragment.path).metadata
+        names = [meta.schema.column(j).name for j in range(meta.num_columns)]
+        groups = []
+        for g in range(meta.num_row_groups):
+            matches = True
+            for key, value in keys.items():
+                if key in partition or key not in names:
+                    continue
+                stats = meta.row_group(g).column(names.index(key)).statistics
+                if stats is not None and stats.has_min_max:
+                    low, high = (v.decode() if isinstance(v, bytes) else v for v in (stats.min, stats.max))
+                    matches = matches and low <= value <= high
+            if matches:
+                groups.append(g)
+        if groups:
+            result.append((fragment.path, groups))
+    return result
+
+def read_bearing(path: str, test_id: str, bearing_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Читает строки одного подшипника, не открывая чужие партиции и row group.
+
+    Args:
+        path (str): Parquet-файл или папка датасета.
+        test_id (str): ID эксперимента.
+        bearing_id (str): Имя подшипника.
+        columns (Optional[List[str]]): Колонки (по умолчанию все колонки файлов).
+
+    Returns:
+        pd.DataFrame: Строки подшипника в порядке хранения (без колонок-ключей партиций).
+    """
+    tables = []
+    for file_path, groups in bearing_row_groups(path, test_id, bearing_id):
+        pf = pq.ParquetFile(file_path)
+        names = pf.schema_arrow.names
+        read_columns = None if columns is None else [c for c in dict.fromkeys(list(columns) + list(ID_COLUMNS)) if c in names]
+        table = pf.read_row_groups(groups, columns=read_columns)
+        for key, value in (("test_id", test_id), ("bearing_id", bearing_id)):
+            if key in table.column_names:
+                table = table.filter(pc.equal(pc.cast(table.column(key), pa.string()), value))
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+def dataset_bytes(path: str) -> int:
+    """Размер parquet-файла или всех файлов папки датасета (байты)."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names if name.endswith(".parquet"))
+
+def storage_report(paths: Dict[str, str], bearing: Optional[Tuple[str, str]] = None,
+                   columns: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Сравнивает варианты хранения одного датасета по размеру и времени чтения.
+
+    Args:
+        paths (Dict[str, str]): Имя варианта -> путь к датасету.
+        bearing (Optional[Tuple[str, str]]): (test_id, bearing_id) для замера
+            чтения одного подшипника (по умолчанию первая группа первого варианта).
+        columns (Optional[List[str]]): Колонки для частичного чтения (по умолчанию все).
+
+    Returns:
+        Dict[str, Dict[str, float]]: Вариант -> size_mb, read_s (весь датасет),
+            bearing_read_s (один подшипник), bearing_row_groups (прочитано row group).
+    """
+    report: Dict[str, Dict[str, float]] = {}
+    for name, path in paths.items():
+        start = time.perf_counter()
+        df = read_dataset(path, columns)
+        read_s = time.perf_counter() - start
+        if bearing is None:
+            first = df.iloc[0]
+            bearing = (str(first["test_id"]), str(first["bearing_id"]))
+        del df
+
+        start = time.perf_counter()
+        read_bearing(path, bearing[0], bearing[1], columns)
+        bearing_read_s = time.perf_counter() - start
+        row_groups = sum(len(groups) for _, groups in bearing_row_groups(path, bearing[0], bearing[1]))
+
+        report[name] = {
+            "size_mb": dataset_bytes(path) / 2**20,
+            "read_s": read_s,
+            "bearing_read_s": bearing_read_s,
+            "bearing_row_groups": float(row_groups)
+        }
+    return report
 
 class DataAggregator:
     """Аккумулирует признаки и сохраняет итоговый результат."""
 
     def __init__(self):
         self.rows: List[Dict] = []
+        self.frames: List[pd.DataFrame] = []
 
     def add_row(self, timestamp: datetime, test_id: str, bearing_id: str, features: Dict[str, float], rul: float, health_state: int):
         """Добавляет строку в общий набор.
@@ -31,13 +339,247 @@ class DataAggregator:
         row.update(features)
         self.rows.append(row)
 
-    def save(self, path: str):
+    def add_batch(self, timestamp: datetime, test_id: str, columns: Dict[str, np.ndarray]):
+        """Добавляет колоночный блок строк одного файла.
+
+        Args:
+            timestamp (datetime): Метка времени файла.
+            test_id (str): ID эксперимента.
+            columns (Dict[str, np.ndarray]): Колонки bearing_id, rul, health_state
+                и признаки одинаковой длины.
+        """
+        block = {
+            "timestamp": timestamp,
+            "test_id": test_id,
+            "bearing_id": columns["bearing_id"],
+            "rul": columns["rul"],
+            "health_state": columns["health_state"]
+        }
+        block.update(columns)
+        self.frames.append(pd.DataFrame(block))
+
+    def save(self, path: str, profile: Optional[StorageProfile] = None):
         """Сохраняет накопленные данные в Parquet.
 
         Args:
             path (str): Путь к файлу.
+            profile (Optional[StorageProfile]): Профиль хранения (по умолчанию
+                StorageProfile()). Строки сортируются по (test_id, timestamp,
+                bearing_id); sort_by профиля применяется поверх этой сортировки
+                устойчиво, поэтому внутри равных ключей порядок сохраняется.
         """
-        df = pd.DataFrame(self.rows)
+        frames = ([pd.DataFrame(self.rows)] if self.rows else []) + self.frames
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
         # Сортируем для удобства последующего анализа
         df = df.sort_values(["test_id", "timestamp", "bearing_id"])
-        df.to_parquet(path, index=False)
\ No newline at end of file
+        write_frame(df, path, profile if profile is not None else StorageProfile())
+
+class ColumnarAggregator:
+    """Потоковый агрегатор: типизированные буферы -> Arrow record batches -> Parquet.
+
+    Строки копятся в заранее выделенных колоночных буферах фиксированного
+    размера и сбрасываются в ParquetWriter по мере заполнения, поэтому пиковая
+    память ограничена одним батчем. Колонки test_id/bearing_id хранятся
+    словарным кодированием. Сортировка не выполняется: строки приходят уже
+    упорядоченными по времени.
+    """
+
+    ID_COLUMNS: Tuple[str, ...] = ("test_id", "bearing_id")
+
+    def __init__(self, path: str, batch_rows: int = 65536, exclude: Tuple[str, ...] = (),
+                 profile: Optional[StorageProfile] = None):
+        """Инициализация агрегатора.
+
+        Данные пишутся во временный файл рядом с path (имя с точкой игнорируется
+        читателями parquet) и атомарно переименовываются в close().
+
+        Args:
+            path (str): Итоговый путь к parquet-файлу.
+            batch_rows (int): Число строк в одном record batch.
+            exclude (Tuple[str, ...]): Колонки, не попадающие в файл
+                (например, ключи hive-партиций, заданные путем).
+            profile (Optional[StorageProfile]): Профиль хранения (типы, кодек,
+                размер row group); по умолчанию StorageProfile().
+        """
+        self.path = path
+        self.profile = profile if profile is not None else StorageProfile()
+        self.tmp_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path))
+        self.batch_rows = batch_rows
+        self.exclude = exclude
+        self._input_columns: Set[str] = set()
+        self.n_rows: int = 0
+        self._fill: int = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._schema: Optional[pa.Schema] = None
+        self._buffers: Dict[str, np.ndarray] = {}
+        # Словари для id-колонок: значение -> код
+        self._codes: Dict[str, Dict[str, int]] = {c: {} for c in self.ID_COLUMNS}
+
+    def add_batch(self, timestamp: datetime, test_id: str, columns: Dict[str, np.ndarray]):
+        """Добавляет колоночный блок строк одного файла.
+
+        Args:
+            timestamp (datetime): Метка времени файла.
+            test_id (str): ID эксперимента.
+            columns (Dict[str, np.ndarray]): Колонки bearing_id, rul, health_state
+                и признаки одинаковой длины.
+        """
+        if self._schema is None:
+            self._open(columns)
+        elif set(columns) != self._input_columns:
+            raise ValueError("Набор колонок блока не совпадает со схемой агрегатора")
+
+        n = len(columns["bearing_id"])
+        block: Dict[str, Any] = dict(columns)
+        block["timestamp"] = np.datetime64(timestamp, "us")
+        if "test_id" in self._buffers:
+            block["test_id"] = self._encode("test_id", test_id)
+        if "bearing_id" in self._buffers:
+            block["bearing_id"] = self._encode_array("bearing_id", columns["bearing_id"])
+        for name, buf in self._buffers.items():
+            if buf.dtype == np.float32 and name in columns:
+                block[name] = downcast_float32(np.asarray(columns[name], dtype=np.float64), name,
+                                               self.profile.float32_rtol)
+
+        start = 0
+        while start < n:
+            take = min(n - start, self.batch_rows - self._fill)
+            dst = slice(self._fill, self._fill + take)
+            for name, buf in self._buffers.items():
+                value = block[name]
+                buf[dst] = value[start:start + take] if np.ndim(value) else value
+            self._fill += take
+            start += take
+            if self._fill == self.batch_rows:
+                self._flush()
+        self.n_rows += n
+
+    def close(self) -> None:
+        """Сбрасывает последний неполный батч и атомарно публикует файл.
+
+        Если add_batch не вызывался, файл не создается.
+        """
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self.tmp_path, self.path)
+
+    def _open(self, columns: Dict[str, np.ndarray]) -> None:
+        """Создает схему, буферы и ParquetWriter по первому блоку."""
+        fields = [
+            pa.field("timestamp", pa.timestamp("us")),
+            pa.field("test_id", pa.dictionary(pa.int32(), pa.string())),
+            pa.field("bearing_id", pa.dictionary(pa.int32(), pa.string())),
+            pa.field("rul", pa.float64()),
+            pa.field("health_state", pa.int64())
+        ]
+        fields += [
+            pa.field(name, pa.from_numpy_dtype(values.dtype))
+            for name, values in columns.items() if name not in ("bearing_id", "rul", "health_state")
+        ]
+        self._schema = pa.schema([profile_field(f, self.profile) for f in fields if f.name not in self.exclude])
+        self._input_columns = set(columns)
+
+        for field in self._schema:
+            if field.name in self.ID_COLUMNS:
+                # id-колонки копятся словарными кодами
+                dtype = np.dtype(np.int32)
+            else:
+                dtype = np.dtype(field.type.to_pandas_dtype())
+            self._buffers[field.name] = np.empty(self.batch_rows, dtype=dtype)
+
+        self._writer = pq.ParquetWriter(self.tmp_path, self._schema, **writer_options(self.profile))
+
+    def _encode(self, column: str, value: str) -> np.int32:
+        """Возвращает словарный код значения id-колонки."""
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+        return np.int32(codes[value])
+
+    def _encode_array(self, column: str, values: np.ndarray) -> np.ndarray:
+        """Кодирует массив значений id-колонки."""
+        uniques, inverse = np.unique(values, return_inverse=True)
+        lookup = np.array([self._encode(column, str(u)) for u in uniques], dtype=np.int32)
+        return lookup[inverse]
+
+    def _flush(self) -> None:
+        """Пишет заполненную часть буферов как один record batch."""
+        if self._fill == 0 or self._writer is None or self._schema is None:
+            return
+        arrays = []
+        for field in self._schema:
+            data = self._buffers[field.name][:self._fill]
+            if field.name in self.ID_COLUMNS:
+                dictionary = pa.array(list(self._codes[field.name]), type=pa.string())
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array(data), dictionary).cast(field.type))
+            else:
+                arrays.append(pa.array(data, type=field.type))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema),
+                                 row_group_size=self.profile.row_group_rows)
+        self._fill = 0
+
+
+class PartitionedAggregator:
+    """Раскладывает строки теста по hive-партициям bearing_id=<имя>.
+
+    Внутри каждой партиции пишет ColumnarAggregator; сам ключ партиции
+    в файл не попадает и восстанавливается читателем из пути.
+    """
+
+    def __init__(self, root: str, file_name: str, batch_rows: int = 65536,
+                 partition_column: str = "bearing_id", profile: Optional[StorageProfile] = None):
+        """Инициализация агрегатора.
+
+        Args:
+            root (str): Папка теста (например, .../test_id=1st_test).
+            file_name (str): Имя файла части внутри каждой партиции.
+            batch_rows (int): Число строк в одном record batch.
+            partition_column (str): Колонка-ключ партиции.
+            profile (Optional[StorageProfile]): Профиль хранения частей.
+        """
+        self.root = root
+        self.file_name = file_name
+        self.batch_rows = batch_rows
+        self.partition_column = partition_column
+        self.profile = profile
+        self._writers: Dict[str, ColumnarAggregator] = {}
+
+    def add_batch(self, timestamp: datetime, test_id: str, columns: Dict[str, np.ndarray]):
+        """Добавляет колоночный блок строк одного файла, разбивая его по партициям.
+
+        Args:
+            timestamp (datetime): Метка времени файла.
+            test_id (str): ID эксперимента.
+            columns (Dict[str, np.ndarray]): Колонки блока, включая partition_column.
+        """
+        keys = columns[self.partition_column]
+        # Уникальные значения в порядке появления
+        for value in dict.fromkeys(keys.tolist()):
+            mask = keys == value
+            self._writer_for(value).add_batch(
+                timestamp, test_id, {name: col[mask] for name, col in columns.items()}
+            )
+
+    @property
+    def n_rows(self) -> int:
+        """Число строк, записанных во все партиции."""
+        return sum(writer.n_rows for writer in self._writers.values())
+
+    def close(self) -> None:
+        """Закрывает все партиции (без строк файлы части не создаются)."""
+        for writer in self._writers.values():
+            writer.close()
+
+    def _writer_for(self, value: str) -> ColumnarAggregator:
+        """Возвращает (создавая при необходимости) агрегатор партиции."""
+        if value not in self._writers:
+            part_dir = os.path.join(self.root, f"{self.partition_column}={value}")
+            os.makedirs(part_dir, exist_ok=True)
+            self._writers[value] = ColumnarAggregator(
+                os.path.join(part_dir, self.file_name), self.batch_rows,
+                exclude=("test_id", self.partition_column), profile=self.profile
+            )
+        return self._writers[value]
\ No newline at end of file
@@ -0,0 +1,206 @@
+# src/stream_enhancer.py
+
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from collections import defaultdict
+from scipy.signal import lfilter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .enhancer import DatasetEnhancer
+from .online_enhancer import OnlineEnhancer
+from .settings import StorageProfile
+from .storage_manager import cast_column, open_dataset, profile_field, writer_options
+
+# (путь к parquet-файлу, нужна ли фильтрация строк по ключу группы)
+Source = Tuple[str, bool]
+
+class StreamingEnhancer:
+    """Out-of-core вариант DatasetEnhancer.process.
+
+    Датасет обрабатывается по группам (test_id, bearing_id), а внутри группы -
+    пакетами по batch_rows строк. Между пакетами переносятся последние
+    max(окно) - 1 строк (для скользящих средних и diff) и состояние фильтра EWM,
+    поэтому результат совпадает с пакетным process в пределах округления
+    float64, а в памяти одновременно находится один пакет. Результат
+    дописывается в parquet по мере расчета; строки всегда упорядочены по
+    (test_id, bearing_id, timestamp), и row group не пересекает границу подшипника.
+    """
+
+    KEYS: Tuple[str, str] = ("test_id", "bearing_id")
+
+    def __init__(self, rolling_window: int = 10, extra_windows: Sequence[int] = (),
+                 ewm_spans: Sequence[int] = (), batch_rows: int = 65536,
+                 profile: Optional[StorageProfile] = None):
+        """Инициализация энхансера.
+
+        Args:
+            rolling_window (int): Размер окна для скользящего среднего.
+            extra_windows (Sequence[int]): Дополнительные окна скользящего среднего.
+            ewm_spans (Sequence[int]): Параметры span экспоненциального среднего.
+            batch_rows (int): Строк в одном обрабатываемом пакете.
+            profile (Optional[StorageProfile]): Профиль хранения результата
+                (sort_by не используется); по умолчанию StorageProfile().
+        """
+        self.rolling_window = rolling_window
+        self.extra_windows: List[int] = list(extra_windows)
+        self.ewm_spans: List[int] = list(ewm_spans)
+        self.batch_rows = batch_rows
+        self.profile = profile if profile is not None else StorageProfile()
+        self._windows: List[int] = list(dict.fromkeys([rolling_window, *self.extra_windows]))
+        # Переносимый хвост: нужен и для окна, и для diff (хотя бы одна строка)
+        self._tail_rows: int = max(max(self._windows) - 1, 1)
+        self._decays: np.ndarray = np.array([1.0 - 2.0 / (s + 1.0) for s in self.ewm_spans])
+
+    def process(self, base_path: str, out_path: str) -> int:
+        """Улучшает датасет потоково и пишет результат в один parquet-файл.
+
+        Args:
+            base_path (str): Базовый датасет (hive-папка или parquet-файл).
+            out_path (str): Путь к улучшенному датасету (пишется атомарно).
+
+        Returns:
+            int: Число записанных строк.
+        """
+        dataset = open_dataset(base_path)
+        schema = dataset.schema
+        feature_cols = [c for c in schema.names if c not in DatasetEnhancer.EXCLUDE]
+        derived = OnlineEnhancer(feature_cols, self.rolling_window, self.extra_windows, self.ewm_spans).output_columns()
+        out_schema = pa.schema([
+            profile_field(field, self.profile)
+            for field in list(schema) + [pa.field(name, pa.float64()) for name in derived]
+        ])
+
+        tmp_path = os.path.join(os.path.dirname(out_path), "." + os.path.basename(out_path))
+        rows = 0
+        with pq.ParquetWriter(tmp_path, out_schema, **writer_options(self.profile)) as writer:
+            for (test_id, bearing_id), sources in self._groups(dataset).items():
+                for batch in self._enhance_group(self._group_tables(sources, test_id, bearing_id),
+                                                 out_schema, feature_cols, test_id, bearing_id):
+                    writer.write_batch(batch, row_group_size=self.profile.row_group_rows)
+                    rows += batch.num_rows
+        os.replace(tmp_path, out_path)
+        return rows
+
+    def _groups(self, dataset: ds.Dataset) -> Dict[Tuple[str, str], List[Source]]:
+        """Группы (test_id, bearing_id) в порядке сортировки и их файлы.
+
+        Ключи hive-партиций берутся из путей; у файлов без партиций (монолитный
+        датасет) ключи читаются из колонок, а строки группы отбираются фильтром.
+        """
+        groups: Dict[Tuple[str, str], List[Source]] = defaultdict(list)
+        for fragment in dataset.get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            if all(k in keys for k in self.KEYS):
+                groups[(str(keys["test_id"]), str(keys["bearing_id"]))].append((fragment.path, False))
+                continue
+            table = pq.read_table(fragment.path, columns=list(self.KEYS))
+            pairs = table.group_by(list(self.KEYS)).aggregate([])
+            for test_id, bearing_id in zip(pairs.column("test_id").to_pylist(), pairs.column("bearing_id").to_pylist()):
+                groups[(str(test_id), str(bearing_id))].append((fragment.path, True))
+        return {key: sorted(groups[key]) for key in sorted(groups)}
+
+    def _group_tables(self, sources: List[Source], test_id: str, bearing_id: str) -> Iterator[pa.Table]:
+        """Пакеты строк группы в порядке времени.
+
+        Части пишутся по времени, поэтому обычно достаточно прочитать их по
+        порядку. Если время в группе не монотонно (например, после повторной
+        обработки измененных файлов), группа сортируется целиком в памяти.
+        """
+        ts = np.concatenate([np.empty(0, dtype="datetime64[us]")] + [
+            t.column("timestamp").to_numpy().astype("datetime64[us]")
+            for t in self._read(sources, test_id, bearing_id, ["timestamp"])
+        ])
+        if np.all(ts[1:] >= ts[:-1]):
+            yield from self._read(sources, test_id, bearing_id)
+            return
+
+        table = pa.concat_tables(list(self._read(sources, test_id, bearing_id)))
+        table = table.take(pa.array(np.argsort(ts, kind="stable")))
+        for start in range(0, table.num_rows, self.batch_rows):
+            yield table.slice(start, self.batch_rows)
+
+    def _read(self, sources: List[Source], test_id: str, bearing_id: str,
+              columns: Optional[List[str]] = None) -> Iterator[pa.Table]:
+        """Потоково читает файлы группы пакетами по batch_rows строк."""
+        for path, filtered in sources:
+            pf = pq.ParquetFile(path)
+            read_columns = columns
+            if filtered and columns is not None:
+                read_columns = columns + list(self.KEYS)
+            for batch in pf.iter_batches(batch_size=self.batch_rows, columns=read_columns):
+                table = pa.Table.from_batches([batch])
+                if filtered:
+                    mask = pc.and_(pc.equal(pc.cast(table.column("test_id"), pa.string()), test_id),
+                                   pc.equal(pc.cast(table.column("bearing_id"), pa.string()), bearing_id))
+                    table = table.filter(mask)
+                    if columns is not None:
+                        table = table.select(columns)
+                if table.num_rows:
+                    yield table
+
+    def _enhance_group(self, tables: Iterator[pa.Table], out_schema: pa.Schema, feature_cols: List[str],
+                       test_id: str, bearing_id: str) -> Iterator[pa.RecordBatch]:
+        """Считает временные признаки пакетов одной группы с переносом состояния."""
+        n_features = len(feature_cols)
+        tail = np.empty((0, n_features))
+        ewm_num = np.zeros((len(self.ewm_spans), n_features))
+        ewm_den = np.zeros((len(self.ewm_spans), n_features))
+
+        for table in tables:
+            n = table.num_rows
+            values = np.column_stack([self._values(table, col) for col in feature_cols]) \
+                if n_features else np.empty((n, 0))
+            # Хвост предыдущих строк дает полные окна и diff на границе пакета
+            context = np.concatenate([tail, values])
+            starts = np.zeros(1, dtype=np.int64)
+            skip = len(tail)
+
+            rolling = {w: DatasetEnhancer.rolling_mean(context, starts, w)[skip:] for w in self._windows}
+            diff = DatasetEnhancer.diff(context, starts)[skip:]
+            ewm: Dict[int, np.ndarray] = {}
+            finite = np.isfinite(values)
+            weighted = np.where(finite, values, 0.0)
+            for i, span in enumerate(self.ewm_spans):
+                decay = self._decays[i]
+                num, zf_num = lfilter([1.0], [1.0, -decay], weighted, axis=0, zi=decay * ewm_num[i][None, :])
+                den, zf_den = lfilter([1.0], [1.0, -decay], finite.astype(np.float64), axis=0,
+                                      zi=decay * ewm_den[i][None, :])
+                ewm_num[i], ewm_den[i] = num[-1], den[-1]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    ewm[span] = np.where(den > 0, num / den, np.nan)
+            tail = context[-self._tail_rows:]
+
+            derived = DatasetEnhancer.derived_columns(feature_cols, self.rolling_window, self.extra_windows,
+                                                      self.ewm_spans, rolling, diff, ewm)
+            yield self._output_batch(table, derived, out_schema, self.profile, test_id, bearing_id)
+
+    @staticmethod
+    def _values(table: pa.Table, column: str) -> np.ndarray:
+        """Колонка признака в float64 (отсутствующая в части - NaN, как при объединении в pandas)."""
+        if column not in table.column_names:
+            return np.full(table.num_rows, np.nan)
+        return table.column(column).to_numpy().astype(np.float64, copy=False)
+
+    @staticmethod
+    def _output_batch(table: pa.Table, derived: Dict[str, np.ndarray], out_schema: pa.Schema,
+                      profile: StorageProfile, test_id: str, bearing_id: str) -> pa.RecordBatch:
+        """Собирает выходной пакет в типах профиля; NaN пишется как null (как pandas.to_parquet)."""
+        n = table.num_rows
+        keys = {"test_id": test_id, "bearing_id": bearing_id}
+        arrays = []
+        for field in out_schema:
+            if field.name in keys:
+                column: object = pa.DictionaryArray.from_arrays(
+                    pa.array(np.zeros(n, dtype=np.int32)), pa.array([keys[field.name]])
+                )
+            elif field.name in derived:
+                column = derived[field.name]
+            elif field.name not in table.column_names:
+                column = pa.nulls(n, type=field.type)
+            else:
+                column = table.column(field.name)
+            arrays.append(cast_column(column, field, profile))
+        return pa.RecordBatch.from_arrays(arrays, schema=out_schema)
@@ -0,0 +1,147 @@
+# src/synthetic_data.py
+
+import os
+import time
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from .settings import ExperimentSpec
+
+# Формат имени файла IMS (совпадает с IMSRawLoader.parse_timestamp)
+TIMESTAMP_FORMAT: str = "%Y.%m.%d.%H.%M.%S"
+
+@dataclass(frozen=True)
+class DegradationTrend:
+    """Параметры искусственной деградации подшипника.
+
+    Тяжесть дефекта растет от 0 (до onset) до 1 (конец теста) квадратично;
+    с ней растет шум и появляется серия затухающих ударов с частотой дефекта.
+    """
+    onset: float = 0.6               # доля длительности теста до начала деградации
+    growth: float = 4.0              # во сколько раз вырастает СКО шума к концу теста
+    impulse_freq: float = 236.4      # частота ударов (Гц), BPFO подшипников IMS
+    impulse_amplitude: float = 0.5   # амплитуда ударов при тяжести 1
+    resonance_freq: float = 4000.0   # частота собственных колебаний после удара (Гц)
+
+    def severity(self, progress: float) -> float:
+        """Тяжесть дефекта (0..1) для доли пройденного теста progress (0..1)."""
+        if progress <= self.onset:
+            return 0.0
+        return min(1.0, (progress - self.onset) / (1.0 - self.onset)) ** 2
+
+def synthesize_snapshot(spec: ExperimentSpec, n_samples: int = 20480, sampling_rate: int = 20000,
+                        amplitude: float = 0.1, severities: Optional[Dict[str, float]] = None,
+                        trends: Optional[Dict[str, DegradationTrend]] = None,
+                        rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Синтезирует матрицу сигналов одного снимка (samples, channels).
+
+    Args:
+        spec (ExperimentSpec): Спецификация теста (каналы и подшипники).
+        n_samples (int): Число отсчетов на канал.
+        sampling_rate (int): Частота дискретизации (Гц).
+        amplitude (float): СКО шума здорового подшипника.
+        severities (Optional[Dict[str, float]]): Подшипник -> тяжесть дефекта (0..1).
+        trends (Optional[Dict[str, DegradationTrend]]): Подшипник -> параметры деградации.
+        rng (Optional[np.random.Generator]): Генератор случайных чисел.
+
+    Returns:
+        np.ndarray: Матрица формы (n_samples, spec.column_count).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    data = rng.normal(0.0, amplitude, size=(n_samples, spec.column_count))
+    t = np.arange(n_samples) / sampling_rate
+
+    for b_name, severity in (severities or {}).items():
+        trend = (trends or {}).get(b_name, DegradationTrend())
+        if severity <= 0:
+            continue
+        # Затухающий отклик резонанса после каждого удара дефекта
+        phase = np.mod(t, 1.0 / trend.impulse_freq)
+        impulses = np.exp(-phase * 2000.0) * np.sin(2 * np.pi * trend.resonance_freq * phase)
+        gain = 1.0 + (trend.growth - 1.0) * severity
+        for ch in spec.bearing_to_channels[b_name]:
+            i = spec.channels.index(ch)
+            data[:, i] = data[:, i] * gain + severity * trend.impulse_amplitude * impulses
+    return data
+
+def write_ims_snapshot(directory: str, timestamp: datetime, spec: ExperimentSpec,
+                       n_samples: int = 20480, amplitude: float = 0.1,
+                       rng: Optional[np.random.Generator] = None,
+                       severities: Optional[Dict[str, float]] = None,
+                       trends: Optional[Dict[str, DegradationTrend]] = None) -> str:
+    """Пишет один синтетический снимок в формате IMS (tab-separated, без заголовка).
+
+    Файл пишется напрямую, без временного имени - как на реальном стенде,
+    где файл какое-то время виден недописанным.
+
+    Args:
+        directory (str): Папка теста.
+        timestamp (datetime): Метка времени (имя файла).
+        spec (ExperimentSpec): Спецификация теста (число каналов).
+        n_samples (int): Число отсчетов на канал.
+        amplitude (float): СКО шума.
+        rng (Optional[np.random.Generator]): Генератор случайных чисел.
+        severities (Optional[Dict[str, float]]): Подшипник -> тяжесть дефекта (0..1).
+        trends (Optional[Dict[str, DegradationTrend]]): Подшипник -> параметры деградации.
+
+    Returns:
+        str: Путь к записанному файлу.
+    """
+    os.makedirs(directory, exist_ok=True)
+    data = synthesize_snapshot(spec, n_samples, amplitude=amplitude, severities=severities,
+                               trends=trends, rng=rng)
+    path = os.path.join(directory, timestamp.strftime(TIMESTAMP_FORMAT))
+    np.savetxt(path, data, fmt="%.3f", delimiter="\t")
+    return path
+
+def drop_snapshots(directory: str, spec: ExperimentSpec, count: int, start: datetime,
+                   period: timedelta = timedelta(minutes=10), interval_s: float = 0.0,
+                   seed: int = 0, trends: Optional[Dict[str, DegradationTrend]] = None,
+                   **kwargs) -> Iterator[str]:
+    """Последовательно подкладывает снимки в папку, имитируя работу стенда.
+
+    Args:
+        directory (str): Папка теста.
+        spec (ExperimentSpec): Спецификация теста.
+        count (int): Число снимков.
+        start (datetime): Метка времени первого снимка.
+        period (timedelta): Шаг меток времени между снимками.
+        interval_s (float): Реальная пауза между записью снимков (сек).
+        seed (int): Зерно генератора.
+        trends (Optional[Dict[str, DegradationTrend]]): Деградирующие подшипники
+            (тяжесть растет от первого снимка к последнему).
+        **kwargs: Параметры write_ims_snapshot.
+
+    Yields:
+        str: Путь к очередному записанному файлу.
+    """
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        if i and interval_s > 0:
+            time.sleep(interval_s)
+        progress = i / max(count - 1, 1)
+        severities = {b: trend.severity(progress) for b, trend in (trends or {}).items()}
+        yield write_ims_snapshot(directory, start + i * period, spec, rng=rng,
+                                 severities=severities, trends=trends, **kwargs)
+
+def generate_test(root: str, test_name: str, spec: ExperimentSpec, count: int,
+                  start: datetime, failing: Optional[Dict[str, DegradationTrend]] = None,
+                  seed: int = 0, **kwargs) -> List[str]:
+    """Генерирует папку теста IMS целиком (например, для бенчмарков без архива NASA).
+
+    Args:
+        root (str): Корневая папка данных (аналог GlobalConfig.raw_data_path).
+        test_name (str): Имя теста (папки).
+        spec (ExperimentSpec): Спецификация теста.
+        count (int): Число снимков.
+        start (datetime): Метка времени первого снимка.
+        failing (Optional[Dict[str, DegradationTrend]]): Деградирующие подшипники.
+        seed (int): Зерно генератора.
+        **kwargs: Параметры drop_snapshots/write_ims_snapshot.
+
+    Returns:
+        List[str]: Пути к записанным файлам.
+    """
+    return list(drop_snapshots(os.path.join(root, test_name), spec, count, start,
+                               seed=seed, trends=failing, **kwargs))
\ No newline at end of file
@@ -0,0 +1,110 @@
+# src/torch_dataset.py
+
+import numpy as np
+import torch
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+from .sequence_store import SequenceStore
+
+Sample = Tuple[torch.Tensor, torch.Tensor, torch.Tensor]
+
+class SequenceDataset(Dataset):
+    """Dataset последовательностей признаков подшипника для обучения RUL.
+
+    Индекс начал последовательностей (SequenceStore.sequence_starts) строится
+    один раз; образец - тензор над срезом memory-mapped матрицы признаков
+    (torch.from_numpy, без копирования) и разметка последней строки.
+    Индекс списком возвращает сразу пакет (одно копирование в gather), что
+    вместе с make_loader убирает поэлементную сборку пакета в collate.
+
+    Отображение файлов открывается лениво в каждом процессе и не попадает в
+    pickle, поэтому датасет безопасен для воркеров DataLoader при любом
+    способе запуска процессов; страницы файла делятся через page cache ОС.
+    """
+
+    def __init__(self, store_dir: str, length: int, stride: int = 1,
+                 bearings: Optional[Sequence[Tuple[str, str]]] = None):
+        """Инициализация датасета.
+
+        Args:
+            store_dir (str): Папка SequenceStore.
+            length (int): Длина последовательности (строк датасета).
+            stride (int): Шаг между началами последовательностей.
+            bearings (Optional[Sequence[Tuple[str, str]]]): Подшипники
+                (test_id, bearing_id) выборки; None - все.
+        """
+        self.store_dir = store_dir
+        self.length = length
+        self.stride = stride
+        self._store: Optional[SequenceStore] = None
+        self.starts: np.ndarray = self.store.sequence_starts(length, stride, bearings)
+
+    @property
+    def store(self) -> SequenceStore:
+        """Хранилище текущего процесса (открывается при первом обращении)."""
+        if self._store is None:
+            # Копирование при записи: torch.from_numpy требует записываемый массив,
+            # а файлы хранилища при этом не меняются
+            self._store = SequenceStore(self.store_dir, mmap_mode="c")
+        return self._store
+
+    @property
+    def n_features(self) -> int:
+        """Число признаков в последовательности."""
+        return len(self.store.columns)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Состояние для воркеров: без открытых отображений файлов."""
+        state = self.__dict__.copy()
+        state["_store"] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, Sequence[int]]) -> Sample:
+        """Образец или пакет образцов.
+
+        Args:
+            index (Union[int, Sequence[int]]): Номер образца или список номеров.
+
+        Returns:
+            Sample: (последовательность (length, n_features), RUL, класс здоровья);
+                для списка - с ведущей размерностью пакета.
+        """
+        if isinstance(index, (int, np.integer)):
+            sequence, rul, state = self.store.sequence(int(self.starts[index]), self.length)
+            return torch.from_numpy(sequence), torch.tensor(rul, dtype=torch.float32), torch.tensor(state)
+        sequences, ruls, states = self.store.gather(self.starts[np.asarray(index)], self.length)
+        return torch.from_numpy(sequences), torch.from_numpy(ruls), torch.from_numpy(states)
+
+def make_loader(dataset: SequenceDataset, batch_size: int, shuffle: bool = True, workers: int = 0,
+                drop_last: bool = False, seed: Optional[int] = None,
+                pin_memory: Optional[bool] = None) -> DataLoader:
+    """DataLoader, который запрашивает у датасета пакеты целиком.
+
+    BatchSampler передается как sampler при batch_size=None: каждый воркер
+    получает список номеров и собирает пакет одним SequenceStore.gather.
+
+    Args:
+        dataset (SequenceDataset): Датасет последовательностей.
+        batch_size (int): Размер пакета.
+        shuffle (bool): Перемешивать ли образцы каждую эпоху.
+        workers (int): Число процессов загрузки (0 - в основном процессе).
+        drop_last (bool): Отбрасывать ли неполный последний пакет.
+        seed (Optional[int]): Зерно перемешивания (None - случайное).
+        pin_memory (Optional[bool]): Закреплять ли память пакетов (None - при наличии CUDA).
+
+    Returns:
+        DataLoader: Загрузчик пакетов (sequence, rul, health_state).
+    """
+    generator = torch.Generator().manual_seed(seed) if seed is not None else None
+    sampler = RandomSampler(dataset, generator=generator) if shuffle else SequentialSampler(dataset)
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(sampler, batch_size, drop_last),
+        batch_size=None,
+        num_workers=workers,
+        persistent_workers=workers > 0,
+        pin_memory=torch.cuda.is_available() if pin_memory is None else pin_memory
+    )
@@ -0,0 +1,155 @@
+# src/torch_engine.py
+
+import numpy as np
+import torch
+from typing import Dict, Optional, Tuple, Union
+from .spectral_engine import SpectralCalculator
+
+ArrayLike = Union[np.ndarray, torch.Tensor]
+
+class TorchFeatureEngine:
+    """Пакетный расчет признаков FeatureCalculator и SpectralCalculator на torch.
+
+    Все окна файла обрабатываются одним набором тензорных операций
+    (моменты, torch.fft.rfft) на устройстве из плана ресурсов
+    (GlobalConfig.torch_device) или заданном явно. Формулы и обработка вырожденных окон повторяют calculate_batch и
+    calculate_spectral_batch; в float64 результат совпадает с NumPy-движком
+    в пределах точности округления. Результат возвращается в NumPy.
+    """
+
+    def __init__(self, device: Optional[str] = None, threads: Optional[int] = None,
+                 dtype: str = "float64"):
+        """Инициализация движка.
+
+        Args:
+            device (Optional[str]): Устройство torch ("cpu", "cuda", ...);
+                None - "cuda", если доступна, иначе "cpu".
+            threads (Optional[int]): Число потоков intra-op для CPU
+                (None - не менять настройку torch).
+            dtype (str): Тип вычислений ("float64" или "float32").
+        """
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = torch.device(device)
+        if threads is not None:
+            torch.set_num_threads(threads)
+        self.dtype: torch.dtype = getattr(torch, dtype)
+        self._grids: Dict[Tuple[int, int], torch.Tensor] = {}
+
+    def segment(self, signals: np.ndarray, length: int, step: int) -> torch.Tensor:
+        """Нарезает сигналы на окна без копирования (аналог segment_signal).
+
+        Args:
+            signals (np.ndarray): Сигналы формы (..., samples), C-contiguous.
+            length (int): Длина окна.
+            step (int): Шаг между окнами.
+
+        Returns:
+            torch.Tensor: Окна формы (..., n_windows, length) на устройстве движка.
+        """
+        x = self._to_tensor(np.ascontiguousarray(signals))
+        if x.shape[-1] < length:
+            return x.new_empty((*x.shape[:-1], 0, length))
+        return x.unfold(-1, length, step)
+
+    def calculate_batch(self, windows: ArrayLike) -> Dict[str, np.ndarray]:
+        """Статистические признаки для пачки окон (как FeatureCalculator.calculate_batch).
+
+        Args:
+            windows (ArrayLike): Окна формы (n_windows, win_len) или
+                (channels, n_windows, win_len).
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы windows.shape[:-1].
+        """
+        if windows.ndim not in (2, 3):
+            raise ValueError(f"Ожидается 2D или 3D массив окон, получено: {tuple(windows.shape)}")
+
+        with torch.inference_mode():
+            x = self._to_tensor(windows)
+            n = x.shape[-1]
+
+            mean = x.mean(dim=-1)
+            centered = x - mean.unsqueeze(-1)
+            sq = centered * centered
+            m2 = sq.mean(dim=-1)
+            m3 = (sq * centered).mean(dim=-1)
+            m4 = (sq * sq).mean(dim=-1)
+            rms = torch.sqrt((x * x).sum(dim=-1) / n)
+
+            w_max = x.amax(dim=-1)
+            w_min = x.amin(dim=-1)
+            peak = torch.maximum(w_max, -w_min)
+            mean_sqrt = torch.sqrt(x.abs()).mean(dim=-1) ** 2
+
+            # Тот же критерий вырожденного окна, что и в scipy.stats
+            zero = m2 <= (torch.finfo(x.dtype).eps * mean) ** 2
+            nan = torch.full_like(m2, float("nan"))
+            skewness = torch.where(zero, nan, m3 / m2 ** 1.5)
+            kurt = torch.where(zero, nan, m4 / m2 ** 2) - 3.0
+            crest_factor = torch.where(rms != 0, peak / rms, torch.zeros_like(rms))
+            clearance_factor = torch.where(mean_sqrt != 0, peak / mean_sqrt, torch.zeros_like(mean_sqrt))
+
+            return self._to_numpy({
+                "mean": mean,
+                # Остаток ошибки округления в вырожденном окне не выдается за разброс
+                "std": torch.where(zero, torch.zeros_like(m2), torch.sqrt(m2)),
+                "rms": rms,
+                "peak": peak,
+                "skewness": skewness,
+                "kurtosis": kurt,
+                "crest_factor": crest_factor,
+                "peak_to_peak": w_max - w_min,
+                "clearance_factor": clearance_factor
+            })
+
+    def calculate_spectral_batch(self, windows: ArrayLike, sampling_rate: int) -> Dict[str, np.ndarray]:
+        """Спектральные признаки для пачки окон (как SpectralCalculator.calculate_spectral_batch).
+
+        Args:
+            windows (ArrayLike): Окна формы (..., win_len).
+            sampling_rate (int): Частота дискретизации (Гц).
+
+        Returns:
+            Dict[str, np.ndarray]: Признак -> массив формы windows.shape[:-1].
+        """
+        with torch.inference_mode():
+            x = self._to_tensor(windows)
+            n = x.shape[-1]
+
+            # Как и в NumPy-движке: вместо детрендирования обнуляется DC бин
+            yf = torch.fft.rfft(x, dim=-1)
+            psd = yf.real.square() + yf.imag.square()
+            psd[..., 0] = 0.0
+
+            sum_psd = psd.sum(dim=-1)
+            nonzero = sum_psd != 0
+            zeros = torch.zeros_like(sum_psd)
+            centroid = torch.where(nonzero, (psd @ self._frequency_grid(n, sampling_rate)) / sum_psd, zeros)
+
+            return self._to_numpy({
+                "spectral_centroid": centroid,
+                "spectral_energy": torch.where(nonzero, sum_psd / n, zeros)
+            })
+
+    def _frequency_grid(self, n: int, sampling_rate: int) -> torch.Tensor:
+        """Ось частот rfft на устройстве движка, закешированная по (n, sampling_rate)."""
+        key = (n, sampling_rate)
+        if key not in self._grids:
+            xf = SpectralCalculator.frequency_grid(n, sampling_rate)
+            self._grids[key] = torch.tensor(xf, dtype=self.dtype, device=self.device)
+        return self._grids[key]
+
+    def _to_tensor(self, data: ArrayLike) -> torch.Tensor:
+        """Переносит данные на устройство движка в его типе (без копии, если возможно)."""
+        if isinstance(data, torch.Tensor):
+            return data.to(device=self.device, dtype=self.dtype)
+        if not data.flags.writeable:
+            # torch.from_numpy не поддерживает read-only массивы (например, stride view)
+            data = np.array(data)
+        return torch.from_numpy(data).to(device=self.device, dtype=self.dtype)
+
+    @staticmethod
+    def _to_numpy(features: Dict[str, torch.Tensor]) -> Dict[str, np.ndarray]:
+        """Возвращает признаки в NumPy float64 (как у NumPy-движка)."""
+        return {k: v.detach().to("cpu", torch.float64).numpy() for k, v in features.items()}
\ No newline at end of file
@@ -0,0 +1,226 @@
+# src/watcher.py
+
+import os
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from .settings import GlobalConfig
+from .data_loader import IMSRawLoader
+from .file_processor import FileProcessor
+from .manifest import ProcessingManifest, config_fingerprint
+from .storage_manager import PartitionedAggregator, compact_parts
+
+@dataclass
+class IngestRecord:
+    """Метрики обработки одного файла в режиме наблюдения."""
+    file_path: str
+    test_id: str
+    rows: int
+    # Время (сек) от завершения записи файла (mtime) до фиксации результата в датасете
+    latency_s: float
+    # Из него: ожидание стабильного размера до обнаружения (два опроса)
+    detect_s: float
+    # Расчет признаков файла и его буферизация в части
+    process_s: float
+    # Доля файла в записи части в parquet и фиксации в манифесте
+    write_s: float
+
+class DirectoryWatcher:
+    """Наблюдает за папками тестов и обрабатывает новые снимки по мере появления.
+
+    Используется опрос (polling): файл считается дописанным, когда его размер
+    не изменился между двумя последовательными опросами. Файлы, найденные за
+    один опрос, дописываются в датасет одной частью (не больше commit_every
+    файлов) и фиксируются в манифесте теста, поэтому наблюдение совместимо
+    с пакетным запуском и продолжается после перезапуска. Когда мелких частей
+    набирается config.watch_compact_parts, они сливаются в одну, так что число
+    файлов и размер манифеста не растут на каждый снимок. Файл, который не
+    удалось обработать, пропускается до перезапуска наблюдателя, а остальные
+    файлы опроса фиксируются как обычно.
+    """
+
+    def __init__(self, config: GlobalConfig, base_path: str, poll_interval: float = 1.0):
+        """Инициализация наблюдателя.
+
+        Args:
+            config (GlobalConfig): Глобальный конфиг (тесты берутся из target_tests).
+            base_path (str): Корневая папка партиционированного датасета.
+            poll_interval (float): Пауза между опросами папок (сек).
+        """
+        self.config = config
+        self.base_path = base_path
+        self.poll_interval = poll_interval
+        self.loader = IMSRawLoader(config)
+        self.processor = FileProcessor(config)
+        fingerprint = config_fingerprint(config)
+        self.manifests: Dict[str, ProcessingManifest] = {
+            t: ProcessingManifest(os.path.join(base_path, f"test_id={t}"), fingerprint)
+            for t in config.target_tests
+        }
+        self.records: List[IngestRecord] = []
+        # Файлы-кандидаты: путь -> размер на предыдущем опросе
+        self._sizes: Dict[str, int] = {}
+        # Уже зафиксированные в манифестах файлы (в том числе до перезапуска)
+        self._done: Dict[str, Set[str]] = {t: self._committed_files(t) for t in config.target_tests}
+        # Файлы, обработка которых завершилась ошибкой (не повторяются до перезапуска)
+        self._failed: Dict[str, Set[str]] = {t: set() for t in config.target_tests}
+
+    def poll_once(self) -> List[IngestRecord]:
+        """Один опрос: находит дописанные файлы, обрабатывает и фиксирует их.
+
+        Returns:
+            List[IngestRecord]: Метрики файлов, зафиксированных в этом опросе.
+        """
+        processed: List[IngestRecord] = []
+        for test_name, manifest in self.manifests.items():
+            try:
+                file_list = self.loader.get_file_list(test_name)
+            except FileNotFoundError:
+                continue
+
+            detected = time.time()
+            skip = self._done[test_name] | self._failed[test_name]
+            ready = [f for f in file_list if f not in skip and self._is_complete(f)]
+            step = max(1, self.config.commit_every)
+            for start in range(0, len(ready), step):
+                processed.extend(self._ingest(ready[start:start + step], test_name, manifest, detected))
+            if ready:
+                self._compact(manifest)
+        return processed
+
+    def run(self, max_files: Optional[int] = None, timeout: Optional[float] = None) -> List[IngestRecord]:
+        """Запускает цикл наблюдения.
+
+        Args:
+            max_files (Optional[int]): Остановиться после обработки стольких файлов.
+            timeout (Optional[float]): Остановиться через столько секунд.
+
+        Returns:
+            List[IngestRecord]: Метрики всех обработанных файлов.
+        """
+        started = time.monotonic()
+        print(f"[*] Watching {', '.join(self.manifests)} (poll every {self.poll_interval}s). Ctrl+C to stop.")
+        try:
+            while True:
+                for record in self.poll_once():
+                    print(f"[+] {record.test_id}/{os.path.basename(record.file_path)}: "
+                          f"{record.rows} rows, latency {record.latency_s * 1000:.1f} ms from file completion "
+                          f"(detect {record.detect_s * 1000:.1f} ms, process {record.process_s * 1000:.1f} ms, "
+                          f"write {record.write_s * 1000:.1f} ms)")
+                if max_files is not None and len(self.records) >= max_files:
+                    break
+                if timeout is not None and time.monotonic() - started >= timeout:
+                    break
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n[*] Watch stopped.")
+        self.print_summary()
+        return self.records
+
+    def print_summary(self) -> None:
+        """Выводит сводку задержек по обработанным файлам.
+
+        Полная задержка считается от завершения записи файла (mtime) до
+        фиксации в датасете; отдельно - та же задержка без ожидания стабильного
+        размера (от обнаружения файла).
+        """
+        if not self.records:
+            print("[*] No files ingested.")
+            return
+        latencies = np.array([r.latency_s for r in self.records]) * 1000
+        after_detect = latencies - np.array([r.detect_s for r in self.records]) * 1000
+        failed = sum(len(files) for files in self._failed.values())
+        print(f"[*] Ingested {len(self.records)} files" + (f", {failed} failed." if failed else "."))
+        for title, values in (("from file completion", latencies), ("from detection", after_detect)):
+            print(f"[*] Latency ms {title}: mean {values.mean():.1f}, p50 {np.percentile(values, 50):.1f}, "
+                  f"p95 {np.percentile(values, 95):.1f}, max {values.max():.1f}")
+
+    def _committed_files(self, test_name: str) -> Set[str]:
+        """Сверяет манифест с папкой теста и возвращает уже обработанные файлы."""
+        try:
+            file_list = self.loader.get_file_list(test_name)
+        except FileNotFoundError:
+            return set()
+        pending = set(self.manifests[test_name].pending_files(file_list))
+        return {f for f in file_list if f not in pending}
+
+    def _is_complete(self, file_path: str) -> bool:
+        """Файл дописан, если его размер не изменился с прошлого опроса."""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return False
+        previous = self._sizes.get(file_path)
+        self._sizes[file_path] = size
+        return previous is not None and previous == size and size > 0
+
+    def _ingest(self, files: List[str], test_name: str, manifest: ProcessingManifest,
+                detected: float) -> List[IngestRecord]:
+        """Обрабатывает файлы и дописывает результат в датасет одной частью.
+
+        Args:
+            files (List[str]): Дописанные файлы теста по порядку.
+            test_name (str): Имя теста.
+            manifest (ProcessingManifest): Манифест теста.
+            detected (float): Время опроса, на котором файлы признаны дописанными (time.time()).
+
+        Returns:
+            List[IngestRecord]: Метрики зафиксированных файлов (без файлов,
+                обработка которых завершилась ошибкой).
+        """
+        aggregator = PartitionedAggregator(
+            manifest.dataset_path, manifest.next_part_name(), self.config.write_batch_rows,
+            profile=self.config.storage
+        )
+        pending: List[IngestRecord] = []
+        for file_path in files:
+            started = time.time()
+            try:
+                result = self.processor.process(file_path, test_name)
+            except Exception as e:
+                # Неразбираемый файл не останавливает наблюдение и не мешает остальным файлам части
+                print(f"[!] {test_name}/{os.path.basename(file_path)}: processing failed, skipped ({e})")
+                self._sizes.pop(file_path, None)
+                self._failed[test_name].add(file_path)
+                continue
+            aggregator.add_batch(timestamp=result.timestamp, test_id=test_name, columns=result.columns)
+            processed = time.time()
+            completed = os.path.getmtime(file_path)
+            pending.append(IngestRecord(
+                file_path=file_path,
+                test_id=test_name,
+                rows=len(result.columns["bearing_id"]),
+                latency_s=0.0,
+                detect_s=max(0.0, detected - completed),
+                process_s=processed - started,
+                write_s=0.0
+            ))
+
+        written = time.time()
+        aggregator.close()
+        # Часть без строк не создает файлов и в манифест не попадает
+        if aggregator.n_rows:
+            manifest.commit(aggregator.file_name, [record.file_path for record in pending])
+        committed = time.time()
+        # Запись части в parquet и фиксация в манифесте делятся поровну между ее файлами
+        write_s = (committed - written) / max(1, len(pending))
+
+        for record in pending:
+            self._sizes.pop(record.file_path, None)
+            self._done[test_name].add(record.file_path)
+            record.write_s = write_s
+            record.latency_s = committed - os.path.getmtime(record.file_path)
+        self.records.extend(pending)
+        return pending
+
+    def _compact(self, manifest: ProcessingManifest) -> None:
+        """Сливает мелкие части теста в одну, когда их набирается watch_compact_parts."""
+        small = sorted(name for name, entries in manifest.parts.items()
+                       if len(entries) < self.config.commit_every)
+        if len(small) < max(2, self.config.watch_compact_parts):
+            return
+        target = manifest.next_part_name()
+        rows = compact_parts(manifest.dataset_path, small, target, self.config.storage)
+        manifest.merge(small, target)
+        print(f"[*] Compacted {len(small)} parts ({rows} rows) into {target}")
@@ -0,0 +1,23 @@
+# src/windowing.py
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def segment_signal(signal: np.ndarray, length: int, step: int) -> np.ndarray:
+    """Нарезает сигнал на окна без копирования данных (stride view).
+
+    Окна берутся по последней оси, поэтому на вход можно подавать как один
+    канал (samples,), так и матрицу каналов (channels, samples).
+
+    Args:
+        signal (np.ndarray): Сигнал формы (samples,) или (channels, samples).
+        length (int): Длина окна в отсчетах.
+        step (int): Шаг между началами соседних окон.
+
+    Returns:
+        np.ndarray: Представление формы (n_windows, length) или
+            (channels, n_windows, length). Только для чтения.
+    """
+    if signal.shape[-1] < length:
+        return np.empty(signal.shape[:-1] + (0, length), dtype=signal.dtype)
+    return sliding_window_view(signal, length, axis=-1)[..., ::step, :]
\ No newline at end of file